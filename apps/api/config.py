@@ -24,10 +24,60 @@ class Settings(BaseSettings):
     AI_SCORING_ENABLED: bool = True
     AI_MODEL_NAME: str = "gpt-4"
     OPENAI_API_KEY: str = ""
+    AI_API_BASE_URL: str = "https://api.openai.com/v1"  # Any OpenAI-compatible endpoint
+
+    # LLM enrichment queue (runs when AI_SCORING_ENABLED and OPENAI_API_KEY are set)
+    ENRICHMENT_BATCH_SIZE: int = 20
+    ENRICHMENT_BATCH_WAIT_SECONDS: float = 2.0
+    ENRICHMENT_CONCURRENCY: int = 4
+    ENRICHMENT_TIMEOUT_SECONDS: float = 30.0
+    ENRICHMENT_MAX_RETRIES: int = 3
+    ENRICHMENT_QUEUE_SIZE: int = 10000
+    ENRICHMENT_CACHE_SIZE: int = 10000
+
+    # Scoring rules file (JSON); empty uses the bundled default rules
+    SCORING_RULES_PATH: str = ""
+    # Trained conversion model artifact (.npy); empty or missing uses the rule-based score
+    SCORING_MODEL_PATH: str = ""
+    # Memoized evaluations of repeated feature combinations; 0 disables the memo
+    SCORE_MEMO_SIZE: int = 4096
 
     # Task automation
     AUTO_TASK_ENABLED: bool = True
     DEFAULT_FOLLOW_UP_DAYS: int = 3
+    STALE_LEAD_CHUNK_SIZE: int = 1000  # Leads per anti-join + bulk insert round
+
+    # Task deadline scheduler (reminders and due dates of pending tasks)
+    SCHEDULER_ENABLED: bool = True
+    SCHEDULER_WINDOW_SECONDS: float = 3600.0  # Look-ahead loaded from the database
+    SCHEDULER_MAX_LOADED: int = 10000  # Per deadline kind and window
+    SCHEDULER_RETRY_SECONDS: float = 30.0
+
+    # Reminder dispatch (leased batches, safe with several workers)
+    REMINDER_DISPATCH_ENABLED: bool = True
+    REMINDER_BATCH_SIZE: int = 100
+    REMINDER_LEASE_SECONDS: float = 60.0  # Unsent batches are retried after this
+    REMINDER_POLL_SECONDS: float = 30.0
+
+    # Overdue sweep (marks pending tasks past their due date as overdue)
+    OVERDUE_SWEEP_ENABLED: bool = True
+    OVERDUE_SWEEP_SECONDS: float = 300.0
+    OVERDUE_SWEEP_BATCH_SIZE: int = 1000
+
+    # Bulk import
+    IMPORT_CHUNK_SIZE: int = 1000
+
+    # Lead rescoring (workers > 0 scores up to that many chunks at once in a process pool)
+    RESCORE_CHUNK_SIZE: int = 2000
+    RESCORE_WORKERS: int = 0
+
+    # Response cache for stats and funnel endpoints
+    STATS_MAX_AGE_SECONDS: float = 300.0
+    # "memory" (per process) or "shared". Memory entries only see this process's writes,
+    # so with several workers they may be stale for up to STATS_MAX_AGE_SECONDS.
+    RESPONSE_CACHE_BACKEND: str = "memory"
+    RESPONSE_CACHE_URL: str = ""  # Redis URL for "shared"; empty uses an in-process stand-in
+    RESPONSE_CACHE_SIZE: int = 1024
 
 
 @lru_cache()
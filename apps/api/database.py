@@ -1,6 +1,8 @@
 """Database setup and session management."""
-from typing import AsyncGenerator
+from typing import AsyncGenerator, Sequence
 
+from sqlalchemy import Column, Insert, Table, inspect
+from sqlalchemy.engine import Connection
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine, async_sessionmaker
 from sqlalchemy.orm import declarative_base
 
@@ -27,9 +29,66 @@ Base = declarative_base()
 
 
 async def init_db():
-    """Initialize database tables."""
+    """Initialize database tables, the lead search index and the funnel rollup."""
+    from apps.api.services.funnel_rollup import ensure_funnel_rollup
+    from apps.api.services.lead_search import ensure_search_index
+
     async with engine.begin() as conn:
         await conn.run_sync(Base.metadata.create_all)
+        await conn.run_sync(add_missing_columns)
+        await conn.run_sync(add_missing_indexes)
+        await conn.run_sync(ensure_search_index)
+        await conn.run_sync(ensure_funnel_rollup)
+
+
+def add_missing_columns(conn: Connection) -> None:
+    """Add nullable columns that were added to existing tables after they were created.
+
+    ``create_all`` only creates missing tables; this keeps older development
+    databases usable without a migration tool.
+    """
+    inspector = inspect(conn)
+    for table in Base.metadata.sorted_tables:
+        if not inspector.has_table(table.name):
+            continue
+        existing = {column["name"] for column in inspector.get_columns(table.name)}
+        for column in table.columns:
+            if column.name in existing or not column.nullable:
+                continue
+            column_type = column.type.compile(dialect=conn.dialect)
+            conn.exec_driver_sql(
+                f"ALTER TABLE {table.name} ADD COLUMN {column.name} {column_type}"
+            )
+            for index in table.indexes:
+                if [c.name for c in index.columns] == [column.name]:
+                    index.create(conn, checkfirst=True)
+
+
+def add_missing_indexes(conn: Connection) -> None:
+    """Create indexes declared on tables that already existed without them."""
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(conn, checkfirst=True)
+
+
+def increment_upsert(
+    table: Table, key_columns: Sequence[Column], counters: Sequence[str], dialect: str
+) -> Insert:
+    """INSERT that adds `counters` onto the existing row when the key already exists.
+
+    ``INSERT ... ON CONFLICT DO UPDATE`` has the same shape on SQLite and
+    PostgreSQL; run it with a list of parameter dicts to upsert many rows.
+    """
+    if dialect == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert as dialect_insert
+    else:
+        from sqlalchemy.dialects.sqlite import insert as dialect_insert
+
+    stmt = dialect_insert(table)
+    return stmt.on_conflict_do_update(
+        index_elements=list(key_columns),
+        set_={name: table.c[name] + stmt.excluded[name] for name in counters},
+    )
 
 
 async def get_db() -> AsyncGenerator[AsyncSession, None]:
@@ -7,7 +7,13 @@ from fastapi.staticfiles import StaticFiles
 
 from apps.api.config import settings
 from apps.api.database import init_db
-from apps.api.routes import automation, funnel, leads, tasks, widgets
+from apps.api.routes import automation, funnel, leads, scoring, tasks, widgets
+from apps.api.services.lead_enrichment import start_enrichment, stop_enrichment
+from apps.api.services.overdue_sweep import start_overdue_sweeper, stop_overdue_sweeper
+from apps.api.services.reminder_dispatch import start_reminder_dispatch, stop_reminder_dispatch
+from apps.api.services.response_cache import close_response_cache
+from apps.api.services.scoring_rules import configure_scoring_rules
+from apps.api.services.task_scheduler import start_scheduler, stop_scheduler
 
 
 @asynccontextmanager
@@ -15,9 +21,18 @@ async def lifespan(app: FastAPI):
     """Application lifespan manager."""
     # Startup
     await init_db()
+    configure_scoring_rules()
+    await start_enrichment()
+    await start_scheduler()
+    await start_reminder_dispatch()
+    await start_overdue_sweeper()
     yield
     # Shutdown
-    pass
+    await stop_overdue_sweeper()
+    await stop_reminder_dispatch()
+    await stop_scheduler()
+    await stop_enrichment()
+    await close_response_cache()
 
 
 app = FastAPI(
@@ -42,6 +57,7 @@ app.include_router(tasks.router, prefix="/api/v1/tasks", tags=["tasks"])
 app.include_router(funnel.router, prefix="/api/v1/funnel", tags=["funnel"])
 app.include_router(automation.router, prefix="/api/v1/automation", tags=["automation"])
 app.include_router(widgets.router, prefix="/api/v1/widgets", tags=["widgets"])
+app.include_router(scoring.router, prefix="/api/v1/scoring", tags=["scoring"])
 
 # Serve widget static files
 app.mount("/static", StaticFiles(directory="apps/widget/src"), name="static")
@@ -2,7 +2,21 @@
 from datetime import datetime
 from uuid import uuid4
 
-from sqlalchemy import JSON, Boolean, Column, DateTime, Enum, Float, ForeignKey, Integer, String, Text
+from sqlalchemy import (
+    JSON,
+    Boolean,
+    Column,
+    Date,
+    DateTime,
+    Enum,
+    Float,
+    ForeignKey,
+    Index,
+    Integer,
+    String,
+    Text,
+    desc,
+)
 from sqlalchemy.dialects.postgresql import UUID as PGUUID
 from sqlalchemy.orm import relationship
 
@@ -22,6 +36,9 @@ class LeadORM(Base):
     stage = Column(Enum(LeadStage), nullable=False, default=LeadStage.NEW, index=True)
     priority = Column(Enum(LeadPriority), nullable=False, default=LeadPriority.MEDIUM, index=True)
     score = Column(Integer, default=0, nullable=False)
+    scoring_version = Column(String(100), nullable=True, index=True)  # Rules (+ model) used
+    ai_score = Column(Integer, nullable=True)  # Set asynchronously by LLM enrichment
+    enriched_at = Column(DateTime, nullable=True)
 
     # Contact info stored as JSON
     contact_info = Column(JSON, nullable=False, default=dict)
@@ -46,11 +63,71 @@ class LeadORM(Base):
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
     contacted_at = Column(DateTime, nullable=True, index=True)
     closed_at = Column(DateTime, nullable=True, index=True)
+    stage_entered_at = Column(DateTime, nullable=True, default=datetime.utcnow)
+
+    # Furthest pipeline stage ever reached; None only until init_db backfills it
+    furthest_stage = Column(Enum(LeadStage), nullable=True, default=LeadStage.NEW)
 
     # Relationships
     tasks = relationship("TaskORM", back_populates="lead", cascade="all, delete-orphan")
 
 
+class FunnelDailyORM(Base):
+    """Lead counts and value sums per creation day, stage, source and campaign.
+
+    Maintained incrementally by every lead write path so the funnel reads a
+    few hundred rollup rows instead of scanning ``leads``.
+    """
+
+    __tablename__ = "funnel_daily"
+
+    day = Column(Date, primary_key=True)
+    stage = Column(Enum(LeadStage), primary_key=True)
+    source = Column(Enum(LeadSource), primary_key=True)
+    utm_campaign = Column(String(100), primary_key=True, default="")  # "" when not set
+    lead_count = Column(Integer, nullable=False, default=0)
+    value_sum = Column(Float, nullable=False, default=0.0)
+
+    # Leads of the row whose furthest stage is at least each pipeline stage
+    # (nullable so older databases can add them; init_db then rebuilds the rollup)
+    reached_new = Column(Integer, nullable=True, default=0)
+    reached_contacted = Column(Integer, nullable=True, default=0)
+    reached_qualified = Column(Integer, nullable=True, default=0)
+    reached_proposal = Column(Integer, nullable=True, default=0)
+    reached_negotiation = Column(Integer, nullable=True, default=0)
+    reached_won = Column(Integer, nullable=True, default=0)
+
+
+class LeadStageHistoryORM(Base):
+    """Append-only log of completed stage stays, one row per stage transition."""
+
+    __tablename__ = "lead_stage_history"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    lead_id = Column(
+        PGUUID(as_uuid=True), ForeignKey("leads.id", ondelete="CASCADE"), nullable=False, index=True
+    )
+    stage = Column(Enum(LeadStage), nullable=False)  # The stage that was left
+    entered_at = Column(DateTime, nullable=True)  # None when unknown (leads predating tracking)
+    exited_at = Column(DateTime, nullable=False, index=True)
+    duration_seconds = Column(Float, nullable=True)
+
+
+class StageDurationORM(Base):
+    """Histogram of completed stage stays in whole-day buckets.
+
+    Maintained incrementally with every `LeadStageHistoryORM` row, so the
+    funnel reads at most a few hundred rows per stage for average and median.
+    """
+
+    __tablename__ = "stage_durations"
+
+    stage = Column(Enum(LeadStage), primary_key=True)
+    bucket_days = Column(Integer, primary_key=True)  # floor(days), last bucket is open-ended
+    stays = Column(Integer, nullable=False, default=0)
+    total_seconds = Column(Float, nullable=False, default=0.0)
+
+
 class TaskORM(Base):
     """Task ORM model."""
 
@@ -71,6 +148,11 @@ class TaskORM(Base):
     due_date = Column(DateTime, nullable=True, index=True)
     reminder_at = Column(DateTime, nullable=True, index=True)
 
+    # Reminder dispatch: set once sent; the lease keeps other workers off a batch in flight
+    reminded_at = Column(DateTime, nullable=True)
+    reminder_lease_owner = Column(String(100), nullable=True)
+    reminder_lease_expires_at = Column(DateTime, nullable=True)
+
     # Completion
     completed_at = Column(DateTime, nullable=True)
     completed_by = Column(PGUUID(as_uuid=True), nullable=True)
@@ -82,6 +164,20 @@ class TaskORM(Base):
     # Relationships
     lead = relationship("LeadORM", back_populates="tasks")
 
+    __table_args__ = (
+        # Overdue listing (keyset on due date, id) and the overdue sweep
+        Index("ix_tasks_status_due_date", "status", "due_date", "id"),
+        # Task list order (due date, newest first), overall and per assignee
+        Index("ix_tasks_list_order", "due_date", desc("created_at"), desc("id")),
+        Index(
+            "ix_tasks_assigned_to_list_order",
+            "assigned_to",
+            "due_date",
+            desc("created_at"),
+            desc("id"),
+        ),
+    )
+
 
 class LeadTagORM(Base):
     """Lead tag ORM model."""
@@ -127,3 +223,19 @@ class WidgetORM(Base):
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
     is_active = Column(Boolean, nullable=False, default=True)
 
+
+class RescoreCheckpointORM(Base):
+    """Progress of a full-table rescoring run, committed with each chunk."""
+
+    __tablename__ = "rescore_checkpoints"
+
+    name = Column(String(50), primary_key=True)
+    status = Column(String(20), nullable=False)
+    last_lead_id = Column(PGUUID(as_uuid=True), nullable=True)
+    scanned = Column(Integer, nullable=False, default=0)
+    changed = Column(Integer, nullable=False, default=0)
+    error = Column(Text, nullable=True)
+
+    started_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
+    finished_at = Column(DateTime, nullable=True)
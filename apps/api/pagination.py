@@ -0,0 +1,96 @@
+"""Keyset (cursor) pagination helpers."""
+import base64
+import json
+from datetime import datetime
+from typing import Any, List, Optional, Sequence
+from uuid import UUID
+
+from fastapi import HTTPException
+from sqlalchemy import and_, false, or_
+from sqlalchemy.sql.elements import ColumnElement
+
+
+def encode_cursor(values: Sequence[Any]) -> str:
+    """Encode the sort key of the last row of a page into an opaque token."""
+    payload = []
+    for value in values:
+        if isinstance(value, datetime):
+            payload.append({"t": "dt", "v": value.isoformat()})
+        elif isinstance(value, UUID):
+            payload.append({"t": "uuid", "v": value.hex})
+        else:
+            payload.append({"t": "raw", "v": value})
+    raw = json.dumps(payload, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).rstrip(b"=").decode()
+
+
+def decode_cursor(token: str, size: int) -> List[Any]:
+    """Decode a cursor token produced by `encode_cursor`.
+
+    Raises a 400 error if the token is malformed or has the wrong arity.
+    """
+    try:
+        padded = token + "=" * (-len(token) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        if not isinstance(payload, list) or len(payload) != size:
+            raise ValueError("cursor arity mismatch")
+
+        values = []
+        for item in payload:
+            kind, value = item["t"], item["v"]
+            if value is None:
+                values.append(None)
+            elif kind == "dt":
+                values.append(datetime.fromisoformat(value))
+            elif kind == "uuid":
+                values.append(UUID(hex=value))
+            else:
+                values.append(value)
+        return values
+    except (ValueError, TypeError, KeyError) as e:
+        raise HTTPException(status_code=400, detail="Invalid cursor") from e
+
+
+def seek_after(
+    columns: Sequence[ColumnElement],
+    values: Sequence[Any],
+    descending: Sequence[bool],
+    nullable: Sequence[bool] = (),
+) -> ColumnElement:
+    """Build the keyset predicate for rows strictly after `values` in a mixed order.
+
+    Each column sorts DESC where `descending` is set and ASC otherwise. Columns
+    flagged in `nullable` must be ordered ``NULLS LAST``, so NULL sorts after
+    every value. Expands ``(a, b) > (x, y)`` into ``a > x OR (a = x AND b > y)``
+    so it works on every backend and can seek through a B-tree index on the
+    leading column.
+    """
+    nullable = list(nullable) + [False] * (len(columns) - len(nullable))
+    clauses = []
+    prefix: List[ColumnElement] = []
+    for column, value, desc, has_nulls in zip(columns, values, descending, nullable):
+        if value is None:
+            # Nothing sorts after NULL within its group; only the tie carries on
+            prefix.append(column.is_(None))
+            continue
+        after = column < value if desc else column > value
+        if has_nulls:
+            after = or_(after, column.is_(None))
+        clauses.append(and_(*prefix, after))
+        prefix.append(column == value)
+    return or_(*clauses) if clauses else false()
+
+
+def seek_after_desc(
+    columns: Sequence[ColumnElement], values: Sequence[Any]
+) -> ColumnElement:
+    """Build the keyset predicate for rows strictly after `values` in DESC order."""
+    return seek_after(columns, values, [True] * len(columns))
+
+
+def next_cursor_for(rows: Sequence[Any], page_size: int, *keys: str) -> Optional[str]:
+    """Return the cursor for the page following `rows`, or None on the last page."""
+    if len(rows) <= page_size:
+        return None
+    last = rows[page_size - 1]
+    return encode_cursor([getattr(last, key) for key in keys])
@@ -1,63 +1,122 @@
 """Automation API endpoints for tasks and reminders."""
-from typing import List
+import time
+from typing import List, Literal, Optional
 
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Query
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from apps.api.database import get_db
-from apps.api.services.task_automation import TaskAutomationService
-from packages.core.models.task import Task
-from packages.core.schemas.task import TaskResponse
+from apps.api.pagination import decode_cursor, next_cursor_for
+from apps.api.serialization import TASK_PLAN, json_response
+from apps.api.services.overdue_sweep import sweep_overdue_tasks
+from apps.api.services.reminder_dispatch import reminder_dispatcher
+from apps.api.services.task_automation import (
+    TaskAutomationService,
+    overdue_tasks_query,
+    reminder_tasks_query,
+)
+from apps.api.services.task_export import NDJSON_MEDIA_TYPE, stream_tasks
+from apps.api.services.task_scheduler import task_scheduler
+from packages.core.schemas.task import (
+    OverdueSweepResponse,
+    ReminderDispatchStatusResponse,
+    SchedulerStatusResponse,
+    TaskListResponse,
+    TaskResponse,
+)
 
 router = APIRouter()
 
 
-def orm_to_pydantic(task_orm) -> Task:
-    """Convert ORM to Pydantic model."""
-    return Task(
-        id=task_orm.id,
-        lead_id=task_orm.lead_id,
-        title=task_orm.title,
-        description=task_orm.description,
-        task_type=task_orm.task_type,
-        status=task_orm.status,
-        priority=task_orm.priority,
-        assigned_to=task_orm.assigned_to,
-        due_date=task_orm.due_date,
-        reminder_at=task_orm.reminder_at,
-        completed_at=task_orm.completed_at,
-        completed_by=task_orm.completed_by,
-        created_at=task_orm.created_at,
-        updated_at=task_orm.updated_at,
-    )
-
-
-@router.get("/overdue", response_model=List[TaskResponse])
+@router.get("/overdue", response_model=TaskListResponse)
 async def get_overdue_tasks(
+    page_size: int = Query(100, ge=1, le=1000),
+    cursor: Optional[str] = None,
+    format: Literal["json", "ndjson"] = "json",
     db: AsyncSession = Depends(get_db),
 ):
-    """Get all overdue tasks."""
+    """Get overdue tasks, earliest due first.
+
+    Pages seek on ``(due_date, id)``; pass ``next_cursor`` back as ``cursor``
+    for the next page. ``format=ndjson`` streams every overdue task (after
+    ``cursor``, if given) instead of one page. Tasks are listed once the
+    overdue sweep has marked them.
+    """
+    after = decode_cursor(cursor, 2) if cursor else None
+    if format == "ndjson":
+        return StreamingResponse(
+            stream_tasks(overdue_tasks_query(after)), media_type=NDJSON_MEDIA_TYPE
+        )
+
     service = TaskAutomationService(db)
-    tasks_orm = await service.get_overdue_tasks()
-    return [TaskResponse(**orm_to_pydantic(t).model_dump()) for t in tasks_orm]
+    tasks_orm = await service.get_overdue_tasks(limit=page_size + 1, after=after)
+
+    return json_response({
+        "tasks": TASK_PLAN.objects_to_dicts(tasks_orm[:page_size]),
+        "page_size": page_size,
+        "next_cursor": next_cursor_for(tasks_orm, page_size, "due_date", "id"),
+    })
+
+
+@router.post("/overdue/sweep", response_model=OverdueSweepResponse)
+async def sweep_overdue():
+    """Mark every pending task past its due date as overdue now."""
+    return await sweep_overdue_tasks()
 
 
 @router.get("/reminders", response_model=List[TaskResponse])
 async def get_tasks_needing_reminders(
+    format: Literal["json", "ndjson"] = "json",
     db: AsyncSession = Depends(get_db),
 ):
-    """Get tasks that need reminders sent."""
+    """Get tasks whose reminder is due and has not been sent, earliest first.
+
+    ``format=ndjson`` streams them one task per line.
+    """
+    if format == "ndjson":
+        return StreamingResponse(stream_tasks(reminder_tasks_query()), media_type=NDJSON_MEDIA_TYPE)
+
     service = TaskAutomationService(db)
     tasks_orm = await service.get_tasks_needing_reminder()
-    return [TaskResponse(**orm_to_pydantic(t).model_dump()) for t in tasks_orm]
+    return json_response(TASK_PLAN.objects_to_dicts(tasks_orm))
+
+
+@router.get("/reminders/dispatch", response_model=ReminderDispatchStatusResponse)
+async def get_reminder_dispatch_status():
+    """Get this worker's reminder dispatch counters, throughput and lag."""
+    return reminder_dispatcher.status()
+
+
+@router.post("/reminders/dispatch", response_model=ReminderDispatchStatusResponse)
+async def dispatch_reminders():
+    """Send every due reminder now, in leased batches, and return the counters."""
+    await reminder_dispatcher.dispatch_due()
+    return reminder_dispatcher.status()
+
+
+@router.get("/scheduler", response_model=SchedulerStatusResponse)
+async def get_scheduler_status():
+    """Get the task deadline scheduler's loaded window, next deadline and counters."""
+    return task_scheduler.status()
 
 
 @router.post("/stale-leads", response_model=List[TaskResponse])
 async def create_stale_lead_tasks(
     days_inactive: int = 7,
+    chunk_size: Optional[int] = Query(None, ge=1, le=50000),
+    dry_run: bool = Query(False, description="Return the tasks without creating them"),
     db: AsyncSession = Depends(get_db),
 ):
-    """Create follow-up tasks for inactive leads."""
+    """Create follow-up tasks for inactive leads.
+
+    The elapsed time is reported in the ``Server-Timing`` header.
+    """
+    started = time.perf_counter()
     service = TaskAutomationService(db)
-    tasks_orm = await service.auto_create_stale_lead_tasks(days_inactive)
-    return [TaskResponse(**orm_to_pydantic(t).model_dump()) for t in tasks_orm]
+    tasks = await service.auto_create_stale_lead_tasks(days_inactive, chunk_size, dry_run)
+    elapsed_ms = (time.perf_counter() - started) * 1000
+
+    response = json_response(tasks)
+    response.headers["Server-Timing"] = f"stale-leads;dur={elapsed_ms:.1f}"
+    return response
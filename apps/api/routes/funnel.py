@@ -1,41 +1,61 @@
 """Funnel analytics API endpoints."""
-from datetime import datetime
-from typing import Optional
+import time
+from datetime import date, datetime
+from typing import Literal, Optional
 
 from fastapi import APIRouter, Depends, Query
 from sqlalchemy import func, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from apps.api.database import get_db
-from apps.api.models import LeadORM
+from apps.api.models import FunnelDailyORM, StageDurationORM
+from apps.api.services.funnel_cohorts import cohort_cache, compute_cohorts
+from apps.api.services.funnel_rollup import funnel_stage_totals, rebuild_funnel_rollup
+from apps.api.services.lead_changes import notify_leads_changed
+from apps.api.services.response_cache import ResponseCache
+from apps.api.services.stage_history import rebuild_stage_durations, stage_duration_summary
 from packages.core.models.lead import LeadStage
-from packages.core.schemas.funnel import FunnelResponse, FunnelStageData
+from packages.core.schemas.funnel import (
+    CohortResponse,
+    FunnelResponse,
+    FunnelRollupRebuildResponse,
+    FunnelStageData,
+)
 
 router = APIRouter()
 
 
+funnel_cache = ResponseCache("funnel", FunnelResponse)
+
+
 @router.get("/", response_model=FunnelResponse)
 async def get_funnel(
     start_date: Optional[datetime] = Query(None),
     end_date: Optional[datetime] = Query(None),
     db: AsyncSession = Depends(get_db),
 ):
-    """Get sales funnel data with conversion metrics."""
-    # Build base query
-    query = select(
-        LeadORM.stage,
-        func.count(LeadORM.id).label("count"),
-        func.coalesce(func.sum(LeadORM.estimated_value), 0).label("total_value"),
-    ).group_by(LeadORM.stage)
-
-    # Apply date filters
-    if start_date:
-        query = query.where(LeadORM.created_at >= start_date)
-    if end_date:
-        query = query.where(LeadORM.created_at <= end_date)
-
-    result = await db.execute(query)
-    stage_data = {stage: (count, total_value) for stage, count, total_value in result.all()}
+    """Get sales funnel data with conversion metrics.
+
+    Answered from the daily rollup; only partial days at the ends of the
+    range touch the leads table. Stage durations cover every completed stay,
+    regardless of the date range. Served from the write-invalidated response
+    cache.
+    """
+    return await funnel_cache.get(
+        lambda: compute_funnel(db, start_date, end_date),
+        start_date=start_date,
+        end_date=end_date,
+    )
+
+
+async def compute_funnel(
+    db: AsyncSession,
+    start_date: Optional[datetime] = None,
+    end_date: Optional[datetime] = None,
+) -> FunnelResponse:
+    """Build the funnel response for leads created in [start_date, end_date]."""
+    stage_data = await funnel_stage_totals(db, start_date, end_date)
+    durations = await stage_duration_summary(db)
 
     # Calculate metrics for each stage
     stages = []
@@ -54,6 +74,7 @@ async def get_funnel(
 
     for idx, stage in enumerate(stage_order):
         count, value = stage_data.get(stage, (0, 0))
+        average_days, median_days = durations.get(stage, (None, None))
 
         # Calculate conversion rate to next stage
         conversion_rate = None
@@ -68,7 +89,8 @@ async def get_funnel(
                 count=count,
                 total_value=float(value),
                 conversion_rate=conversion_rate,
-                average_days=None,  # Would need additional tracking to calculate
+                average_days=average_days,
+                median_days=median_days,
             )
         )
 
@@ -85,3 +107,42 @@ async def get_funnel(
         period_start=start_date,
         period_end=end_date,
     )
+
+
+@router.get("/cohorts", response_model=CohortResponse)
+async def get_cohorts(
+    granularity: Literal["week", "month"] = "month",
+    start_date: Optional[date] = Query(None),
+    end_date: Optional[date] = Query(None),
+    db: AsyncSession = Depends(get_db),
+):
+    """Get stage progression per creation week or month, in total and per source.
+
+    Unlike the stage counts in ``GET /``, each cohort's conversion rate is the
+    share of its own leads that were won.
+    """
+    return await cohort_cache.get(
+        lambda: compute_cohorts(db, granularity, start_date, end_date),
+        granularity=granularity,
+        start_date=start_date,
+        end_date=end_date,
+    )
+
+
+@router.post("/rollup/rebuild", response_model=FunnelRollupRebuildResponse)
+async def rebuild_rollup(
+    db: AsyncSession = Depends(get_db),
+):
+    """Recompute the daily funnel rollup and stage duration summary from scratch."""
+    started = time.perf_counter()
+    await db.run_sync(lambda session: rebuild_funnel_rollup(session.connection()))
+    await db.run_sync(lambda session: rebuild_stage_durations(session.connection()))
+    rows = await db.scalar(select(func.count()).select_from(FunnelDailyORM))
+    duration_rows = await db.scalar(select(func.count()).select_from(StageDurationORM))
+    await db.commit()
+    notify_leads_changed()  # Cached funnels may have been built from a drifted rollup
+    return FunnelRollupRebuildResponse(
+        rows=rows,
+        stage_duration_rows=duration_rows,
+        elapsed_seconds=round(time.perf_counter() - started, 3),
+    )
@@ -1,26 +1,73 @@
 """Lead API endpoints."""
 from datetime import datetime
-from typing import Optional
+from typing import Literal, Optional
 from uuid import UUID
 
-from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy import func, select
+from fastapi import (
+    APIRouter,
+    BackgroundTasks,
+    Depends,
+    File,
+    Form,
+    HTTPException,
+    Query,
+    UploadFile,
+)
+from fastapi.responses import StreamingResponse
+from sqlalchemy import Select, func, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from apps.api.database import get_db
 from apps.api.models import LeadORM
-from packages.core.models.lead import ContactInfo, Lead, LeadStage
+from apps.api.pagination import decode_cursor, next_cursor_for, seek_after_desc
+from apps.api.serialization import LEAD_PLAN, json_response
+from packages.core.models.lead import (
+    ContactInfo,
+    Lead,
+    LeadSource,
+    LeadStage,
+    furthest_pipeline_stage,
+)
 from packages.core.schemas.lead import (
     LeadCreateRequest,
+    LeadImportJobResponse,
     LeadImportRequest,
     LeadImportResponse,
     LeadListResponse,
+    LeadRescoreJobResponse,
     LeadResponse,
     LeadStatsResponse,
     LeadUpdateRequest,
 )
-from packages.ml.lead_scoring import auto_tag_lead, score_lead, suggest_lead_priority
+from packages.ml.lead_scoring import LeadFeatures, current_rules, evaluate
+from apps.api.services.funnel_rollup import FunnelRollupDelta, lead_snapshot, rollup_leads
+from apps.api.services.lead_changes import notify_leads_changed
+from apps.api.services.lead_enrichment import enqueue_lead
+from apps.api.services.lead_export import MEDIA_TYPES, stream_leads
+from apps.api.services.lead_file_import import (
+    create_job,
+    detect_format,
+    get_job,
+    run_import_job,
+    spool_upload,
+)
+from apps.api.services.lead_import import LeadImportService
+from apps.api.services.lead_rescoring import (
+    get_rescore_job,
+    load_checkpoint,
+    run_rescore_job,
+    start_rescore_job,
+)
+from apps.api.services.lead_search import apply_ranked_search, apply_search_filter
+from apps.api.services.lead_stats import compute_lead_stats, lead_stats_cache
+from apps.api.services.stage_history import (
+    StageTransition,
+    record_stage_transitions,
+    remove_stage_history,
+    stage_entered_at,
+)
 from apps.api.services.task_automation import TaskAutomationService
+from apps.api.services.task_scheduler import schedule_task
 
 router = APIRouter()
 
@@ -34,6 +81,9 @@ def orm_to_pydantic(lead_orm: LeadORM) -> Lead:
         stage=lead_orm.stage,
         priority=lead_orm.priority,
         score=lead_orm.score,
+        scoring_version=lead_orm.scoring_version,
+        ai_score=lead_orm.ai_score,
+        enriched_at=lead_orm.enriched_at,
         contact_info=ContactInfo(**lead_orm.contact_info) if lead_orm.contact_info else ContactInfo(),
         tags=lead_orm.tags or [],
         product_interest=lead_orm.product_interest,
@@ -51,31 +101,32 @@ def orm_to_pydantic(lead_orm: LeadORM) -> Lead:
     )
 
 
+def filter_leads(
+    query: Select,
+    stage: Optional[LeadStage],
+    source: Optional[str],
+    search: Optional[str],
+    dialect: str,
+) -> Select:
+    """Apply the lead list filters shared by listing and export."""
+    if stage:
+        query = query.where(LeadORM.stage == stage)
+    if source:
+        query = query.where(LeadORM.source == source)
+    if search:
+        query = apply_search_filter(query, search, dialect)
+    return query
+
+
 @router.post("/", response_model=LeadResponse, status_code=201)
 async def create_lead(
     request: LeadCreateRequest,
     db: AsyncSession = Depends(get_db),
 ):
     """Create a new lead with AI scoring and auto-tagging."""
-    # Create initial lead for scoring
-    temp_lead = Lead(
-        name=request.name,
-        source=request.source,
-        contact_info=request.contact_info,
-        tags=request.tags,
-        product_interest=request.product_interest,
-        estimated_value=request.estimated_value,
-        notes=request.notes,
-        utm_source=request.utm_source,
-        utm_medium=request.utm_medium,
-        utm_campaign=request.utm_campaign,
-        referrer_url=request.referrer_url,
-    )
-
     # AI scoring and tagging
-    score = score_lead(temp_lead)
-    suggested_tags = auto_tag_lead(temp_lead)
-    suggested_priority = suggest_lead_priority(temp_lead)
+    rules = current_rules()
+    score, suggested_tags, suggested_priority = evaluate(LeadFeatures.from_lead(request), rules)
 
     # Merge user tags with AI suggested tags
     all_tags = list(set(request.tags + suggested_tags))
@@ -84,6 +135,7 @@ async def create_lead(
         name=request.name,
         source=request.source,
         score=score,
+        scoring_version=rules.version,
         priority=suggested_priority,
         contact_info=request.contact_info.model_dump(),
         tags=all_tags,
@@ -97,8 +149,12 @@ async def create_lead(
     )
 
     db.add(lead_orm)
+    await db.flush()
+    await rollup_leads(db, [lead_orm])
     await db.commit()
     await db.refresh(lead_orm)
+    notify_leads_changed()
+    enqueue_lead(lead_orm.id)
 
     lead = orm_to_pydantic(lead_orm)
     return LeadResponse(**lead.model_dump())
@@ -111,43 +167,126 @@ async def list_leads(
     stage: Optional[LeadStage] = None,
     source: Optional[str] = None,
     search: Optional[str] = None,
+    pagination: Literal["offset", "cursor"] = "offset",
+    cursor: Optional[str] = None,
+    include_total: bool = False,
     db: AsyncSession = Depends(get_db),
 ):
-    """List leads with pagination and filtering."""
-    query = select(LeadORM)
+    """List leads with pagination and filtering.
 
-    # Filters
-    if stage:
-        query = query.where(LeadORM.stage == stage)
-    if source:
-        query = query.where(LeadORM.source == source)
-    if search:
-        query = query.where(
-            (LeadORM.name.ilike(f"%{search}%"))
-            | (LeadORM.contact_info["email"].as_string().ilike(f"%{search}%"))
-        )
+    Offset mode (default) returns page numbers and totals. Cursor mode (``pagination=cursor``
+    or any ``cursor`` value) seeks on ``(created_at, id)`` and only counts when
+    ``include_total`` is set.
+    """
+    query = filter_leads(select(*LEAD_PLAN.columns), stage, source, search, db.bind.dialect.name)
 
-    # Count total
-    count_query = select(func.count()).select_from(query.subquery())
-    result = await db.execute(count_query)
-    total = result.scalar_one()
+    cursor_mode = pagination == "cursor" or cursor is not None
 
-    # Paginate
-    query = query.order_by(LeadORM.created_at.desc())
-    query = query.offset((page - 1) * page_size).limit(page_size)
+    # Count total
+    total = None
+    if not cursor_mode or include_total:
+        count_query = select(func.count()).select_from(query.subquery())
+        result = await db.execute(count_query)
+        total = result.scalar_one()
+
+    query = query.order_by(LeadORM.created_at.desc(), LeadORM.id.desc())
+
+    if cursor_mode:
+        # Seek past the last row of the previous page; fetch one extra row to detect more
+        if cursor:
+            created_at, lead_id = decode_cursor(cursor, 2)
+            query = query.where(
+                seek_after_desc((LeadORM.created_at, LeadORM.id), (created_at, lead_id))
+            )
+        query = query.limit(page_size + 1)
+    else:
+        query = query.offset((page - 1) * page_size).limit(page_size)
 
     result = await db.execute(query)
-    leads_orm = result.scalars().all()
+    rows = result.all()
+
+    next_cursor = None
+    if cursor_mode:
+        next_cursor = next_cursor_for(rows, page_size, "created_at", "id")
+        rows = rows[:page_size]
+
+    return json_response({
+        "leads": LEAD_PLAN.rows_to_dicts(rows),
+        "total": total,
+        "page": None if cursor_mode else page,
+        "page_size": page_size,
+        "total_pages": (total + page_size - 1) // page_size if total is not None else None,
+        "next_cursor": next_cursor,
+    })
+
+
+@router.get("/export")
+async def export_leads(
+    format: Literal["csv", "ndjson"] = "csv",
+    stage: Optional[LeadStage] = None,
+    source: Optional[str] = None,
+    search: Optional[str] = None,
+    db: AsyncSession = Depends(get_db),
+):
+    """Stream all leads matching the list filters as CSV or NDJSON."""
+    query = filter_leads(select(LeadORM), stage, source, search, db.bind.dialect.name)
+    query = query.order_by(LeadORM.created_at.desc(), LeadORM.id.desc())
+
+    filename = f"leads-{datetime.utcnow():%Y%m%d-%H%M%S}.{format}"
+    return StreamingResponse(
+        stream_leads(query, format),
+        media_type=MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
 
-    leads = [LeadResponse(**orm_to_pydantic(lead).model_dump()) for lead in leads_orm]
 
-    return LeadListResponse(
-        leads=leads,
-        total=total,
-        page=page,
-        page_size=page_size,
-        total_pages=(total + page_size - 1) // page_size,
-    )
+@router.get("/search", response_model=list[LeadResponse])
+async def search_leads(
+    q: str = Query(..., min_length=1, max_length=200),
+    limit: int = Query(20, ge=1, le=100),
+    db: AsyncSession = Depends(get_db),
+):
+    """Search leads by name, email, company, notes and product interest, best matches first.
+
+    Every term is matched as a prefix, so ``acm sol`` finds "Acme Solutions".
+    """
+    query = apply_ranked_search(select(*LEAD_PLAN.columns), q, db.bind.dialect.name)
+
+    result = await db.execute(query.limit(limit))
+    return json_response(LEAD_PLAN.rows_to_dicts(result.all()))
+
+
+@router.post("/rescore", response_model=LeadRescoreJobResponse, status_code=202)
+async def rescore_leads(
+    background_tasks: BackgroundTasks,
+    restart: bool = Query(False, description="Ignore an unfinished checkpoint and start over"),
+    chunk_size: Optional[int] = Query(None, ge=1, le=50000),
+    workers: Optional[int] = Query(None, ge=0, le=32),
+    stale_only: bool = Query(False, description="Only leads scored by an older rule set"),
+):
+    """Recompute score, priority and suggested tags for every lead in the background.
+
+    Resumes from the last checkpoint of an interrupted run. Poll
+    ``GET /rescore`` for progress.
+    """
+    try:
+        job = start_rescore_job()
+    except RuntimeError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+
+    background_tasks.add_task(run_rescore_job, job, restart, chunk_size, workers, stale_only)
+    return job
+
+
+@router.get("/rescore", response_model=LeadRescoreJobResponse)
+async def get_rescore_status():
+    """Get progress of the current rescoring run, or the persisted checkpoint."""
+    job = get_rescore_job() or await load_checkpoint()
+
+    if not job:
+        raise HTTPException(status_code=404, detail="No rescoring job has run")
+
+    return job
 
 
 @router.get("/{lead_id}", response_model=LeadResponse)
@@ -179,8 +318,10 @@ async def update_lead(
     if not lead_orm:
         raise HTTPException(status_code=404, detail="Lead not found")
 
-    # Track old stage for automation
+    # Track old stage for automation, stage history and the funnel rollup row
     old_stage = lead_orm.stage
+    old_stage_entered_at = stage_entered_at(lead_orm)
+    old_snapshot = lead_snapshot(lead_orm)
 
     # Update fields
     update_data = request.model_dump(exclude_unset=True)
@@ -200,13 +341,30 @@ async def update_lead(
 
     lead_orm.updated_at = datetime.utcnow()
 
-    await db.commit()
-    await db.refresh(lead_orm)
+    if lead_orm.stage != old_stage:
+        await record_stage_transitions(
+            db,
+            [StageTransition(lead_orm.id, old_stage, old_stage_entered_at, lead_orm.updated_at)],
+        )
+        lead_orm.stage_entered_at = lead_orm.updated_at
+        lead_orm.furthest_stage = furthest_pipeline_stage(
+            lead_orm.furthest_stage, old_stage, lead_orm.stage
+        )
+
+    rollup = FunnelRollupDelta()
+    rollup.move(old_snapshot, lead_snapshot(lead_orm))
+    await rollup.apply(db)
 
-    # Auto-create tasks on stage change
+    # Auto-create tasks on stage change, flushed and committed with the lead
+    tasks = []
     if request.stage and request.stage != old_stage:
-        task_service = TaskAutomationService(db)
-        await task_service.create_stage_transition_tasks(lead_id, request.stage)
+        tasks = TaskAutomationService(db).create_stage_transition_tasks(lead_orm, request.stage)
+
+    # Every column is set client-side, so the loaded lead needs no refresh
+    await db.commit()
+    notify_leads_changed()
+    for task in tasks:
+        schedule_task(task)
 
     lead = orm_to_pydantic(lead_orm)
     return LeadResponse(**lead.model_dump())
@@ -224,101 +382,58 @@ async def delete_lead(
     if not lead_orm:
         raise HTTPException(status_code=404, detail="Lead not found")
 
+    await rollup_leads(db, [lead_orm], sign=-1)
+    await remove_stage_history(db, [lead_orm.id])
     await db.delete(lead_orm)
     await db.commit()
+    notify_leads_changed()
 
 
 @router.post("/import", response_model=LeadImportResponse)
 async def import_leads(
     request: LeadImportRequest,
+    chunk_size: Optional[int] = Query(None, ge=1, le=5000),
     db: AsyncSession = Depends(get_db),
 ):
-    """Bulk import leads."""
-    successful = 0
-    failed = 0
-    errors = []
-
-    for idx, lead_data in enumerate(request.leads):
-        try:
-            lead_orm = LeadORM(
-                name=lead_data.name,
-                source=request.source,
-                contact_info=lead_data.contact_info.model_dump(),
-                tags=lead_data.tags,
-                product_interest=lead_data.product_interest,
-                estimated_value=lead_data.estimated_value,
-                notes=lead_data.notes,
-                utm_source=lead_data.utm_source,
-                utm_medium=lead_data.utm_medium,
-                utm_campaign=lead_data.utm_campaign,
-                referrer_url=lead_data.referrer_url,
-            )
-            db.add(lead_orm)
-            successful += 1
-        except Exception as e:
-            failed += 1
-            errors.append({
-                "index": idx,
-                "name": lead_data.name,
-                "error": str(e),
-            })
+    """Bulk import leads with scoring and tagging, inserted in chunks."""
+    service = LeadImportService(db, chunk_size=chunk_size)
+    return await service.import_leads(request.leads, source=request.source)
+
+
+@router.post("/import/file", response_model=LeadImportJobResponse, status_code=202)
+async def import_leads_file(
+    background_tasks: BackgroundTasks,
+    file: UploadFile = File(...),
+    format: Optional[Literal["csv", "ndjson"]] = Form(None),
+    source: LeadSource = Form(LeadSource.IMPORT),
+    chunk_size: Optional[int] = Form(None, ge=1, le=5000),
+):
+    """Import leads from an uploaded CSV or NDJSON file as a background job.
 
-    await db.commit()
+    Poll ``GET /import/jobs/{job_id}`` for progress.
+    """
+    file_format = detect_format(file, format)
+    path, size = await spool_upload(file)
 
-    return LeadImportResponse(
-        total=len(request.leads),
-        successful=successful,
-        failed=failed,
-        errors=errors,
-    )
+    job = create_job(file.filename, file_format, source, size)
+    background_tasks.add_task(run_import_job, job, path, chunk_size)
+    return job
 
 
-@router.get("/stats/overview", response_model=LeadStatsResponse)
-async def get_lead_stats(
-    db: AsyncSession = Depends(get_db),
-):
-    """Get lead statistics overview."""
-    # Total leads
-    result = await db.execute(select(func.count(LeadORM.id)))
-    total_leads = result.scalar_one()
-
-    # By stage
-    result = await db.execute(
-        select(LeadORM.stage, func.count(LeadORM.id))
-        .group_by(LeadORM.stage)
-    )
-    by_stage = {str(stage): count for stage, count in result.all()}
+@router.get("/import/jobs/{job_id}", response_model=LeadImportJobResponse)
+async def get_import_job(job_id: UUID):
+    """Get progress of a background file import."""
+    job = get_job(job_id)
 
-    # By source
-    result = await db.execute(
-        select(LeadORM.source, func.count(LeadORM.id))
-        .group_by(LeadORM.source)
-    )
-    by_source = {str(source): count for source, count in result.all()}
+    if not job:
+        raise HTTPException(status_code=404, detail="Import job not found")
 
-    # By priority
-    result = await db.execute(
-        select(LeadORM.priority, func.count(LeadORM.id))
-        .group_by(LeadORM.priority)
-    )
-    by_priority = {str(priority): count for priority, count in result.all()}
+    return job
 
-    # Average score
-    result = await db.execute(select(func.avg(LeadORM.score)))
-    average_score = result.scalar_one() or 0.0
 
-    # Total estimated value
-    result = await db.execute(
-        select(func.sum(LeadORM.estimated_value))
-        .where(LeadORM.estimated_value.isnot(None))
-    )
-    total_estimated_value = result.scalar_one() or 0.0
-
-    return LeadStatsResponse(
-        total_leads=total_leads,
-        by_stage=by_stage,
-        by_source=by_source,
-        by_priority=by_priority,
-        average_score=float(average_score),
-        total_estimated_value=float(total_estimated_value),
-    )
+@router.get("/stats/overview", response_model=LeadStatsResponse)
+async def get_lead_stats(
+    db: AsyncSession = Depends(get_db),
+):
+    """Get lead statistics overview, served from the write-invalidated response cache."""
+    return await lead_stats_cache.get(lambda: compute_lead_stats(db))
@@ -0,0 +1,64 @@
+"""Scoring rules API endpoints."""
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from apps.api.database import get_db
+from apps.api.services.lead_enrichment import enrichment_queue
+from apps.api.services.scoring_rules import (
+    RulesVersionConflict,
+    count_stale_leads,
+    reload_scoring_rules,
+    rules_loaded_at,
+    rules_loaded_from,
+)
+from packages.core.schemas.scoring import EnrichmentStatusResponse, ScoringRulesResponse
+from packages.ml.lead_scoring import current_rules, scorer
+from packages.ml.scoring_rules import RuleSet
+
+router = APIRouter()
+
+
+async def rules_response(rules: RuleSet, db: AsyncSession) -> ScoringRulesResponse:
+    """Describe `rules` along with the number of leads still to rescore."""
+    return ScoringRulesResponse(
+        version=rules.version,
+        path=rules_loaded_from(),
+        loaded_at=rules_loaded_at(),
+        stale_leads=await count_stale_leads(db, rules.version),
+        rules=rules.rules,
+        model=rules.model.describe() if rules.model else None,
+        memo=scorer.memo.stats(),
+    )
+
+
+@router.get("/rules", response_model=ScoringRulesResponse)
+async def get_scoring_rules(
+    db: AsyncSession = Depends(get_db),
+):
+    """Get the active scoring rules and model, stale lead count and score memo hit rate."""
+    return await rules_response(current_rules(), db)
+
+
+@router.post("/rules/reload", response_model=ScoringRulesResponse)
+async def reload_rules(
+    db: AsyncSession = Depends(get_db),
+):
+    """Reload the scoring rules file and model artifact without a restart.
+
+    Follow up with ``POST /api/v1/leads/rescore?stale_only=true`` to bring
+    existing leads onto the new version.
+    """
+    try:
+        rules = reload_scoring_rules()
+    except RulesVersionConflict as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    except (OSError, ValueError) as e:
+        raise HTTPException(status_code=400, detail=f"Invalid scoring rules: {e}")
+
+    return await rules_response(rules, db)
+
+
+@router.get("/enrichment", response_model=EnrichmentStatusResponse)
+async def get_enrichment_status():
+    """Get the LLM enrichment queue depth, cache hit rate and call counters."""
+    return enrichment_queue.status()
@@ -1,6 +1,6 @@
 """Task API endpoints."""
-from datetime import datetime
-from typing import Optional
+from datetime import datetime, timezone
+from typing import Literal, Optional
 from uuid import UUID
 
 from fastapi import APIRouter, Depends, HTTPException, Query
@@ -9,6 +9,9 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 from apps.api.database import get_db
 from apps.api.models import TaskORM
+from apps.api.pagination import decode_cursor, next_cursor_for, seek_after
+from apps.api.serialization import TASK_PLAN, json_response
+from apps.api.services.task_scheduler import schedule_task, unschedule_task
 from packages.core.models.task import Task, TaskStatus
 from packages.core.schemas.task import (
     TaskCreateRequest,
@@ -33,6 +36,7 @@ def orm_to_pydantic(task_orm: TaskORM) -> Task:
         assigned_to=task_orm.assigned_to,
         due_date=task_orm.due_date,
         reminder_at=task_orm.reminder_at,
+        reminded_at=task_orm.reminded_at,
         completed_at=task_orm.completed_at,
         completed_by=task_orm.completed_by,
         created_at=task_orm.created_at,
@@ -60,6 +64,7 @@ async def create_task(
     db.add(task_orm)
     await db.commit()
     await db.refresh(task_orm)
+    schedule_task(task_orm)
 
     task = orm_to_pydantic(task_orm)
     return TaskResponse(**task.model_dump())
@@ -72,10 +77,19 @@ async def list_tasks(
     lead_id: Optional[UUID] = None,
     status: Optional[TaskStatus] = None,
     assigned_to: Optional[UUID] = None,
+    pagination: Literal["offset", "cursor"] = "offset",
+    cursor: Optional[str] = None,
+    include_total: bool = False,
     db: AsyncSession = Depends(get_db),
 ):
-    """List tasks with pagination and filtering."""
-    query = select(TaskORM)
+    """List tasks with pagination and filtering.
+
+    Tasks are ordered by due date (undated last), then newest first. Offset mode
+    (default) returns page numbers and totals. Cursor mode (``pagination=cursor``
+    or any ``cursor`` value) seeks on ``(due_date, created_at, id)`` and only
+    counts when ``include_total`` is set.
+    """
+    query = select(*TASK_PLAN.columns)
 
     # Filters
     if lead_id:
@@ -85,27 +99,50 @@ async def list_tasks(
     if assigned_to:
         query = query.where(TaskORM.assigned_to == assigned_to)
 
+    cursor_mode = pagination == "cursor" or cursor is not None
+
     # Count total
-    count_query = select(func.count()).select_from(query.subquery())
-    result = await db.execute(count_query)
-    total = result.scalar_one()
+    total = None
+    if not cursor_mode or include_total:
+        count_query = select(func.count()).select_from(query.subquery())
+        result = await db.execute(count_query)
+        total = result.scalar_one()
+
+    query = query.order_by(
+        TaskORM.due_date.asc().nullslast(), TaskORM.created_at.desc(), TaskORM.id.desc()
+    )
 
-    # Paginate
-    query = query.order_by(TaskORM.due_date.asc().nullslast(), TaskORM.created_at.desc())
-    query = query.offset((page - 1) * page_size).limit(page_size)
+    if cursor_mode:
+        # Seek past the last row of the previous page; fetch one extra row to detect more
+        if cursor:
+            query = query.where(
+                seek_after(
+                    (TaskORM.due_date, TaskORM.created_at, TaskORM.id),
+                    decode_cursor(cursor, 3),
+                    descending=(False, True, True),
+                    nullable=(True,),
+                )
+            )
+        query = query.limit(page_size + 1)
+    else:
+        query = query.offset((page - 1) * page_size).limit(page_size)
 
     result = await db.execute(query)
-    tasks_orm = result.scalars().all()
+    rows = result.all()
 
-    tasks = [TaskResponse(**orm_to_pydantic(task).model_dump()) for task in tasks_orm]
+    next_cursor = None
+    if cursor_mode:
+        next_cursor = next_cursor_for(rows, page_size, "due_date", "created_at", "id")
+        rows = rows[:page_size]
 
-    return TaskListResponse(
-        tasks=tasks,
-        total=total,
-        page=page,
-        page_size=page_size,
-        total_pages=(total + page_size - 1) // page_size,
-    )
+    return json_response({
+        "tasks": TASK_PLAN.rows_to_dicts(rows),
+        "total": total,
+        "page": None if cursor_mode else page,
+        "page_size": page_size,
+        "total_pages": (total + page_size - 1) // page_size if total is not None else None,
+        "next_cursor": next_cursor,
+    })
 
 
 @router.get("/{task_id}", response_model=TaskResponse)
@@ -138,10 +175,27 @@ async def update_task(
         raise HTTPException(status_code=404, detail="Task not found")
 
     # Update fields
+    old_reminder_at = task_orm.reminder_at
     update_data = request.model_dump(exclude_unset=True)
     for field, value in update_data.items():
         setattr(task_orm, field, value)
 
+    # A moved reminder is sent again at its new time
+    if "reminder_at" in update_data and task_orm.reminder_at != old_reminder_at:
+        task_orm.reminded_at = None
+
+    # An overdue task whose due date moved into the future is pending again
+    if (
+        task_orm.status == TaskStatus.OVERDUE
+        and "status" not in update_data
+        and "due_date" in update_data
+    ):
+        due_date = task_orm.due_date
+        if due_date is not None and due_date.tzinfo is not None:
+            due_date = due_date.astimezone(timezone.utc).replace(tzinfo=None)
+        if due_date is None or due_date > datetime.utcnow():
+            task_orm.status = TaskStatus.PENDING
+
     # Track completion
     if request.status and request.status == TaskStatus.COMPLETED and not task_orm.completed_at:
         task_orm.completed_at = datetime.utcnow()
@@ -152,6 +206,7 @@ async def update_task(
 
     await db.commit()
     await db.refresh(task_orm)
+    schedule_task(task_orm)
 
     task = orm_to_pydantic(task_orm)
     return TaskResponse(**task.model_dump())
@@ -171,3 +226,4 @@ async def delete_task(
 
     await db.delete(task_orm)
     await db.commit()
+    unschedule_task(task_id)
@@ -11,6 +11,9 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 from apps.api.database import get_db
 from apps.api.models import WidgetORM, LeadORM
+from apps.api.services.funnel_rollup import rollup_leads
+from apps.api.services.lead_changes import notify_leads_changed
+from apps.api.services.lead_enrichment import enqueue_lead
 from packages.core.models.lead import LeadSource
 from packages.core.schemas.widget import (
     WidgetCreateRequest,
@@ -18,7 +21,7 @@ from packages.core.schemas.widget import (
     WidgetConfigResponse,
     WidgetFormSubmission,
 )
-from packages.ml.lead_scoring import auto_tag_lead, score_lead, suggest_lead_priority
+from packages.ml.lead_scoring import LeadFeatures, current_rules, evaluate
 
 router = APIRouter()
 
@@ -140,32 +143,24 @@ async def submit_widget_form(
     if not widget:
         raise HTTPException(status_code=404, detail="Widget not found")
 
-    # Create lead from submission
-    from packages.core.models.lead import Lead, ContactInfo
-
-    temp_lead = Lead(
-        name=submission.name,
+    # AI scoring and tagging on exactly what is stored
+    features = LeadFeatures(
         source=LeadSource.WEB_FORM,
-        contact_info=ContactInfo(
-            email=submission.email,
-            phone=submission.phone,
-            company=submission.company,
-        ),
-        notes=submission.message,
         estimated_value=submission.estimated_value,
-        referrer_url=submission.referrer,
-        utm_source="widget",
+        has_email=bool(submission.email),
+        has_phone=bool(submission.phone),
+        has_company=bool(submission.company),
+        has_utm_source=True,
+        has_utm_medium=bool(widget_id),
     )
-
-    # AI scoring and tagging
-    score = score_lead(temp_lead)
-    suggested_tags = auto_tag_lead(temp_lead)
-    suggested_priority = suggest_lead_priority(temp_lead)
+    rules = current_rules()
+    score, suggested_tags, suggested_priority = evaluate(features, rules)
 
     lead_orm = LeadORM(
         name=submission.name,
         source=LeadSource.WEB_FORM,
         score=score,
+        scoring_version=rules.version,
         priority=suggested_priority,
         contact_info={
             "email": submission.email,
@@ -181,7 +176,11 @@ async def submit_widget_form(
     )
 
     db.add(lead_orm)
+    await db.flush()
+    await rollup_leads(db, [lead_orm])
     await db.commit()
+    notify_leads_changed()
+    enqueue_lead(lead_orm.id)
 
     return {
         "success": True,
@@ -0,0 +1,122 @@
+"""Fast row-to-JSON encoding for list endpoints.
+
+List endpoints select plain column tuples and encode them straight to JSON
+bytes with a precompiled field plan, skipping the ORM -> business model ->
+response model -> re-validation round trip. The plans produce exactly the
+shape of the matching ``*Response`` schema, which stays on the route as
+``response_model`` for the OpenAPI docs.
+"""
+from operator import attrgetter
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence
+
+import orjson
+from fastapi.responses import Response
+from sqlalchemy.sql.elements import ColumnElement
+
+from apps.api.models import LeadORM, TaskORM
+from packages.core.models.lead import ContactInfo
+
+Converter = Callable[[Any], Any]
+
+
+class FieldPlan:
+    """Precompiled mapping from column tuples to response dicts."""
+
+    def __init__(
+        self,
+        columns: Sequence[ColumnElement],
+        converters: Optional[Dict[str, Converter]] = None,
+    ):
+        """Compile the plan for `columns`, applying `converters` by column key."""
+        self.columns = list(columns)
+        self.keys = tuple(column.key for column in self.columns)
+        self._converters = [
+            (key, converter) for key, converter in (converters or {}).items()
+        ]
+        self._getter = attrgetter(*self.keys)
+
+    def row_to_dict(self, row: Sequence[Any]) -> Dict[str, Any]:
+        """Convert a selected row (or any tuple in column order) to a response dict."""
+        record = dict(zip(self.keys, row))
+        for key, converter in self._converters:
+            record[key] = converter(record[key])
+        return record
+
+    def rows_to_dicts(self, rows: Iterable[Sequence[Any]]) -> List[Dict[str, Any]]:
+        """Convert selected rows to response dicts."""
+        return [self.row_to_dict(row) for row in rows]
+
+    def objects_to_dicts(self, objects: Iterable[Any]) -> List[Dict[str, Any]]:
+        """Convert already-loaded ORM objects to response dicts."""
+        return [self.row_to_dict(self._getter(obj)) for obj in objects]
+
+
+_CONTACT_FIELDS = tuple(ContactInfo.model_fields)
+
+
+def _contact_info(value: Optional[dict]) -> Dict[str, Any]:
+    value = value or {}
+    return {field: value.get(field) for field in _CONTACT_FIELDS}
+
+
+def _tags(value: Optional[list]) -> list:
+    return value or []
+
+
+LEAD_PLAN = FieldPlan(
+    [
+        LeadORM.id,
+        LeadORM.name,
+        LeadORM.source,
+        LeadORM.stage,
+        LeadORM.priority,
+        LeadORM.score,
+        LeadORM.scoring_version,
+        LeadORM.ai_score,
+        LeadORM.enriched_at,
+        LeadORM.contact_info,
+        LeadORM.tags,
+        LeadORM.product_interest,
+        LeadORM.estimated_value,
+        LeadORM.notes,
+        LeadORM.utm_source,
+        LeadORM.utm_medium,
+        LeadORM.utm_campaign,
+        LeadORM.referrer_url,
+        LeadORM.assigned_to,
+        LeadORM.created_at,
+        LeadORM.updated_at,
+        LeadORM.contacted_at,
+        LeadORM.closed_at,
+    ],
+    converters={"contact_info": _contact_info, "tags": _tags},
+)
+
+TASK_PLAN = FieldPlan(
+    [
+        TaskORM.id,
+        TaskORM.lead_id,
+        TaskORM.title,
+        TaskORM.description,
+        TaskORM.task_type,
+        TaskORM.status,
+        TaskORM.priority,
+        TaskORM.assigned_to,
+        TaskORM.due_date,
+        TaskORM.reminder_at,
+        TaskORM.reminded_at,
+        TaskORM.completed_at,
+        TaskORM.completed_by,
+        TaskORM.created_at,
+        TaskORM.updated_at,
+    ]
+)
+
+
+def json_response(content: Any, status_code: int = 200) -> Response:
+    """Encode `content` with orjson, which handles UUIDs, datetimes and enums natively."""
+    return Response(
+        content=orjson.dumps(content),
+        status_code=status_code,
+        media_type="application/json",
+    )
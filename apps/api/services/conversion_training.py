@@ -0,0 +1,69 @@
+"""Offline training of the lead conversion model from closed leads.
+
+Usage:
+    python -m apps.api.services.conversion_training --output models/conversion.npy
+
+Point ``SCORING_MODEL_PATH`` at the output and reload the scoring rules (or
+restart) to score new leads with the model.
+"""
+import argparse
+import asyncio
+import json
+from typing import Any, Dict, Tuple
+
+import numpy as np
+from sqlalchemy import select
+
+from apps.api.database import AsyncSessionLocal
+from apps.api.models import LeadORM
+from apps.api.services.lead_rescoring import FEATURE_COLUMNS, feature_columns
+from packages.core.models.lead import LeadStage
+from packages.ml.conversion_model import save_model, train
+
+TRAINING_BATCH_SIZE = 10000
+
+
+async def load_training_data() -> Tuple[Dict[str, Any], np.ndarray]:
+    """Read the features of every WON or LOST lead, labelled 1 for WON."""
+    query = (
+        select(LeadORM.stage, *FEATURE_COLUMNS)
+        .where(LeadORM.stage.in_([LeadStage.WON, LeadStage.LOST]))
+        .execution_options(yield_per=TRAINING_BATCH_SIZE)
+    )
+
+    rows = []
+    async with AsyncSessionLocal() as db:
+        result = await db.stream(query)
+        async for partition in result.partitions():
+            rows.extend(partition)
+
+    labels = np.array([row[0] == LeadStage.WON for row in rows], dtype=np.int8)
+    return feature_columns(rows, offset=1), labels
+
+
+async def train_conversion_model(
+    output: str, l2: float = 1.0, holdout: float = 0.2
+) -> Dict[str, Any]:
+    """Train on closed leads, write the artifact and return its metadata."""
+    columns, labels = await load_training_data()
+    weights, metadata = train(columns, labels, l2=l2, holdout=holdout)
+    metadata["version"] = save_model(output, weights, metadata)
+    return metadata
+
+
+def main() -> None:
+    """Command line entry point."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--output", required=True, help="Artifact path (.npy)")
+    parser.add_argument("--l2", type=float, default=1.0, help="L2 regularization strength")
+    parser.add_argument(
+        "--holdout", type=float, default=0.2, help="Share of leads held out for metrics"
+    )
+    args = parser.parse_args()
+
+    metadata = asyncio.run(train_conversion_model(args.output, args.l2, args.holdout))
+    print(json.dumps(metadata, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,135 @@
+"""Creation-cohort funnel analysis over the daily rollup.
+
+Leads are grouped by the week or month they were created in, and for each
+cohort (and each source within it) we count how many reached at least each
+pipeline stage. Everything comes from one conditional-aggregation query over
+``funnel_daily``, whose rows are already per creation day and carry the
+reached-stage counts, so the cost depends on the number of days in range
+rather than the number of leads.
+"""
+from datetime import date
+from typing import Dict, Literal, Optional
+
+from sqlalchemy import Date, case, cast, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from apps.api.models import FunnelDailyORM
+from apps.api.services.response_cache import ResponseCache
+from packages.core.models.lead import PIPELINE_STAGES, LeadSource, LeadStage
+from packages.core.schemas.funnel import CohortData, CohortResponse
+
+Granularity = Literal["week", "month"]
+
+# Forward pipeline order; LOST is reported separately
+PIPELINE = PIPELINE_STAGES
+
+_rollup = FunnelDailyORM.__table__
+
+
+def cohort_start(day_column, granularity: Granularity, dialect: str):
+    """SQL expression for the first day of the week (Monday) or month containing a day."""
+    if dialect == "postgresql":
+        return cast(func.date_trunc(granularity, day_column), Date)
+    if granularity == "week":
+        return func.date(day_column, "weekday 0", "-6 days")
+    return func.strftime("%Y-%m-01", day_column)
+
+
+async def compute_cohorts(
+    db: AsyncSession,
+    granularity: Granularity,
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+) -> CohortResponse:
+    """Stage progression per creation cohort and per (cohort, source), in one query.
+
+    A lead counts as having reached every pipeline stage up to the furthest
+    one it has been in, so lost leads count up to the stage they were lost
+    from. Leads lost before stage tracking began count as reaching NEW only.
+    """
+    cohort = cohort_start(_rollup.c.day, granularity, db.bind.dialect.name).label("cohort")
+    stage = _rollup.c.stage
+    count = _rollup.c.lead_count
+
+    reached = [
+        func.sum(_rollup.c[f"reached_{s.value}"]).label(f"reached_{s.value}")
+        for s in PIPELINE[1:]  # Every lead reached NEW; that is the cohort size
+    ]
+    query = (
+        select(
+            cohort,
+            _rollup.c.source,
+            func.sum(count).label("leads"),
+            *reached,
+            func.sum(case((stage == LeadStage.LOST, count), else_=0)).label("lost"),
+            func.sum(case((stage == LeadStage.WON, _rollup.c.value_sum), else_=0.0)).label(
+                "won_value"
+            ),
+        )
+        .where(count > 0)
+        .group_by(cohort, _rollup.c.source)
+        .order_by(cohort, _rollup.c.source)
+    )
+    if start_date:
+        query = query.where(_rollup.c.day >= start_date)
+    if end_date:
+        query = query.where(_rollup.c.day <= end_date)
+
+    totals: Dict[date, CohortData] = {}
+    by_source = []
+    for row in (await db.execute(query)).all():
+        cohort_day = row.cohort if isinstance(row.cohort, date) else date.fromisoformat(row.cohort)
+        data = _cohort_data(cohort_day, row.source, row)
+        by_source.append(data)
+
+        total = totals.get(cohort_day)
+        if total is None:
+            totals[cohort_day] = data.model_copy(
+                update={"source": None, "reached": dict(data.reached)}
+            )
+        else:
+            _merge(total, data)
+
+    for data in totals.values():
+        data.conversion_rate = _rate(data.reached[LeadStage.WON], data.leads)
+
+    return CohortResponse(
+        granularity=granularity,
+        start_date=start_date,
+        end_date=end_date,
+        stages=PIPELINE,
+        cohorts=list(totals.values()),
+        by_source=by_source,
+    )
+
+
+def _cohort_data(cohort: date, source: LeadSource, row) -> CohortData:
+    leads = int(row.leads or 0)
+    reached = {LeadStage.NEW: leads}
+    for stage in PIPELINE[1:]:
+        reached[stage] = int(getattr(row, f"reached_{stage.value}") or 0)
+    return CohortData(
+        cohort=cohort,
+        source=source,
+        leads=leads,
+        reached=reached,
+        lost=int(row.lost or 0),
+        won_value=float(row.won_value or 0.0),
+        conversion_rate=_rate(reached[LeadStage.WON], leads),
+    )
+
+
+def _merge(total: CohortData, data: CohortData) -> None:
+    total.leads += data.leads
+    total.lost += data.lost
+    total.won_value += data.won_value
+    for stage, count in data.reached.items():
+        total.reached[stage] += count
+
+
+def _rate(part: int, whole: int) -> float:
+    return round(part / whole * 100, 2) if whole else 0.0
+
+
+# Global cache instance
+cohort_cache = ResponseCache("funnel_cohorts", CohortResponse)
@@ -0,0 +1,302 @@
+"""Daily funnel rollup: incremental maintenance, rebuild and range queries.
+
+``funnel_daily`` holds one row per (creation day, stage, source, campaign)
+with the lead count, the estimated value sum and how many of those leads
+reached at least each pipeline stage (by ``leads.furthest_stage``, so a lead
+lost after PROPOSAL still counts up to PROPOSAL). Write paths collect their
+changes in a `FunnelRollupDelta` and apply it in the same transaction as
+the lead write, so the rollup never drifts from ``leads`` on commit or
+rollback. `rebuild_funnel_rollup` recomputes it from scratch.
+"""
+from collections import defaultdict
+from datetime import date, datetime, time, timedelta, timezone
+from typing import Any, Dict, Iterable, Mapping, Optional, Tuple
+
+from sqlalchemy import and_, case, delete, func, insert, literal, or_, select, update
+from sqlalchemy.engine import Connection
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from apps.api.database import increment_upsert
+from apps.api.models import FunnelDailyORM, LeadORM, LeadStageHistoryORM
+from packages.core.models.lead import (
+    PIPELINE_STAGES,
+    LeadSource,
+    LeadStage,
+    furthest_pipeline_stage,
+)
+
+RollupKey = Tuple[date, LeadStage, LeadSource, str]
+StageTotals = Dict[LeadStage, Tuple[int, float]]
+
+_rollup = FunnelDailyORM.__table__
+_history = LeadStageHistoryORM.__table__
+_leads = LeadORM.__table__
+_KEY_COLUMNS = [_rollup.c.day, _rollup.c.stage, _rollup.c.source, _rollup.c.utm_campaign]
+
+# Rollup column counting the leads that reached at least each pipeline stage
+REACHED_COLUMNS = [f"reached_{stage.value}" for stage in PIPELINE_STAGES]
+_COUNTERS = ["lead_count", "value_sum", *REACHED_COLUMNS]
+
+
+class FunnelRollupDelta:
+    """Pending per-key count, value and reached-stage changes for ``funnel_daily``."""
+
+    def __init__(self):
+        """Start with no changes."""
+        self.changes: Dict[RollupKey, list] = defaultdict(
+            lambda: [0, 0.0] + [0] * len(REACHED_COLUMNS)
+        )
+
+    def add(
+        self,
+        created_at: datetime,
+        stage: LeadStage,
+        source: LeadSource,
+        utm_campaign: Optional[str],
+        estimated_value: Optional[float],
+        furthest_stage: Optional[LeadStage] = None,
+        sign: int = 1,
+    ) -> None:
+        """Count one lead in (`sign` = 1) or out of (`sign` = -1) its rollup row."""
+        change = self.changes[(created_at.date(), stage, source, utm_campaign or "")]
+        change[0] += sign
+        change[1] += sign * (estimated_value or 0.0)
+        furthest = PIPELINE_STAGES.index(furthest_pipeline_stage(furthest_stage, stage))
+        for rank in range(furthest + 1):
+            change[2 + rank] += sign
+
+    def add_lead(self, lead: LeadORM, sign: int = 1) -> None:
+        """Count an ORM lead in or out."""
+        self.add(*lead_snapshot(lead), sign=sign)
+
+    def add_row(self, row: Mapping[str, Any], sign: int = 1) -> None:
+        """Count a lead column dict (as built for a Core ``INSERT``) in or out."""
+        self.add(
+            row["created_at"],
+            row["stage"],
+            row["source"],
+            row.get("utm_campaign"),
+            row.get("estimated_value"),
+            row.get("furthest_stage"),
+            sign=sign,
+        )
+
+    def move(self, before: tuple, after: tuple) -> None:
+        """Move a lead between rollup rows when an update changed its `lead_snapshot`."""
+        if before != after:
+            self.add(*before, sign=-1)
+            self.add(*after)
+
+    async def apply(self, db: AsyncSession) -> None:
+        """Write the changes inside the caller's transaction."""
+        params = [
+            {
+                "day": day,
+                "stage": stage,
+                "source": source,
+                "utm_campaign": campaign,
+                **dict(zip(_COUNTERS, counters)),
+            }
+            for (day, stage, source, campaign), counters in self.changes.items()
+            if any(counters)
+        ]
+        self.changes.clear()
+        if not params:
+            return
+
+        # Rows emptied here are skipped by readers and purged at startup
+        await db.execute(
+            increment_upsert(_rollup, _KEY_COLUMNS, _COUNTERS, db.bind.dialect.name),
+            params,
+        )
+
+
+async def rollup_leads(db: AsyncSession, leads: Iterable[LeadORM], sign: int = 1) -> None:
+    """Count flushed ORM leads in (`sign` = 1) or out (`sign` = -1) of the rollup."""
+    delta = FunnelRollupDelta()
+    for lead in leads:
+        delta.add_lead(lead, sign=sign)
+    await delta.apply(db)
+
+
+def lead_snapshot(lead: LeadORM) -> tuple:
+    """The fields that place a lead in the rollup, in `FunnelRollupDelta.add` order."""
+    return (
+        lead.created_at,
+        lead.stage,
+        lead.source,
+        lead.utm_campaign,
+        lead.estimated_value,
+        lead.furthest_stage,
+    )
+
+
+def pipeline_rank(stage_column):
+    """SQL position of a stage column in the pipeline (0 for NEW, LOST and NULL)."""
+    # Compared per stage so the literals are bound with the column's enum type
+    return case(
+        *((stage_column == stage, rank) for rank, stage in enumerate(PIPELINE_STAGES) if rank),
+        else_=0,
+    )
+
+
+def _greater(first, second):
+    return case((first > second, first), else_=second)
+
+
+def rebuild_funnel_rollup(conn: Connection) -> None:
+    """Recompute ``funnel_daily`` from ``leads`` with one INSERT ... SELECT."""
+    day = func.date(LeadORM.created_at)
+    campaign = func.coalesce(LeadORM.utm_campaign, "")
+    furthest = _greater(pipeline_rank(LeadORM.furthest_stage), pipeline_rank(LeadORM.stage))
+    conn.execute(delete(_rollup))
+    conn.execute(
+        insert(_rollup).from_select(
+            ["day", "stage", "source", "utm_campaign", *_COUNTERS],
+            select(
+                day,
+                LeadORM.stage,
+                LeadORM.source,
+                campaign,
+                func.count(LeadORM.id),
+                func.coalesce(func.sum(LeadORM.estimated_value), 0.0),
+                *(
+                    func.sum(case((furthest >= rank, 1), else_=0))
+                    for rank in range(len(PIPELINE_STAGES))
+                ),
+            ).group_by(day, LeadORM.stage, LeadORM.source, campaign),
+        )
+    )
+
+
+def backfill_furthest_stages(conn: Connection) -> int:
+    """Set ``furthest_stage`` on leads that predate it, from their stage history.
+
+    Leads without history get their current stage (NEW for lost leads).
+    """
+    history_rank = (
+        select(func.max(pipeline_rank(_history.c.stage)))
+        .where(_history.c.lead_id == _leads.c.id)
+        .scalar_subquery()
+    )
+    furthest = _greater(func.coalesce(history_rank, 0), pipeline_rank(_leads.c.stage))
+    result = conn.execute(
+        update(_leads)
+        .where(_leads.c.furthest_stage.is_(None))
+        .values(
+            furthest_stage=case(
+                *(
+                    (furthest == rank, literal(stage, _leads.c.stage.type))
+                    for rank, stage in enumerate(PIPELINE_STAGES)
+                ),
+            ),
+            updated_at=_leads.c.updated_at,
+        )
+    )
+    return result.rowcount
+
+
+def ensure_funnel_rollup(conn: Connection) -> None:
+    """Backfill the rollup for databases whose rollup is missing or predates a column.
+
+    Otherwise purge the rows that incremental updates left empty. Run through
+    ``AsyncConnection.run_sync`` alongside ``create_all``.
+    """
+    backfilled = backfill_furthest_stages(conn)
+    has_rollup = conn.execute(select(_rollup.c.day).limit(1)).first()
+    has_leads = conn.execute(select(LeadORM.id).limit(1)).first()
+    outdated = conn.execute(
+        select(_rollup.c.day).where(_rollup.c.reached_new.is_(None)).limit(1)
+    ).first()
+    if has_leads and (not has_rollup or backfilled or outdated):
+        rebuild_funnel_rollup(conn)
+    else:
+        conn.execute(delete(_rollup).where(_rollup.c.lead_count <= 0))
+
+
+async def funnel_stage_totals(
+    db: AsyncSession,
+    start_date: Optional[datetime] = None,
+    end_date: Optional[datetime] = None,
+) -> StageTotals:
+    """Lead count and value sum per stage for leads created in [start_date, end_date].
+
+    Whole days come from the rollup; the partial days at either end of the
+    range, if any, are counted from ``leads`` so the result stays exact.
+    """
+    start_date, end_date = _naive_utc(start_date), _naive_utc(end_date)
+    first_day = _ceil_day(start_date) if start_date else None
+    end_day = end_date.date() if end_date else None  # First day not fully covered
+
+    if first_day and end_day and first_day >= end_day:
+        return await _lead_totals(db, start_date, end_date)
+
+    query = (
+        select(_rollup.c.stage, func.sum(_rollup.c.lead_count), func.sum(_rollup.c.value_sum))
+        .where(_rollup.c.lead_count > 0)
+        .group_by(_rollup.c.stage)
+    )
+    if first_day:
+        query = query.where(_rollup.c.day >= first_day)
+    if end_day:
+        query = query.where(_rollup.c.day < end_day)
+
+    totals: StageTotals = {}
+    for stage, count, value in (await db.execute(query)).all():
+        _accumulate(totals, stage, count, value)
+
+    created_at = LeadORM.created_at
+    edges = []
+    if start_date and start_date < _midnight(first_day):
+        edges.append(and_(created_at >= start_date, created_at < _midnight(first_day)))
+    if end_date:
+        edges.append(and_(created_at >= _midnight(end_day), created_at <= end_date))
+    if edges:
+        for stage, (count, value) in (await _lead_totals(db, where=or_(*edges))).items():
+            _accumulate(totals, stage, count, value)
+    return totals
+
+
+async def _lead_totals(
+    db: AsyncSession,
+    start_date: Optional[datetime] = None,
+    end_date: Optional[datetime] = None,
+    where=None,
+) -> StageTotals:
+    query = select(
+        LeadORM.stage,
+        func.count(LeadORM.id),
+        func.coalesce(func.sum(LeadORM.estimated_value), 0),
+    ).group_by(LeadORM.stage)
+    if start_date:
+        query = query.where(LeadORM.created_at >= start_date)
+    if end_date:
+        query = query.where(LeadORM.created_at <= end_date)
+    if where is not None:
+        query = query.where(where)
+
+    totals: StageTotals = {}
+    for stage, count, value in (await db.execute(query)).all():
+        _accumulate(totals, stage, count, value)
+    return totals
+
+
+def _accumulate(totals: StageTotals, stage: LeadStage, count, value) -> None:
+    previous_count, previous_value = totals.get(stage, (0, 0.0))
+    totals[stage] = (previous_count + int(count or 0), previous_value + float(value or 0))
+
+
+def _naive_utc(moment: Optional[datetime]) -> Optional[datetime]:
+    # Lead timestamps are stored as naive UTC
+    if moment is not None and moment.tzinfo is not None:
+        return moment.astimezone(timezone.utc).replace(tzinfo=None)
+    return moment
+
+
+def _midnight(day: date) -> datetime:
+    return datetime.combine(day, time.min)
+
+
+def _ceil_day(moment: datetime) -> date:
+    day = moment.date()
+    return day if moment == _midnight(day) else day + timedelta(days=1)
@@ -0,0 +1,29 @@
+"""Process-local change tracking for the leads table.
+
+Write paths call `notify_leads_changed` after committing; caches compare the
+generation they were built at against `leads_generation` to detect staleness.
+Listeners registered with `add_leads_listener` are called on every change,
+for caches that also need to propagate it elsewhere.
+"""
+from typing import Callable, List
+
+_generation = 0
+_listeners: List[Callable[[], None]] = []
+
+
+def notify_leads_changed() -> None:
+    """Record that leads were created, updated or deleted."""
+    global _generation
+    _generation += 1
+    for listener in _listeners:
+        listener()
+
+
+def leads_generation() -> int:
+    """Return the current leads generation counter."""
+    return _generation
+
+
+def add_leads_listener(listener: Callable[[], None]) -> None:
+    """Call `listener` (synchronously, without arguments) after every change."""
+    _listeners.append(listener)
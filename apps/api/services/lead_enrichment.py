@@ -0,0 +1,446 @@
+"""Asynchronous LLM enrichment of new leads, off the request path.
+
+Write paths call `enqueue_lead` after committing a lead. A single dispatcher
+task drains the queue into batches (up to ``ENRICHMENT_BATCH_SIZE`` leads, or
+whatever arrived within ``ENRICHMENT_BATCH_WAIT_SECONDS``) and hands each
+batch to a worker, with at most ``ENRICHMENT_CONCURRENCY`` batches in flight.
+A worker sends one chat-completions request per batch to any OpenAI-compatible
+endpoint at ``AI_API_BASE_URL`` (point it at a local stub server to exercise
+the whole pipeline), retrying timeouts, 429s and 5xx responses with
+exponential backoff, and writes the suggested tags and AI score back in one
+UPDATE.
+
+Results are cached by a hash of the normalized lead content, so resubmitted
+or duplicate leads never cost a second call. Contact details (name, email,
+phone) are not sent to the model.
+"""
+import asyncio
+import hashlib
+import json
+import logging
+import re
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional
+from uuid import UUID
+
+import httpx
+from pydantic import BaseModel, Field, ValidationError
+from sqlalchemy import bindparam, select, update
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from apps.api.config import settings
+from apps.api.database import AsyncSessionLocal
+from apps.api.models import LeadORM
+from apps.api.services.lead_changes import notify_leads_changed
+from packages.core.schemas.scoring import EnrichmentStatusResponse
+
+logger = logging.getLogger(__name__)
+
+# Bump when the prompt or the payload changes so cached results are not reused
+PROMPT_VERSION = "1"
+
+SYSTEM_PROMPT = (
+    "You qualify B2B sales leads. For every lead in the user message, reply with "
+    'a JSON object {"leads": [{"key": ..., "tags": [...], "score": ...}]} where '
+    "key echoes the lead key, tags holds up to 5 short lowercase descriptive tags "
+    "(industry, company size, buying intent) and score is the 0-100 likelihood "
+    "that the lead converts."
+)
+
+MAX_TAGS = 5
+RETRY_STATUS_CODES = {408, 409, 425, 429, 500, 502, 503, 504}
+RETRY_BASE_DELAY_SECONDS = 0.5
+RETRY_MAX_DELAY_SECONDS = 30.0
+
+_ENRICHMENT_COLUMNS = [
+    LeadORM.id,
+    LeadORM.source,
+    LeadORM.contact_info,
+    LeadORM.product_interest,
+    LeadORM.estimated_value,
+    LeadORM.notes,
+    LeadORM.utm_source,
+    LeadORM.utm_medium,
+    LeadORM.utm_campaign,
+]
+
+_leads = LeadORM.__table__
+
+# updated_at is pinned like in rescoring: enrichment is not user activity
+_UPDATE_ENRICHMENT = (
+    update(_leads)
+    .where(_leads.c.id == bindparam("lead_id"))
+    .values(
+        ai_score=bindparam("new_ai_score"),
+        tags=bindparam("new_tags"),
+        enriched_at=bindparam("new_enriched_at"),
+        updated_at=_leads.c.updated_at,
+    )
+)
+
+_WHITESPACE = re.compile(r"\s+")
+_TAG_CHARS = re.compile(r"[^a-z0-9]+")
+
+
+class LeadEnrichment(BaseModel):
+    """What the model suggests for one lead."""
+
+    tags: List[str] = Field(default_factory=list)
+    score: int = Field(..., ge=0, le=100)
+
+
+class EnrichmentError(Exception):
+    """A batch could not be enriched."""
+
+
+def normalize_text(value: Any) -> Optional[str]:
+    """Lowercase and collapse whitespace so cosmetic edits share a cache entry."""
+    if value is None:
+        return None
+    text = _WHITESPACE.sub(" ", str(value)).strip().lower()
+    return text or None
+
+
+def normalize_tag(tag: str) -> str:
+    """Turn a suggested tag into the hyphenated lowercase form used for lead tags."""
+    return _TAG_CHARS.sub("-", tag.lower()).strip("-")[:50]
+
+
+def lead_payload(row: Any) -> Dict[str, Any]:
+    """The normalized, contact-free content sent to the model for one lead row."""
+    contact = row.contact_info or {}
+    return {
+        "source": normalize_text(row.source),
+        "company": normalize_text(contact.get("company")),
+        "title": normalize_text(contact.get("title")),
+        "product_interest": normalize_text(row.product_interest),
+        "estimated_value": row.estimated_value,
+        "notes": normalize_text(row.notes),
+        "utm_source": normalize_text(row.utm_source),
+        "utm_medium": normalize_text(row.utm_medium),
+        "utm_campaign": normalize_text(row.utm_campaign),
+    }
+
+
+def content_hash(payload: Dict[str, Any]) -> str:
+    """Stable cache key for a lead payload under the current model and prompt."""
+    canonical = json.dumps(
+        [settings.AI_MODEL_NAME, PROMPT_VERSION, payload], sort_keys=True, separators=(",", ":")
+    )
+    return hashlib.sha256(canonical.encode()).hexdigest()
+
+
+def merge_tags(existing: Iterable[str], suggested: Iterable[str]) -> List[str]:
+    """Append normalized suggestions that the lead does not carry yet."""
+    tags = list(existing or [])
+    seen = set(tags)
+    for tag in suggested:
+        tag = normalize_tag(tag)
+        if tag and tag not in seen:
+            seen.add(tag)
+            tags.append(tag)
+    return tags
+
+
+def parse_completion(body: Dict[str, Any], keys: Iterable[str]) -> Dict[str, LeadEnrichment]:
+    """Extract per-key enrichments from a chat-completions response body."""
+    try:
+        content = json.loads(body["choices"][0]["message"]["content"])
+        items = content["leads"]
+    except (KeyError, IndexError, TypeError, ValueError) as e:
+        raise EnrichmentError(f"Malformed completion: {e}") from e
+
+    wanted = set(keys)
+    results: Dict[str, LeadEnrichment] = {}
+    for item in items if isinstance(items, list) else []:
+        if not isinstance(item, dict) or item.get("key") not in wanted:
+            continue
+        try:
+            enrichment = LeadEnrichment.model_validate(item)
+        except ValidationError:
+            continue
+        enrichment.tags = enrichment.tags[:MAX_TAGS]
+        results[item["key"]] = enrichment
+    return results
+
+
+class EnrichmentQueue:
+    """Bounded queue plus the dispatcher and workers that drain it."""
+
+    def __init__(
+        self,
+        session_factory: async_sessionmaker[AsyncSession] = AsyncSessionLocal,
+        client: Optional[httpx.AsyncClient] = None,
+    ):
+        """Create an idle queue; `client` overrides the HTTP client built by `start`."""
+        self._session_factory = session_factory
+        self._client = client
+        self._owns_client = client is None
+        self._queue: Optional[asyncio.Queue[UUID]] = None
+        self._dispatcher: Optional[asyncio.Task] = None
+        self._workers: set[asyncio.Task] = set()
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._cache: OrderedDict[str, LeadEnrichment] = OrderedDict()
+        self._counters = dict.fromkeys(
+            (
+                "queued",
+                "dropped",
+                "batches",
+                "requests",
+                "retries",
+                "failed",
+                "enriched",
+                "cache_hits",
+                "cache_misses",
+            ),
+            0,
+        )
+
+    @property
+    def running(self) -> bool:
+        """Whether the dispatcher is accepting leads."""
+        return self._dispatcher is not None and not self._dispatcher.done()
+
+    async def start(self) -> None:
+        """Start the dispatcher (no-op when already running)."""
+        if self.running:
+            return
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                base_url=settings.AI_API_BASE_URL,
+                timeout=settings.ENRICHMENT_TIMEOUT_SECONDS,
+                headers={"Authorization": f"Bearer {settings.OPENAI_API_KEY}"},
+            )
+        self._queue = asyncio.Queue(maxsize=settings.ENRICHMENT_QUEUE_SIZE)
+        self._slots = asyncio.Semaphore(max(1, settings.ENRICHMENT_CONCURRENCY))
+        self._dispatcher = asyncio.create_task(self._dispatch())
+
+    async def stop(self) -> None:
+        """Stop accepting leads and cancel in-flight batches."""
+        tasks = [self._dispatcher, *self._workers] if self._dispatcher else list(self._workers)
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._dispatcher = None
+        self._workers.clear()
+        if self._owns_client and self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    def enqueue(self, lead_id: UUID) -> bool:
+        """Queue a committed lead for enrichment; False when not running or full."""
+        if not self.running:
+            return False
+        try:
+            self._queue.put_nowait(lead_id)
+        except asyncio.QueueFull:
+            self._counters["dropped"] += 1
+            return False
+        self._counters["queued"] += 1
+        return True
+
+    async def drain(self) -> None:
+        """Wait until every queued lead has been processed."""
+        if self._queue is not None:
+            await self._queue.join()
+
+    def status(self) -> EnrichmentStatusResponse:
+        """Queue depth, cache size and lifetime counters."""
+        hits, misses = self._counters["cache_hits"], self._counters["cache_misses"]
+        return EnrichmentStatusResponse(
+            running=self.running,
+            pending=self._queue.qsize() if self._queue is not None else 0,
+            in_flight=len(self._workers),
+            cache_size=len(self._cache),
+            cache_hit_rate=round(hits / (hits + misses), 4) if hits + misses else None,
+            **self._counters,
+        )
+
+    async def _dispatch(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._queue.get()]
+            deadline = loop.time() + settings.ENRICHMENT_BATCH_WAIT_SECONDS
+            while len(batch) < settings.ENRICHMENT_BATCH_SIZE:
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), remaining))
+                except asyncio.TimeoutError:
+                    break
+
+            await self._slots.acquire()
+            worker = asyncio.create_task(self._run_batch(batch))
+            self._workers.add(worker)
+            worker.add_done_callback(self._worker_done)
+
+    def _worker_done(self, worker: asyncio.Task) -> None:
+        self._workers.discard(worker)
+        self._slots.release()
+
+    async def _run_batch(self, lead_ids: List[UUID]) -> None:
+        self._counters["batches"] += 1
+        try:
+            await self.enrich(lead_ids)
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            self._counters["failed"] += len(lead_ids)
+            logger.exception("Lead enrichment failed for a batch of %d leads", len(lead_ids))
+        finally:
+            for _ in lead_ids:
+                self._queue.task_done()
+
+    async def enrich(self, lead_ids: List[UUID]) -> int:
+        """Enrich a batch of leads now; returns the number of leads updated."""
+        async with self._session_factory() as db:
+            rows = (
+                await db.execute(select(*_ENRICHMENT_COLUMNS).where(LeadORM.id.in_(lead_ids)))
+            ).all()
+        if not rows:
+            return 0
+
+        keys = {row.id: content_hash(lead_payload(row)) for row in rows}
+        results: Dict[str, LeadEnrichment] = {}
+        missing: Dict[str, Dict[str, Any]] = {}
+        for row in rows:
+            key = keys[row.id]
+            cached = self._cache_get(key)
+            if cached is not None:
+                self._counters["cache_hits"] += 1
+                results[key] = cached
+            elif key not in missing:
+                self._counters["cache_misses"] += 1
+                missing[key] = lead_payload(row)
+
+        if missing:
+            fresh = await self._complete(missing)
+            for key, enrichment in fresh.items():
+                self._cache_put(key, enrichment)
+            results.update(fresh)
+
+        return await self._write_back(rows, keys, results)
+
+    async def _complete(self, payloads: Dict[str, Dict[str, Any]]) -> Dict[str, LeadEnrichment]:
+        # Short keys keep the prompt small; they are unique within the batch
+        short = {key[:16]: key for key in payloads}
+        request = {
+            "model": settings.AI_MODEL_NAME,
+            "temperature": 0,
+            "response_format": {"type": "json_object"},
+            "messages": [
+                {"role": "system", "content": SYSTEM_PROMPT},
+                {
+                    "role": "user",
+                    "content": json.dumps(
+                        [{"key": k, **payloads[key]} for k, key in short.items()]
+                    ),
+                },
+            ],
+        }
+        body = await self._post_with_retries("/chat/completions", request)
+        parsed = parse_completion(body, short)
+        return {short[k]: enrichment for k, enrichment in parsed.items()}
+
+    async def _post_with_retries(self, path: str, payload: Dict[str, Any]) -> Dict[str, Any]:
+        attempt = 0
+        while True:
+            self._counters["requests"] += 1
+            delay: Optional[float] = None
+            try:
+                response = await self._client.post(path, json=payload)
+                if response.status_code not in RETRY_STATUS_CODES:
+                    response.raise_for_status()
+                    return response.json()
+                delay = _retry_after(response)
+                failure: Exception = EnrichmentError(f"HTTP {response.status_code}")
+            except (httpx.TimeoutException, httpx.TransportError) as e:
+                failure = e
+
+            if attempt >= settings.ENRICHMENT_MAX_RETRIES:
+                raise EnrichmentError(f"Giving up after {attempt + 1} attempts") from failure
+            if delay is None:
+                delay = RETRY_BASE_DELAY_SECONDS * (2**attempt)
+            attempt += 1
+            self._counters["retries"] += 1
+            await asyncio.sleep(min(delay, RETRY_MAX_DELAY_SECONDS))
+
+    async def _write_back(
+        self, rows: List[Any], keys: Dict[UUID, str], results: Dict[str, LeadEnrichment]
+    ) -> int:
+        enriched = {row.id: results[keys[row.id]] for row in rows if keys[row.id] in results}
+        self._counters["failed"] += len(rows) - len(enriched)
+        if not enriched:
+            return 0
+
+        now = datetime.utcnow()
+        async with self._session_factory() as db:
+            # Read tags in the writing transaction so edits made meanwhile are kept
+            current = (
+                await db.execute(
+                    select(LeadORM.id, LeadORM.tags).where(LeadORM.id.in_(list(enriched)))
+                )
+            ).all()
+            params = [
+                {
+                    "lead_id": lead_id,
+                    "new_ai_score": enriched[lead_id].score,
+                    "new_tags": merge_tags(tags, enriched[lead_id].tags),
+                    "new_enriched_at": now,
+                }
+                for lead_id, tags in current
+            ]
+            if params:
+                await db.execute(_UPDATE_ENRICHMENT, params)
+                await db.commit()
+
+        if params:
+            notify_leads_changed()
+        self._counters["enriched"] += len(params)
+        return len(params)
+
+    def _cache_get(self, key: str) -> Optional[LeadEnrichment]:
+        enrichment = self._cache.get(key)
+        if enrichment is not None:
+            self._cache.move_to_end(key)
+        return enrichment
+
+    def _cache_put(self, key: str, enrichment: LeadEnrichment) -> None:
+        self._cache[key] = enrichment
+        self._cache.move_to_end(key)
+        while len(self._cache) > settings.ENRICHMENT_CACHE_SIZE:
+            self._cache.popitem(last=False)
+
+
+def _retry_after(response: httpx.Response) -> Optional[float]:
+    try:
+        return float(response.headers["Retry-After"])
+    except (KeyError, ValueError):
+        return None
+
+
+def enrichment_enabled() -> bool:
+    """Whether leads should be sent for LLM enrichment."""
+    return settings.AI_SCORING_ENABLED and bool(settings.OPENAI_API_KEY)
+
+
+# Global queue instance, started from the application lifespan
+enrichment_queue = EnrichmentQueue()
+
+
+async def start_enrichment() -> None:
+    """Start the enrichment queue when AI scoring is configured."""
+    if enrichment_enabled():
+        await enrichment_queue.start()
+
+
+async def stop_enrichment() -> None:
+    """Stop the enrichment queue."""
+    await enrichment_queue.stop()
+
+
+def enqueue_lead(lead_id: UUID) -> bool:
+    """Queue a committed lead for enrichment (no-op when enrichment is off)."""
+    return enrichment_queue.enqueue(lead_id)
@@ -0,0 +1,89 @@
+"""Streaming lead export in CSV and NDJSON."""
+import csv
+import io
+from datetime import datetime
+from enum import Enum
+from typing import Any, AsyncIterator, Callable, List, Sequence, Union
+from uuid import UUID
+
+import orjson
+from sqlalchemy import Select
+
+from apps.api.database import AsyncSessionLocal
+from apps.api.serialization import LEAD_PLAN
+from packages.core.models.lead import ContactInfo
+
+# Rows fetched per round trip and encoded per chunk written to the socket
+EXPORT_BATCH_SIZE = 1000
+
+EXPORT_COLUMNS = LEAD_PLAN.columns
+
+_CONTACT_FIELDS = list(ContactInfo.model_fields)
+
+_CSV_LEAD_FIELDS = [
+    column.key for column in EXPORT_COLUMNS if column.key not in ("contact_info", "tags")
+]
+
+# CSV flattens contact_info into top-level columns, matching the file importer
+CSV_HEADER = _CSV_LEAD_FIELDS + _CONTACT_FIELDS + ["tags"]
+
+MEDIA_TYPES = {
+    "csv": "text/csv; charset=utf-8",
+    "ndjson": "application/x-ndjson",
+}
+
+
+def _plain(value: Any) -> Any:
+    """Reduce enums, UUIDs and datetimes to CSV friendly scalars."""
+    if isinstance(value, Enum):
+        return value.value
+    if isinstance(value, UUID):
+        return str(value)
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return value
+
+
+def _encode_csv(rows: Sequence[Any], buffer: io.StringIO, writer: Any) -> str:
+    for row in rows:
+        mapping = row._mapping
+        contact = row.contact_info or {}
+        writer.writerow(
+            [_plain(mapping[key]) for key in _CSV_LEAD_FIELDS]
+            + [contact.get(field) for field in _CONTACT_FIELDS]
+            + [";".join(row.tags or [])]
+        )
+    data = buffer.getvalue()
+    buffer.seek(0)
+    buffer.truncate()
+    return data
+
+
+def _encode_ndjson(rows: Sequence[Any]) -> bytes:
+    return b"".join(orjson.dumps(LEAD_PLAN.row_to_dict(row)) + b"\n" for row in rows)
+
+
+async def stream_leads(query: Select, file_format: str) -> AsyncIterator[Union[str, bytes]]:
+    """Yield the rows of `query` encoded as CSV or NDJSON, one batch at a time.
+
+    Rows are read through a server-side cursor with ``yield_per`` in a session
+    owned by the generator, so memory stays flat however many rows are exported.
+    """
+    query = query.with_only_columns(*EXPORT_COLUMNS).execution_options(
+        yield_per=EXPORT_BATCH_SIZE
+    )
+
+    encode: Callable[[List[Any]], Union[str, bytes]]
+    if file_format == "csv":
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(CSV_HEADER)
+        yield _encode_csv([], buffer, writer)
+        encode = lambda rows: _encode_csv(rows, buffer, writer)  # noqa: E731
+    else:
+        encode = _encode_ndjson
+
+    async with AsyncSessionLocal() as db:
+        result = await db.stream(query)
+        async for rows in result.partitions():
+            yield encode(rows)
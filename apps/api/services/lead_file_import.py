@@ -0,0 +1,193 @@
+"""Background CSV / NDJSON lead import jobs."""
+import asyncio
+import csv
+import io
+import json
+import os
+import re
+import tempfile
+from collections import OrderedDict
+from datetime import datetime
+from typing import BinaryIO, Iterator, Optional, Tuple, Union
+from uuid import UUID, uuid4
+
+from fastapi import HTTPException, UploadFile
+
+from apps.api.database import AsyncSessionLocal
+from apps.api.services.lead_import import LeadImportService, chunked
+from packages.core.models.lead import ContactInfo, LeadSource
+from packages.core.schemas.lead import (
+    LeadCreateRequest,
+    LeadImportJobResponse,
+    LeadImportJobStatus,
+)
+
+# Jobs are tracked in memory; finished jobs beyond this count are forgotten oldest-first
+MAX_TRACKED_JOBS = 100
+
+_COPY_BUFFER_SIZE = 1024 * 1024
+_CONTACT_FIELDS = set(ContactInfo.model_fields)
+_LEAD_FIELDS = set(LeadCreateRequest.model_fields) - {"source", "contact_info", "tags"}
+_TAG_SEPARATOR = re.compile(r"[;,|]")
+
+_jobs: "OrderedDict[UUID, LeadImportJobResponse]" = OrderedDict()
+
+
+def detect_format(upload: UploadFile, requested: Optional[str]) -> str:
+    """Pick the file format from the explicit parameter, file name or content type."""
+    if requested:
+        return requested
+
+    filename = (upload.filename or "").lower()
+    content_type = (upload.content_type or "").lower()
+    if filename.endswith(".csv") or "csv" in content_type:
+        return "csv"
+    if filename.endswith((".ndjson", ".jsonl")) or "ndjson" in content_type:
+        return "ndjson"
+
+    raise HTTPException(
+        status_code=400,
+        detail="Could not detect file format; pass format=csv or format=ndjson",
+    )
+
+
+async def spool_upload(upload: UploadFile) -> Tuple[str, int]:
+    """Copy an upload to a private temp file that outlives the request.
+
+    The framework closes request files once the response is sent, before
+    background tasks run, so the job needs its own copy.
+    """
+    size = 0
+    with tempfile.NamedTemporaryFile(prefix="antleads-import-", delete=False) as spool:
+        while data := await upload.read(_COPY_BUFFER_SIZE):
+            spool.write(data)
+            size += len(data)
+    return spool.name, size
+
+
+def create_job(
+    filename: Optional[str], file_format: str, source: LeadSource, size: int
+) -> LeadImportJobResponse:
+    """Register a new pending import job."""
+    job = LeadImportJobResponse(
+        job_id=uuid4(),
+        filename=filename,
+        format=file_format,
+        source=source,
+        bytes_total=size,
+        created_at=datetime.utcnow(),
+    )
+    _jobs[job.job_id] = job
+    _evict_finished_jobs()
+    return job
+
+
+def get_job(job_id: UUID) -> Optional[LeadImportJobResponse]:
+    """Look up a tracked import job."""
+    return _jobs.get(job_id)
+
+
+async def run_import_job(
+    job: LeadImportJobResponse, path: str, chunk_size: Optional[int]
+) -> None:
+    """Stream-parse the spooled file and import it chunk by chunk.
+
+    Memory use is bounded by the chunk size regardless of file size. Reading,
+    parsing and validating each chunk run in a worker thread; only the
+    inserts run on the event loop.
+    """
+    job.status = LeadImportJobStatus.RUNNING
+    job.started_at = datetime.utcnow()
+
+    try:
+        with await asyncio.to_thread(open, path, "rb") as binary:
+            rows = iter_rows(binary, job.format, job.source)
+            async with AsyncSessionLocal() as db:
+                service = LeadImportService(db, chunk_size=chunk_size)
+                chunks = chunked(rows, service.chunk_size)
+                while (chunk := await asyncio.to_thread(next, chunks, None)) is not None:
+                    start = job.total
+                    built = await asyncio.to_thread(service.build_rows, chunk, job.source, job)
+                    await service.insert_rows(built, start, len(chunk), job)
+                    job.bytes_processed = binary.tell()
+
+        job.bytes_processed = job.bytes_total
+        job.status = LeadImportJobStatus.COMPLETED
+    except Exception as e:
+        job.status = LeadImportJobStatus.FAILED
+        job.error = str(e)
+    finally:
+        job.finished_at = datetime.utcnow()
+        os.unlink(path)
+
+
+def iter_rows(
+    binary: BinaryIO, file_format: str, source: LeadSource
+) -> Iterator[Union[dict, str]]:
+    """Yield lead dicts from a CSV or NDJSON byte stream.
+
+    Unparseable NDJSON lines are yielded as raw strings so they are reported as
+    row validation errors instead of aborting the job.
+    """
+    text = io.TextIOWrapper(binary, encoding="utf-8-sig", newline="")
+
+    try:
+        if file_format == "csv":
+            for row in csv.DictReader(text):
+                yield _normalize_row(row, source)
+            return
+
+        for line in text:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                row = json.loads(line)
+            except json.JSONDecodeError:
+                yield line
+                continue
+            yield _normalize_row(row, source) if isinstance(row, dict) else line
+    finally:
+        # Leave closing the byte stream to its owner
+        text.detach()
+
+
+def _normalize_row(row: dict, source: LeadSource) -> dict:
+    """Map a flat CSV/NDJSON record onto the `LeadCreateRequest` shape.
+
+    Contact columns (email, phone, company, ...) may appear at the top level or
+    under ``contact_info``; blank cells are treated as missing.
+    """
+    lead = {"source": source}
+    nested = row.get("contact_info")
+    contact = dict(nested) if isinstance(nested, dict) else {}
+
+    for key, value in row.items():
+        if key is None or key == "contact_info":
+            continue
+        if isinstance(value, str):
+            value = value.strip()
+        if value in ("", None):
+            continue
+
+        key = key.strip().lower()
+        if key in _CONTACT_FIELDS:
+            contact[key] = value
+        elif key == "tags":
+            if isinstance(value, str):
+                value = [tag.strip() for tag in _TAG_SEPARATOR.split(value) if tag.strip()]
+            lead["tags"] = value
+        elif key in _LEAD_FIELDS:
+            lead[key] = value
+
+    lead["contact_info"] = contact
+    return lead
+
+
+def _evict_finished_jobs() -> None:
+    finished = (LeadImportJobStatus.COMPLETED, LeadImportJobStatus.FAILED)
+    for job_id in list(_jobs):
+        if len(_jobs) <= MAX_TRACKED_JOBS:
+            break
+        if _jobs[job_id].status in finished:
+            del _jobs[job_id]
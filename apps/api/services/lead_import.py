@@ -0,0 +1,192 @@
+"""Batched bulk lead import service."""
+from datetime import datetime
+from itertools import islice
+from typing import Any, Iterable, Iterator, List, Optional, Union
+from uuid import uuid4
+
+from pydantic import ValidationError
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from apps.api.config import settings
+from apps.api.models import LeadORM
+from apps.api.services.funnel_rollup import FunnelRollupDelta
+from apps.api.services.lead_changes import notify_leads_changed
+from apps.api.services.lead_enrichment import enqueue_lead
+from apps.api.services.lead_search import deferred_search_sync
+from packages.core.models.lead import LeadSource, LeadStage
+from packages.core.schemas.lead import (
+    LeadCreateRequest,
+    LeadImportJobResponse,
+    LeadImportResponse,
+)
+from packages.ml.lead_scoring import LeadFeatures, current_rules, evaluate
+from packages.ml.scoring_rules import RuleSet
+
+# Cap on error entries kept per import so a bad file cannot balloon the response
+MAX_REPORTED_ERRORS = 100
+
+ImportRow = Union[LeadCreateRequest, dict]
+ImportProgress = Union[LeadImportResponse, LeadImportJobResponse]
+
+
+class LeadImportService:
+    """Service for validating, scoring and inserting leads in chunks.
+
+    Each chunk is written with a single executemany ``INSERT`` (search indexing
+    deferred to one statement per chunk, funnel rollup updated with one upsert)
+    and committed on its own, so a failing chunk is rolled back and reported
+    without losing the chunks before it. Committed leads are queued for LLM
+    enrichment like leads created one at a time.
+    """
+
+    def __init__(self, db: AsyncSession, chunk_size: Optional[int] = None):
+        """Initialize the service."""
+        self.db = db
+        self.chunk_size = chunk_size or settings.IMPORT_CHUNK_SIZE
+
+    async def import_leads(
+        self,
+        leads: Iterable[ImportRow],
+        source: LeadSource = LeadSource.IMPORT,
+        result: Optional[ImportProgress] = None,
+    ) -> ImportProgress:
+        """Import `leads`, accumulating counts and errors into `result`."""
+        if result is None:
+            result = LeadImportResponse(total=0, successful=0, failed=0)
+
+        for chunk in chunked(leads, self.chunk_size):
+            await self.import_chunk(chunk, source, result)
+
+        return result
+
+    async def import_chunk(
+        self,
+        chunk: List[ImportRow],
+        source: LeadSource,
+        result: ImportProgress,
+    ) -> None:
+        """Validate, score and insert one chunk of rows."""
+        start = result.total
+        rows = self.build_rows(chunk, source, result)
+        await self.insert_rows(rows, start, len(chunk), result)
+
+    def build_rows(
+        self,
+        chunk: List[ImportRow],
+        source: LeadSource,
+        result: ImportProgress,
+    ) -> List[dict]:
+        """Validate and score one chunk, reporting invalid rows; no database access."""
+        start = result.total
+        result.total += len(chunk)
+        now = datetime.utcnow()
+        rules = current_rules()
+
+        rows = []
+        for offset, raw in enumerate(chunk):
+            try:
+                lead_data = (
+                    raw if isinstance(raw, LeadCreateRequest)
+                    else LeadCreateRequest.model_validate(raw)
+                )
+                rows.append(build_lead_row(lead_data, source, now, rules))
+            except (ValidationError, ValueError) as e:
+                result.failed += 1
+                _report(result, {
+                    "index": start + offset,
+                    "name": _row_name(raw),
+                    "error": str(e),
+                })
+        return rows
+
+    async def insert_rows(
+        self,
+        rows: List[dict],
+        start: int,
+        chunk_length: int,
+        result: ImportProgress,
+    ) -> None:
+        """Insert and commit rows built by `build_rows` for the chunk at `start`."""
+        if not rows:
+            return
+
+        try:
+            async with deferred_search_sync(self.db):
+                await self.db.execute(insert(LeadORM.__table__), rows)
+            rollup = FunnelRollupDelta()
+            for row in rows:
+                rollup.add_row(row)
+            await rollup.apply(self.db)
+            await self.db.commit()
+            notify_leads_changed()
+            for row in rows:
+                enqueue_lead(row["id"])
+            result.successful += len(rows)
+        except Exception as e:
+            await self.db.rollback()
+            result.failed += len(rows)
+            _report(result, {
+                "chunk": start // self.chunk_size,
+                "start": start,
+                "end": start + chunk_length - 1,
+                "error": str(e),
+            })
+
+
+def build_lead_row(
+    lead_data: LeadCreateRequest,
+    source: LeadSource,
+    now: datetime,
+    rules: Optional[RuleSet] = None,
+) -> dict:
+    """Score and tag a lead and return it as a column dict ready for ``INSERT``."""
+    rules = rules or current_rules()
+    score, suggested_tags, suggested_priority = evaluate(
+        LeadFeatures.from_lead(lead_data, source=source), rules
+    )
+
+    return {
+        "id": uuid4(),
+        "name": lead_data.name,
+        "source": source,
+        "stage": LeadStage.NEW,
+        "priority": suggested_priority,
+        "score": score,
+        "scoring_version": rules.version,
+        "contact_info": lead_data.contact_info.model_dump(),
+        "tags": list(set(lead_data.tags + suggested_tags)),
+        "product_interest": lead_data.product_interest,
+        "estimated_value": lead_data.estimated_value,
+        "notes": lead_data.notes,
+        "utm_source": lead_data.utm_source,
+        "utm_medium": lead_data.utm_medium,
+        "utm_campaign": lead_data.utm_campaign,
+        "referrer_url": lead_data.referrer_url,
+        "assigned_to": None,
+        "created_at": now,
+        "updated_at": now,
+        "contacted_at": None,
+        "closed_at": None,
+        "stage_entered_at": now,
+    }
+
+
+def chunked(rows: Iterable[Any], size: int) -> Iterator[List[Any]]:
+    """Split an iterable into lists of at most `size` items without materializing it."""
+    iterator = iter(rows)
+    while chunk := list(islice(iterator, size)):
+        yield chunk
+
+
+def _row_name(raw: ImportRow) -> Optional[str]:
+    if isinstance(raw, LeadCreateRequest):
+        return raw.name
+    if isinstance(raw, dict):
+        return raw.get("name")
+    return None
+
+
+def _report(result: ImportProgress, error: dict) -> None:
+    if len(result.errors) < MAX_REPORTED_ERRORS:
+        result.errors.append(error)
@@ -0,0 +1,290 @@
+"""Resumable full-table lead rescoring."""
+import asyncio
+import time
+from collections import deque
+from concurrent.futures import Executor, ProcessPoolExecutor
+from datetime import datetime
+from typing import Any, Deque, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+from sqlalchemy import bindparam, func, or_, select, update
+
+from apps.api.config import settings
+from apps.api.database import AsyncSessionLocal
+from apps.api.models import LeadORM, RescoreCheckpointORM
+from apps.api.services.lead_changes import notify_leads_changed
+from packages.core.schemas.lead import LeadImportJobStatus, LeadRescoreJobResponse
+from packages.ml.lead_scoring import current_rules, masks_to_tags
+from packages.ml.scoring_rules import RuleSet
+
+CHECKPOINT_NAME = "lead-scores"
+
+# Everything the scorer reads, in the order `feature_columns` expects
+FEATURE_COLUMNS = [
+    LeadORM.source,
+    LeadORM.contact_info,
+    LeadORM.estimated_value,
+    LeadORM.product_interest,
+    LeadORM.utm_source,
+    LeadORM.utm_medium,
+    LeadORM.utm_campaign,
+]
+
+RESCORE_COLUMNS = [
+    LeadORM.id,
+    *FEATURE_COLUMNS,
+    LeadORM.score,
+    LeadORM.priority,
+    LeadORM.tags,
+    LeadORM.scoring_version,
+]
+
+_leads = LeadORM.__table__
+
+# Keyed by primary key; updated_at is pinned so a rescore does not look like
+# activity to the stale-lead automation
+_UPDATE_SCORES = (
+    update(_leads)
+    .where(_leads.c.id == bindparam("lead_id"))
+    .values(
+        score=bindparam("new_score"),
+        priority=bindparam("new_priority"),
+        tags=bindparam("new_tags"),
+        scoring_version=bindparam("new_version"),
+        updated_at=_leads.c.updated_at,
+    )
+)
+
+_job: Optional[LeadRescoreJobResponse] = None
+
+
+def feature_columns(rows: Sequence[Sequence[Any]], offset: int = 0) -> Dict[str, Any]:
+    """Build batch scoring columns from rows holding `FEATURE_COLUMNS` at `offset`."""
+    source, contact, value, interest, utm_source, utm_medium, utm_campaign = range(
+        offset, offset + len(FEATURE_COLUMNS)
+    )
+    contacts = [row[contact] or {} for row in rows]
+    return {
+        "source": [row[source] for row in rows],
+        "estimated_value": np.array(
+            [np.nan if row[value] is None else row[value] for row in rows], dtype=np.float64
+        ),
+        "has_email": [bool(info.get("email")) for info in contacts],
+        "has_phone": [bool(info.get("phone")) for info in contacts],
+        "has_company": [bool(info.get("company")) for info in contacts],
+        "has_title": [bool(info.get("title")) for info in contacts],
+        "has_product_interest": [bool(row[interest]) for row in rows],
+        "has_utm_source": [bool(row[utm_source]) for row in rows],
+        "has_utm_medium": [bool(row[utm_medium]) for row in rows],
+        "has_utm_campaign": [bool(row[utm_campaign]) for row in rows],
+        "product_interest": [row[interest] for row in rows],
+    }
+
+
+def rescore_rows(rows: Sequence[Sequence[Any]], rules: RuleSet) -> List[Dict[str, Any]]:
+    """Score rows selected with `RESCORE_COLUMNS` under `rules` and return their updates.
+
+    Runs the vectorized scorer over the whole chunk. Suggested tags are
+    replaced while tags added by users are kept. Rows whose outputs and
+    version stamp are already current are skipped. Pure and picklable, so it
+    can run in a worker process.
+    """
+    if not rows:
+        return []
+
+    columns = feature_columns(rows, offset=1)
+
+    scores = rules.score_batch(columns)
+    priorities = rules.priority_batch(scores)
+    suggested = masks_to_tags(rules.tag_batch(columns, scores))
+    vocabulary = set(rules.tag_order)
+
+    updates = []
+    for row, score, priority, tags in zip(rows, scores.tolist(), priorities, suggested):
+        old_tags = row[10] or []
+        new_tags = [tag for tag in old_tags if tag not in vocabulary]
+        new_tags += [tag for tag in tags if tag not in new_tags]
+
+        if (
+            score == row[8] and priority == row[9] and set(new_tags) == set(old_tags)
+            and row[11] == rules.version
+        ):
+            continue
+        updates.append({
+            "lead_id": row[0],
+            "new_score": score,
+            "new_priority": priority,
+            "new_tags": new_tags,
+            "new_version": rules.version,
+        })
+
+    return updates
+
+
+def get_rescore_job() -> Optional[LeadRescoreJobResponse]:
+    """Return the rescoring job started by this process, if any."""
+    return _job
+
+
+def start_rescore_job() -> LeadRescoreJobResponse:
+    """Register a new rescoring job; only one may run at a time per process."""
+    global _job
+
+    if _job and _job.status in (LeadImportJobStatus.PENDING, LeadImportJobStatus.RUNNING):
+        raise RuntimeError("A rescoring job is already running")
+
+    _job = LeadRescoreJobResponse()
+    return _job
+
+
+async def load_checkpoint() -> Optional[LeadRescoreJobResponse]:
+    """Describe the persisted checkpoint, e.g. after a restart."""
+    async with AsyncSessionLocal() as db:
+        checkpoint = await db.get(RescoreCheckpointORM, CHECKPOINT_NAME)
+
+    if not checkpoint:
+        return None
+
+    return LeadRescoreJobResponse(
+        status=checkpoint.status,
+        scanned=checkpoint.scanned,
+        changed=checkpoint.changed,
+        last_lead_id=checkpoint.last_lead_id,
+        error=checkpoint.error,
+        started_at=checkpoint.started_at,
+        finished_at=checkpoint.finished_at,
+    )
+
+
+async def run_rescore_job(
+    job: LeadRescoreJobResponse,
+    restart: bool = False,
+    chunk_size: Optional[int] = None,
+    workers: Optional[int] = None,
+    stale_only: bool = False,
+) -> None:
+    """Rescore every lead in primary-key order, resuming from the checkpoint.
+
+    With `workers`, up to that many chunks are scored in worker processes
+    while the following chunks are read. Each chunk's ``UPDATE`` and
+    checkpoint are committed together, in primary-key order, so a run
+    killed at any point resumes exactly after the last committed chunk.
+    Unless `restart` is set, a checkpoint left by an interrupted or failed run
+    is picked up; a completed one starts a fresh pass. The whole run uses the
+    rule set active when it starts; `stale_only` skips leads already stamped
+    with that version.
+    """
+    chunk_size = chunk_size or settings.RESCORE_CHUNK_SIZE
+    workers = settings.RESCORE_WORKERS if workers is None else workers
+    executor: Optional[Executor] = ProcessPoolExecutor(workers) if workers > 0 else None
+    loop = asyncio.get_running_loop()
+    rules = current_rules()
+
+    job.scoring_version = rules.version
+    job.status = LeadImportJobStatus.RUNNING
+    job.started_at = datetime.utcnow()
+    started = time.perf_counter()
+    scanned_before = 0
+
+    try:
+        async with AsyncSessionLocal() as db:
+            job.total = await db.scalar(select(func.count(LeadORM.id)))
+
+            checkpoint = await db.get(RescoreCheckpointORM, CHECKPOINT_NAME)
+            if checkpoint is None:
+                checkpoint = RescoreCheckpointORM(name=CHECKPOINT_NAME)
+                db.add(checkpoint)
+            elif not restart and checkpoint.status != LeadImportJobStatus.COMPLETED.value:
+                job.resumed = True
+                job.last_lead_id = checkpoint.last_lead_id
+                job.scanned = scanned_before = checkpoint.scanned
+                job.changed = checkpoint.changed
+
+            checkpoint.status = LeadImportJobStatus.RUNNING.value
+            checkpoint.last_lead_id = job.last_lead_id
+            checkpoint.scanned = job.scanned
+            checkpoint.changed = job.changed
+            checkpoint.error = None
+            checkpoint.finished_at = None
+            if not job.resumed:
+                checkpoint.started_at = job.started_at
+            await db.commit()
+
+            # Up to `workers` chunks are scored while the next ones are read;
+            # results are written back in primary-key order
+            in_flight: Deque[Tuple[List[tuple], Optional[asyncio.Future]]] = deque()
+            read_after = job.last_lead_id
+            exhausted = False
+            while True:
+                while not exhausted and len(in_flight) < max(workers, 1):
+                    query = select(*RESCORE_COLUMNS).order_by(LeadORM.id).limit(chunk_size)
+                    if read_after is not None:
+                        query = query.where(LeadORM.id > read_after)
+                    if stale_only:
+                        query = query.where(or_(
+                            LeadORM.scoring_version.is_(None),
+                            LeadORM.scoring_version != rules.version,
+                        ))
+                    rows = [tuple(row) for row in (await db.execute(query)).all()]
+                    if not rows:
+                        exhausted = True
+                        break
+                    read_after = rows[-1][0]
+                    scoring = (
+                        loop.run_in_executor(executor, rescore_rows, rows, rules)
+                        if executor
+                        else None
+                    )
+                    in_flight.append((rows, scoring))
+                if not in_flight:
+                    break
+
+                rows, scoring = in_flight.popleft()
+                updates = await scoring if scoring else rescore_rows(rows, rules)
+
+                if updates:
+                    await db.execute(_UPDATE_SCORES, updates)
+
+                job.last_lead_id = rows[-1][0]
+                job.scanned += len(rows)
+                job.changed += len(updates)
+                checkpoint.last_lead_id = job.last_lead_id
+                checkpoint.scanned = job.scanned
+                checkpoint.changed = job.changed
+                await db.commit()
+
+                if updates:
+                    notify_leads_changed()
+                _update_rate(job, started, scanned_before)
+
+            checkpoint.status = LeadImportJobStatus.COMPLETED.value
+            checkpoint.finished_at = datetime.utcnow()
+            await db.commit()
+
+        job.status = LeadImportJobStatus.COMPLETED
+    except Exception as e:
+        job.status = LeadImportJobStatus.FAILED
+        job.error = str(e)
+        await _record_failure(str(e))
+    finally:
+        if executor:
+            executor.shutdown(cancel_futures=True)
+        job.finished_at = datetime.utcnow()
+        _update_rate(job, started, scanned_before)
+
+
+def _update_rate(job: LeadRescoreJobResponse, started: float, scanned_before: int) -> None:
+    job.elapsed_seconds = round(time.perf_counter() - started, 3)
+    if job.elapsed_seconds:
+        job.rows_per_second = round((job.scanned - scanned_before) / job.elapsed_seconds, 1)
+
+
+async def _record_failure(error: str) -> None:
+    """Mark the checkpoint failed; its position is left as of the last committed chunk."""
+    async with AsyncSessionLocal() as db:
+        checkpoint = await db.get(RescoreCheckpointORM, CHECKPOINT_NAME)
+        if checkpoint:
+            checkpoint.status = LeadImportJobStatus.FAILED.value
+            checkpoint.error = error
+            checkpoint.finished_at = datetime.utcnow()
+            await db.commit()
@@ -0,0 +1,197 @@
+"""Indexed full-text search over leads.
+
+SQLite uses an FTS5 table mirrored from ``leads`` by triggers, PostgreSQL uses a
+``pg_trgm`` GIN index over a lower-cased search document. Other backends fall back
+to an unindexed ``ILIKE`` scan.
+"""
+import re
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, List
+
+from sqlalchemy import Select, column, func, literal_column, table, text
+from sqlalchemy.engine import Connection
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from apps.api.models import LeadORM
+
+FTS_TABLE = "leads_fts"
+
+# Columns indexed for search: name, email, company, notes, product_interest
+_SQLITE_DOCUMENT = (
+    "new.name, json_extract(new.contact_info, '$.email'), "
+    "json_extract(new.contact_info, '$.company'), new.notes, new.product_interest"
+)
+
+SQLITE_DDL = [
+    f"""
+    CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5(
+        name, email, company, notes, product_interest,
+        tokenize = 'unicode61 remove_diacritics 2',
+        prefix = '2 3'
+    )
+    """,
+    # Single-row switch that lets bulk writers skip the per-row insert trigger
+    f"CREATE TABLE IF NOT EXISTS {FTS_TABLE}_sync (paused INTEGER NOT NULL)",
+    f"""
+    INSERT INTO {FTS_TABLE}_sync (paused)
+    SELECT 0 WHERE NOT EXISTS (SELECT 1 FROM {FTS_TABLE}_sync)
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS leads_fts_insert AFTER INSERT ON leads
+    WHEN (SELECT paused FROM {FTS_TABLE}_sync) = 0 BEGIN
+        INSERT INTO {FTS_TABLE} (rowid, name, email, company, notes, product_interest)
+        VALUES (new.rowid, {_SQLITE_DOCUMENT});
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS leads_fts_update
+    AFTER UPDATE OF name, contact_info, notes, product_interest ON leads BEGIN
+        DELETE FROM {FTS_TABLE} WHERE rowid = old.rowid;
+        INSERT INTO {FTS_TABLE} (rowid, name, email, company, notes, product_interest)
+        VALUES (new.rowid, {_SQLITE_DOCUMENT});
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS leads_fts_delete AFTER DELETE ON leads BEGIN
+        DELETE FROM {FTS_TABLE} WHERE rowid = old.rowid;
+    END
+    """,
+]
+
+_SQLITE_BACKFILL = f"""
+    INSERT INTO {FTS_TABLE} (rowid, name, email, company, notes, product_interest)
+    SELECT rowid, name, json_extract(contact_info, '$.email'),
+           json_extract(contact_info, '$.company'), notes, product_interest
+    FROM leads
+"""
+
+SQLITE_REBUILD = [f"DELETE FROM {FTS_TABLE}", _SQLITE_BACKFILL]
+
+# Must stay textually identical to the index expression so the planner can use it
+POSTGRES_DOCUMENT = (
+    "lower(coalesce(leads.name, '') || ' ' || "
+    "coalesce(leads.contact_info ->> 'email', '') || ' ' || "
+    "coalesce(leads.contact_info ->> 'company', '') || ' ' || "
+    "coalesce(leads.notes, '') || ' ' || "
+    "coalesce(leads.product_interest, ''))"
+)
+
+POSTGRES_DDL = [
+    "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+    "CREATE INDEX IF NOT EXISTS ix_leads_search_trgm ON leads "
+    f"USING gin (({POSTGRES_DOCUMENT.replace('leads.', '')}) gin_trgm_ops)",
+]
+
+_fts = table(FTS_TABLE, column("rowid"), column("rank"))
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+
+def ensure_search_index(conn: Connection) -> None:
+    """Create the search index if missing, backfilling it from existing leads.
+
+    Run through ``AsyncConnection.run_sync`` alongside ``create_all``.
+    """
+    dialect = conn.dialect.name
+    if dialect == "sqlite":
+        exists = conn.exec_driver_sql(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (FTS_TABLE,)
+        ).first()
+        for statement in SQLITE_DDL:
+            conn.exec_driver_sql(statement)
+        if not exists:
+            rebuild_search_index(conn)
+    elif dialect == "postgresql":
+        for statement in POSTGRES_DDL:
+            conn.exec_driver_sql(statement)
+
+
+def rebuild_search_index(conn: Connection) -> None:
+    """Rebuild the SQLite FTS table from scratch.
+
+    FTS rows are keyed by the ``leads`` rowid, so run this after a ``VACUUM``.
+    PostgreSQL indexes are maintained by the database and need no rebuild.
+    """
+    if conn.dialect.name != "sqlite":
+        return
+    for statement in SQLITE_REBUILD:
+        conn.exec_driver_sql(statement)
+
+
+@asynccontextmanager
+async def deferred_search_sync(db: AsyncSession) -> AsyncIterator[None]:
+    """Index rows inserted inside the block with one set-based statement.
+
+    Per-row FTS5 trigger inserts cost more than the row insert itself, so bulk
+    writers pause the trigger, insert, then index everything past the previous
+    rowid watermark. Must run inside a transaction: SQLite's write lock keeps
+    other writers out until commit, and a rollback also undoes the pause.
+    """
+    if db.bind.dialect.name != "sqlite":
+        yield
+        return
+
+    result = await db.execute(text("SELECT coalesce(max(rowid), 0) FROM leads"))
+    watermark = result.scalar_one()
+    await db.execute(text(f"UPDATE {FTS_TABLE}_sync SET paused = 1"))
+
+    yield
+
+    await db.execute(
+        text(f"{_SQLITE_BACKFILL} WHERE rowid > :watermark"), {"watermark": watermark}
+    )
+    await db.execute(text(f"UPDATE {FTS_TABLE}_sync SET paused = 0"))
+
+
+def _fts_query(search: str) -> str:
+    """Turn free text into an FTS5 query with prefix matching on every term."""
+    terms = _TOKEN_RE.findall(search)
+    return " ".join(f'"{term}"*' for term in terms)
+
+
+def _terms(search: str) -> List[str]:
+    return [term.lower() for term in search.split() if term]
+
+
+def apply_search_filter(query: Select, search: str, dialect: str) -> Select:
+    """Restrict `query` to leads matching `search` without changing its ordering."""
+    if dialect == "sqlite":
+        match = _fts_query(search)
+        if match:
+            matching = (
+                _fts.select()
+                .with_only_columns(_fts.c.rowid)
+                .where(literal_column(FTS_TABLE).match(match))
+            )
+            return query.where(literal_column("leads.rowid").in_(matching))
+    elif dialect == "postgresql":
+        document = literal_column(POSTGRES_DOCUMENT)
+        terms = _terms(search)
+        if terms:
+            return query.where(*[document.contains(term, autoescape=True) for term in terms])
+
+    return query.where(
+        (LeadORM.name.ilike(f"%{search}%"))
+        | (LeadORM.contact_info["email"].as_string().ilike(f"%{search}%"))
+    )
+
+
+def apply_ranked_search(query: Select, search: str, dialect: str) -> Select:
+    """Restrict `query` to leads matching `search`, best matches first."""
+    if dialect == "sqlite":
+        match = _fts_query(search)
+        if match:
+            return (
+                query.join(_fts, _fts.c.rowid == literal_column("leads.rowid"))
+                .where(literal_column(FTS_TABLE).match(match))
+                .order_by(_fts.c.rank, LeadORM.created_at.desc())
+            )
+    elif dialect == "postgresql":
+        document = literal_column(POSTGRES_DOCUMENT)
+        terms = _terms(search)
+        if terms:
+            similarity = func.word_similarity(search.lower(), document)
+            return query.where(
+                *[document.contains(term, autoescape=True) for term in terms]
+            ).order_by(similarity.desc(), LeadORM.created_at.desc())
+
+    return apply_search_filter(query, search, dialect).order_by(LeadORM.created_at.desc())
@@ -0,0 +1,54 @@
+"""Cached lead statistics computed in a single table scan."""
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from apps.api.models import LeadORM
+from apps.api.services.response_cache import ResponseCache
+from packages.core.schemas.lead import LeadStatsResponse
+
+
+async def compute_lead_stats(db: AsyncSession) -> LeadStatsResponse:
+    """Compute the stats overview with one GROUP BY over (stage, source, priority).
+
+    The finest grouping has at most a few hundred rows, so the per-dimension
+    breakdowns and totals are rolled up in Python instead of issuing one query
+    per dimension.
+    """
+    result = await db.execute(
+        select(
+            LeadORM.stage,
+            LeadORM.source,
+            LeadORM.priority,
+            func.count(LeadORM.id),
+            func.coalesce(func.sum(LeadORM.score), 0),
+            func.sum(LeadORM.estimated_value),
+        ).group_by(LeadORM.stage, LeadORM.source, LeadORM.priority)
+    )
+
+    total_leads = 0
+    total_score = 0
+    total_estimated_value = 0.0
+    by_stage: dict[str, int] = {}
+    by_source: dict[str, int] = {}
+    by_priority: dict[str, int] = {}
+
+    for stage, source, priority, count, score_sum, value_sum in result.all():
+        total_leads += count
+        total_score += score_sum
+        total_estimated_value += value_sum or 0.0
+        by_stage[str(stage)] = by_stage.get(str(stage), 0) + count
+        by_source[str(source)] = by_source.get(str(source), 0) + count
+        by_priority[str(priority)] = by_priority.get(str(priority), 0) + count
+
+    return LeadStatsResponse(
+        total_leads=total_leads,
+        by_stage=by_stage,
+        by_source=by_source,
+        by_priority=by_priority,
+        average_score=total_score / total_leads if total_leads else 0.0,
+        total_estimated_value=float(total_estimated_value),
+    )
+
+
+# Global cache instance
+lead_stats_cache = ResponseCache("lead_stats", LeadStatsResponse)
@@ -0,0 +1,141 @@
+"""Materialization of ``TaskStatus.OVERDUE``.
+
+Pending tasks past their due date are flipped to OVERDUE by a sweeper with
+set-based ``UPDATE`` statements of at most ``OVERDUE_SWEEP_BATCH_SIZE`` rows,
+each committed on its own so no sweep holds a long write lock. Reads of
+overdue tasks then use the ``(status, due_date, id)`` index instead of
+recomputing the condition.
+
+The sweeper runs every ``OVERDUE_SWEEP_SECONDS`` and as soon as the task
+scheduler reports a due date. Sweeps are idempotent, so every worker can
+run one.
+"""
+import asyncio
+import logging
+import time
+from datetime import datetime
+from typing import List, Optional
+from uuid import UUID
+
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from apps.api.config import settings
+from apps.api.database import AsyncSessionLocal
+from apps.api.models import TaskORM
+from apps.api.services.task_scheduler import DeadlineKind, task_scheduler
+from packages.core.models.task import TaskStatus
+from packages.core.schemas.task import OverdueSweepResponse
+
+logger = logging.getLogger(__name__)
+
+_tasks = TaskORM.__table__
+
+
+def mark_overdue_statement(now: datetime, limit: int):
+    """UPDATE flipping up to `limit` pending tasks due before `now` to OVERDUE."""
+    batch = (
+        select(_tasks.c.id)
+        .where(_tasks.c.status == TaskStatus.PENDING, _tasks.c.due_date < now)
+        .order_by(_tasks.c.due_date)
+        .limit(limit)
+    )
+    # updated_at is pinned: the sweep is not an edit of the task
+    return (
+        update(_tasks)
+        .where(_tasks.c.id.in_(batch.scalar_subquery()))
+        .values(status=TaskStatus.OVERDUE, updated_at=_tasks.c.updated_at)
+    )
+
+
+async def sweep_overdue_tasks(
+    session_factory: async_sessionmaker[AsyncSession] = AsyncSessionLocal,
+    batch_size: Optional[int] = None,
+) -> OverdueSweepResponse:
+    """Mark every pending task past its due date as OVERDUE, one batch per transaction."""
+    batch_size = batch_size or settings.OVERDUE_SWEEP_BATCH_SIZE
+    started = time.perf_counter()
+    now = datetime.utcnow()
+    marked = batches = 0
+    while True:
+        async with session_factory() as db:
+            result = await db.execute(mark_overdue_statement(now, batch_size))
+            await db.commit()
+        batches += 1
+        marked += result.rowcount
+        if result.rowcount < batch_size:
+            break
+    return OverdueSweepResponse(
+        marked=marked,
+        batches=batches,
+        elapsed_seconds=round(time.perf_counter() - started, 3),
+    )
+
+
+class OverdueSweeper:
+    """Background loop running `sweep_overdue_tasks` periodically and on demand."""
+
+    def __init__(self, session_factory: async_sessionmaker[AsyncSession] = AsyncSessionLocal):
+        """Create a stopped sweeper."""
+        self._session_factory = session_factory
+        self._wake = asyncio.Event()
+        self._loop_task: Optional[asyncio.Task] = None
+
+    @property
+    def running(self) -> bool:
+        """Whether the sweep loop is running."""
+        return self._loop_task is not None and not self._loop_task.done()
+
+    async def start(self) -> None:
+        """Start the loop (no-op when already running)."""
+        if not self.running:
+            self._loop_task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Cancel the loop."""
+        if self._loop_task is not None:
+            self._loop_task.cancel()
+            await asyncio.gather(self._loop_task, return_exceptions=True)
+            self._loop_task = None
+
+    def wake(self) -> None:
+        """Sweep as soon as possible."""
+        self._wake.set()
+
+    async def _run(self) -> None:
+        while True:
+            self._wake.clear()
+            try:
+                result = await sweep_overdue_tasks(self._session_factory)
+                if result.marked:
+                    logger.info(
+                        "Marked %d tasks overdue in %.3fs", result.marked, result.elapsed_seconds
+                    )
+            except Exception:
+                logger.exception("Overdue sweep failed")
+            try:
+                await asyncio.wait_for(self._wake.wait(), settings.OVERDUE_SWEEP_SECONDS)
+            except asyncio.TimeoutError:
+                pass
+
+
+# Global sweeper instance, started from the application lifespan
+overdue_sweeper = OverdueSweeper()
+
+
+async def _on_tasks_due(kind: DeadlineKind, task_ids: List[UUID]) -> None:
+    overdue_sweeper.wake()
+
+
+task_scheduler.add_handler("due", _on_tasks_due)
+
+
+async def start_overdue_sweeper() -> None:
+    """Start the overdue sweeper when enabled."""
+    if settings.OVERDUE_SWEEP_ENABLED:
+        await overdue_sweeper.start()
+
+
+async def stop_overdue_sweeper() -> None:
+    """Stop the overdue sweeper."""
+    await overdue_sweeper.stop()
@@ -0,0 +1,241 @@
+"""Lease-based reminder dispatch, safe to run in every API worker.
+
+A worker claims a batch of due reminders with one conditional
+``UPDATE ... RETURNING``: pending tasks whose reminder is due, not yet sent
+and not leased (or whose lease expired) get this worker as
+``reminder_lease_owner`` until ``reminder_lease_expires_at``. On PostgreSQL
+the candidates are picked with ``FOR UPDATE SKIP LOCKED``, so concurrent
+claimers skip each other's rows instead of waiting; SQLite serializes
+writers, so the conditional UPDATE alone is atomic. Once the sender has
+handled the batch it is stamped ``reminded_at`` and the lease released. If
+the sender fails or the worker dies, the lease expires and any worker
+retries the batch.
+
+Each worker dispatches when the task scheduler reports a due reminder and
+every ``REMINDER_POLL_SECONDS`` otherwise, which covers reminders made due by
+other workers, ones missed while no worker was running, and expired leases.
+"""
+import asyncio
+import logging
+import os
+import socket
+import time
+from datetime import datetime, timedelta
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+from uuid import UUID, uuid4
+
+from sqlalchemy import or_, select, update
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from apps.api.config import settings
+from apps.api.database import AsyncSessionLocal
+from apps.api.models import TaskORM
+from apps.api.serialization import TASK_PLAN
+from apps.api.services.task_automation import OPEN_TASK_STATUSES
+from apps.api.services.task_scheduler import DeadlineKind, task_scheduler
+from packages.core.schemas.task import ReminderDispatchStatusResponse
+
+logger = logging.getLogger(__name__)
+
+ReminderSender = Callable[[List[Dict[str, Any]]], Awaitable[None]]
+
+_tasks = TaskORM.__table__
+
+
+async def log_reminders(tasks: List[Dict[str, Any]]) -> None:
+    """Default sender: log the reminders instead of delivering them."""
+    for task in tasks:
+        logger.info("Reminder for task %s: %s", task["id"], task["title"])
+
+
+def claim_statement(owner: str, now: datetime, limit: int, dialect: str):
+    """UPDATE that leases up to `limit` due reminders to `owner` and returns them."""
+    candidates = (
+        select(_tasks.c.id)
+        .where(
+            _tasks.c.status.in_(OPEN_TASK_STATUSES),
+            _tasks.c.reminder_at <= now,
+            _tasks.c.reminded_at.is_(None),
+            or_(
+                _tasks.c.reminder_lease_expires_at.is_(None),
+                _tasks.c.reminder_lease_expires_at < now,
+            ),
+        )
+        .order_by(_tasks.c.reminder_at)
+        .limit(limit)
+    )
+    if dialect == "postgresql":
+        candidates = candidates.with_for_update(skip_locked=True)
+
+    return (
+        update(_tasks)
+        .where(_tasks.c.id.in_(candidates.scalar_subquery()))
+        .values(
+            reminder_lease_owner=owner,
+            reminder_lease_expires_at=now + timedelta(seconds=settings.REMINDER_LEASE_SECONDS),
+            updated_at=_tasks.c.updated_at,
+        )
+        .returning(*(_tasks.c[column.key] for column in TASK_PLAN.columns))
+    )
+
+
+class ReminderDispatcher:
+    """Claims, sends and stamps due reminders in leased batches."""
+
+    def __init__(
+        self,
+        session_factory: async_sessionmaker[AsyncSession] = AsyncSessionLocal,
+        sender: ReminderSender = log_reminders,
+        owner: Optional[str] = None,
+    ):
+        """Create a stopped dispatcher identified as `owner` in leases."""
+        self._session_factory = session_factory
+        self.sender = sender
+        self.owner = owner or f"{socket.gethostname()}:{os.getpid()}:{uuid4().hex[:8]}"
+        self._wake = asyncio.Event()
+        self._loop_task: Optional[asyncio.Task] = None
+        self._lock = asyncio.Lock()
+        self._counters = dict.fromkeys(
+            ("batches", "claimed", "dispatched", "failed", "lease_lost"), 0
+        )
+        self._busy_seconds = 0.0
+        self._lag_total = 0.0
+        self._lag_max = 0.0
+        self._lag_last: Optional[float] = None
+
+    @property
+    def running(self) -> bool:
+        """Whether the dispatch loop is running."""
+        return self._loop_task is not None and not self._loop_task.done()
+
+    async def start(self) -> None:
+        """Start the loop (no-op when already running)."""
+        if not self.running:
+            self._loop_task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Cancel the loop; leased batches expire and are retried elsewhere."""
+        if self._loop_task is not None:
+            self._loop_task.cancel()
+            await asyncio.gather(self._loop_task, return_exceptions=True)
+            self._loop_task = None
+
+    def wake(self) -> None:
+        """Dispatch as soon as possible."""
+        self._wake.set()
+
+    async def dispatch_due(self) -> int:
+        """Send every due, unclaimed reminder in batches; return how many were sent.
+
+        Delivery is at least once: a batch whose lease expired before it was
+        stamped may also have been sent by another worker (``lease_lost``).
+        """
+        async with self._lock:
+            sent = 0
+            while True:
+                started = time.perf_counter()
+                batch = await self._claim()
+                if batch:
+                    sent += await self._send(batch)
+                self._busy_seconds += time.perf_counter() - started
+                if len(batch) < settings.REMINDER_BATCH_SIZE:
+                    return sent
+
+    def status(self) -> ReminderDispatchStatusResponse:
+        """Lifetime counters, throughput and reminder lag."""
+        dispatched = self._counters["dispatched"]
+        return ReminderDispatchStatusResponse(
+            running=self.running,
+            owner=self.owner,
+            **self._counters,
+            busy_seconds=round(self._busy_seconds, 3),
+            throughput_per_second=(
+                round(dispatched / self._busy_seconds, 1) if self._busy_seconds else None
+            ),
+            average_lag_seconds=round(self._lag_total / dispatched, 3) if dispatched else None,
+            max_lag_seconds=round(self._lag_max, 3),
+            last_lag_seconds=round(self._lag_last, 3) if self._lag_last is not None else None,
+        )
+
+    async def _run(self) -> None:
+        while True:
+            self._wake.clear()
+            try:
+                await self.dispatch_due()
+            except Exception:
+                logger.exception("Reminder dispatch failed")
+            try:
+                await asyncio.wait_for(self._wake.wait(), settings.REMINDER_POLL_SECONDS)
+            except asyncio.TimeoutError:
+                pass
+
+    async def _claim(self) -> List[Dict[str, Any]]:
+        async with self._session_factory() as db:
+            result = await db.execute(
+                claim_statement(
+                    self.owner,
+                    datetime.utcnow(),
+                    settings.REMINDER_BATCH_SIZE,
+                    db.bind.dialect.name,
+                )
+            )
+            batch = TASK_PLAN.rows_to_dicts(result.all())
+            await db.commit()
+        self._counters["batches"] += bool(batch)
+        self._counters["claimed"] += len(batch)
+        return batch
+
+    async def _send(self, batch: List[Dict[str, Any]]) -> int:
+        try:
+            await self.sender(batch)
+        except Exception:
+            self._counters["failed"] += len(batch)
+            logger.exception("Sending %d reminders failed; retrying after the lease", len(batch))
+            return 0
+
+        now = datetime.utcnow()
+        ids: List[UUID] = [task["id"] for task in batch]
+        async with self._session_factory() as db:
+            # Only rows still leased to us: an expired lease may have been re-claimed
+            result = await db.execute(
+                update(_tasks)
+                .where(_tasks.c.id.in_(ids), _tasks.c.reminder_lease_owner == self.owner)
+                .values(
+                    reminded_at=now,
+                    reminder_lease_owner=None,
+                    reminder_lease_expires_at=None,
+                    updated_at=_tasks.c.updated_at,
+                )
+            )
+            await db.commit()
+
+        for task in batch:
+            lag = (now - task["reminder_at"]).total_seconds()
+            self._lag_total += lag
+            self._lag_max = max(self._lag_max, lag)
+            self._lag_last = lag
+        self._counters["dispatched"] += len(batch)
+        self._counters["lease_lost"] += len(batch) - result.rowcount
+        return len(batch)
+
+
+# Global dispatcher instance, started from the application lifespan
+reminder_dispatcher = ReminderDispatcher()
+
+
+async def _on_reminders_due(kind: DeadlineKind, task_ids: List[UUID]) -> None:
+    reminder_dispatcher.wake()
+
+
+task_scheduler.add_handler("reminder", _on_reminders_due)
+
+
+async def start_reminder_dispatch() -> None:
+    """Start the reminder dispatcher when enabled."""
+    if settings.REMINDER_DISPATCH_ENABLED:
+        await reminder_dispatcher.start()
+
+
+async def stop_reminder_dispatch() -> None:
+    """Stop the reminder dispatcher."""
+    await reminder_dispatcher.stop()
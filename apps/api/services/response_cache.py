@@ -0,0 +1,300 @@
+"""Response cache for read-heavy endpoints, invalidated by lead writes.
+
+Each cached endpoint owns a `ResponseCache` namespace. Entries are keyed on
+the normalized query parameters and remember the leads generation they were
+computed at. An entry is served until a write bumps the generation, and never
+after ``STATS_MAX_AGE_SECONDS``. Concurrent misses for the same key share one
+computation.
+
+The default backend is an in-process LRU whose generation only counts this
+process's writes, so with several workers an entry can outlive another
+worker's write by up to ``STATS_MAX_AGE_SECONDS``. With
+``RESPONSE_CACHE_BACKEND=shared`` the entries and the generation live in a
+Redis-compatible store, so workers share entries and see each other's writes
+immediately. Without ``RESPONSE_CACHE_URL``, an in-process stand-in for that
+store is used.
+"""
+import asyncio
+import time
+from collections import OrderedDict
+from datetime import date, datetime
+from enum import Enum
+from typing import (
+    Any,
+    Awaitable,
+    Callable,
+    Dict,
+    Generic,
+    NamedTuple,
+    Optional,
+    Set,
+    Tuple,
+    Type,
+    TypeVar,
+)
+from urllib.parse import urlencode
+
+import orjson
+from pydantic import BaseModel
+
+from apps.api.config import settings
+from apps.api.services.lead_changes import add_leads_listener, leads_generation
+
+ResponseT = TypeVar("ResponseT", bound=BaseModel)
+
+
+class CacheEntry(NamedTuple):
+    """A cached response and the leads generation it was computed at."""
+
+    generation: int
+    stored_at: float  # Wall clock, comparable across workers
+    value: Any
+
+
+class MemoryCacheBackend:
+    """Bounded in-process LRU with per-entry expiry."""
+
+    shared = False
+
+    def __init__(self, max_entries: int):
+        """Keep at most `max_entries` entries across all namespaces."""
+        self.max_entries = max_entries
+        self._entries: OrderedDict[str, Tuple[float, CacheEntry]] = OrderedDict()
+
+    async def generation(self) -> int:
+        """Current leads generation of this process."""
+        return leads_generation()
+
+    async def get(self, key: str) -> Optional[CacheEntry]:
+        """Return the unexpired entry for `key`, if any."""
+        item = self._entries.get(key)
+        if item is None:
+            return None
+        expires_at, entry = item
+        if time.monotonic() >= expires_at:
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return entry
+
+    async def set(self, key: str, entry: CacheEntry, ttl: float) -> None:
+        """Store `entry` for `ttl` seconds, evicting the least recently used."""
+        self._entries[key] = (time.monotonic() + ttl, entry)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    async def close(self) -> None:
+        """Release resources (nothing to do in process)."""
+
+
+class LocalSharedStore:
+    """In-process stand-in for the subset of the Redis API the shared backend uses."""
+
+    def __init__(self, max_entries: int):
+        """Keep at most `max_entries` values, oldest first out; counters are kept apart."""
+        self.max_entries = max_entries
+        self._data: OrderedDict[str, Tuple[Optional[float], bytes]] = OrderedDict()
+        self._counters: Dict[str, int] = {}
+
+    async def get(self, key: str) -> Optional[bytes]:
+        """Return the value of `key`, if set and unexpired."""
+        if key in self._counters:
+            return str(self._counters[key]).encode()
+        item = self._data.get(key)
+        if item is None:
+            return None
+        expires_at, value = item
+        if expires_at is not None and time.monotonic() >= expires_at:
+            del self._data[key]
+            return None
+        return value
+
+    async def set(self, key: str, value: bytes, ex: Optional[float] = None) -> None:
+        """Set `key`, expiring after `ex` seconds if given."""
+        expires_at = time.monotonic() + ex if ex else None
+        self._data[key] = (expires_at, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.max_entries:
+            self._data.popitem(last=False)
+
+    async def incr(self, key: str) -> int:
+        """Increment the integer at `key` and return the new value."""
+        self._counters[key] = self._counters.get(key, 0) + 1
+        return self._counters[key]
+
+    async def aclose(self) -> None:
+        """Delete every key; there is no connection to close."""
+        self._data.clear()
+        self._counters.clear()
+
+
+class SharedCacheBackend:
+    """Entries and the leads generation in a Redis-compatible store.
+
+    `client` needs ``get``, ``set(ex=)``, ``incr`` and ``aclose``,
+    as provided by ``redis.asyncio.Redis`` or `LocalSharedStore`. Lead writes
+    in this process bump the shared generation in the background; reads wait
+    for those bumps first so a worker always sees its own writes.
+    """
+
+    shared = True
+
+    def __init__(self, client, prefix: str = "antleads:response:"):
+        """Use `client` for storage, namespacing keys under `prefix`."""
+        self.client = client
+        self.prefix = prefix
+        self._generation_key = prefix + "generation"
+        self._bumps: Set[asyncio.Task] = set()
+
+    def bump_generation(self) -> None:
+        """Increment the shared generation in the background."""
+        try:
+            task = asyncio.get_running_loop().create_task(self.client.incr(self._generation_key))
+        except RuntimeError:
+            return  # No event loop; other workers fall back to the max age
+        self._bumps.add(task)
+        task.add_done_callback(self._bumps.discard)
+
+    async def generation(self) -> int:
+        """Shared leads generation, including this worker's pending bumps."""
+        if self._bumps:
+            await asyncio.gather(*self._bumps, return_exceptions=True)
+        return int(await self.client.get(self._generation_key) or 0)
+
+    async def get(self, key: str) -> Optional[CacheEntry]:
+        """Return the stored entry for `key`, with the value still encoded."""
+        raw = await self.client.get(self.prefix + key)
+        if raw is None:
+            return None
+        generation, stored_at, value = orjson.loads(raw)
+        return CacheEntry(generation, stored_at, value)
+
+    async def set(self, key: str, entry: CacheEntry, ttl: float) -> None:
+        """Store `entry` (with a JSON-ready value) for `ttl` seconds."""
+        await self.client.set(self.prefix + key, orjson.dumps(tuple(entry)), ex=max(int(ttl), 1))
+
+    async def close(self) -> None:
+        """Close the client connection."""
+        await self.client.aclose()
+
+
+CacheBackend = MemoryCacheBackend | SharedCacheBackend
+
+_backend: Optional[CacheBackend] = None
+
+
+def create_backend() -> CacheBackend:
+    """Build the backend selected by ``RESPONSE_CACHE_BACKEND``."""
+    if settings.RESPONSE_CACHE_BACKEND == "memory":
+        return MemoryCacheBackend(settings.RESPONSE_CACHE_SIZE)
+    if settings.RESPONSE_CACHE_BACKEND != "shared":
+        raise ValueError(f"Unknown RESPONSE_CACHE_BACKEND: {settings.RESPONSE_CACHE_BACKEND}")
+
+    if not settings.RESPONSE_CACHE_URL:
+        return SharedCacheBackend(LocalSharedStore(settings.RESPONSE_CACHE_SIZE))
+    try:
+        from redis import asyncio as aioredis
+    except ImportError as exc:
+        raise RuntimeError("RESPONSE_CACHE_URL requires the 'redis' package") from exc
+    return SharedCacheBackend(aioredis.from_url(settings.RESPONSE_CACHE_URL))
+
+
+def cache_backend() -> CacheBackend:
+    """Return the process-wide backend, creating it on first use."""
+    global _backend
+    if _backend is None:
+        _backend = create_backend()
+    return _backend
+
+
+def _on_leads_changed() -> None:
+    if _backend is not None and _backend.shared:
+        _backend.bump_generation()
+
+
+add_leads_listener(_on_leads_changed)
+
+
+async def close_response_cache() -> None:
+    """Close the backend; the next use creates a new one."""
+    global _backend
+    if _backend is not None:
+        await _backend.close()
+        _backend = None
+
+
+def cache_key(namespace: str, params: Dict[str, Any]) -> str:
+    """Stable key for `params`: sorted, None dropped, values in their wire form."""
+    items = sorted(
+        (name, _wire_value(value)) for name, value in params.items() if value is not None
+    )
+    return f"{namespace}?{urlencode(items)}"
+
+
+def _wire_value(value: Any) -> str:
+    if isinstance(value, Enum):
+        return str(value.value)
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    return str(value)
+
+
+class ResponseCache(Generic[ResponseT]):
+    """Cached `model` responses of one endpoint, keyed on its query parameters."""
+
+    def __init__(self, namespace: str, model: Type[ResponseT]):
+        """Create a cache whose keys start with `namespace`."""
+        self.namespace = namespace
+        self.model = model
+        self._inflight: Dict[str, asyncio.Future] = {}
+
+    async def get(self, compute: Callable[[], Awaitable[ResponseT]], **params: Any) -> ResponseT:
+        """Return the cached response for `params`, or compute and store it.
+
+        While a computation for the same key is running, further misses wait
+        for its result instead of starting their own.
+        """
+        key = cache_key(self.namespace, params)
+        backend = cache_backend()
+        generation = await backend.generation()
+
+        entry = await backend.get(key)
+        if entry is not None and _is_fresh(entry, generation):
+            return self.model.model_validate(entry.value) if backend.shared else entry.value
+
+        while (pending := self._inflight.get(key)) is not None:
+            try:
+                return await asyncio.shield(pending)
+            except asyncio.CancelledError:
+                if not pending.cancelled():
+                    raise
+                # The request computing it was cancelled; take over
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            response = await compute()
+            value = response.model_dump(mode="json") if backend.shared else response
+            await backend.set(
+                key, CacheEntry(generation, time.time(), value), settings.STATS_MAX_AGE_SECONDS
+            )
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as exc:
+            future.set_exception(exc)
+            future.exception()  # Waiters re-raise it; don't warn when there are none
+            raise
+        else:
+            future.set_result(response)
+            return response
+        finally:
+            del self._inflight[key]
+
+
+def _is_fresh(entry: CacheEntry, generation: int) -> bool:
+    return (
+        entry.generation == generation
+        and time.time() - entry.stored_at < settings.STATS_MAX_AGE_SECONDS
+    )
@@ -0,0 +1,93 @@
+"""Loading and hot-reloading the active scoring rule set and conversion model."""
+from datetime import datetime
+from typing import Optional
+
+from sqlalchemy import func, or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from apps.api.config import settings
+from apps.api.models import LeadORM
+from packages.ml.conversion_model import ConversionModel, load_model
+from packages.ml.lead_scoring import current_rules, scorer
+from packages.ml.scoring_rules import RuleSet, load_rules
+
+_loaded_from: Optional[str] = None
+_loaded_at = datetime.utcnow()
+
+
+class RulesVersionConflict(ValueError):
+    """The rules file changed without a new version, which would hide stale leads."""
+
+
+def configure_scoring_rules() -> RuleSet:
+    """Activate the rules from ``SCORING_RULES_PATH`` and model from ``SCORING_MODEL_PATH``.
+
+    Without a rules file the bundled default applies; without a model
+    artifact the heuristic score applies. Also sizes the score memo.
+    """
+    global _loaded_from, _loaded_at
+
+    scorer.memo.resize(settings.SCORE_MEMO_SIZE)
+    scorer.swap_rules(RuleSet(load_rules(settings.SCORING_RULES_PATH or None)).with_model(
+        _load_configured_model()
+    ))
+    _loaded_from = settings.SCORING_RULES_PATH or None
+    _loaded_at = datetime.utcnow()
+    return current_rules()
+
+
+def reload_scoring_rules() -> RuleSet:
+    """Re-read the rules file and model artifact and swap them in without a restart.
+
+    Leads in flight finish with the rule set they started with. Reloading
+    unchanged files is a no-op; a changed rules file must carry a new version
+    so the leads scored by the old one can be found and rescored. Model
+    versions are derived from the weights, so a retrained model always gets
+    a new one.
+    """
+    global _loaded_from, _loaded_at
+
+    rules = load_rules(settings.SCORING_RULES_PATH or None)
+    model = _load_configured_model()
+    active = current_rules()
+
+    same_rules = rules == active.rules
+    if rules.version == active.rules.version and not same_rules:
+        raise RulesVersionConflict(
+            f"Rules changed but version is still '{rules.version}'; bump the version"
+        )
+    if same_rules and _model_version(model) == _model_version(active.model):
+        return active
+
+    rule_set = active if same_rules else RuleSet(rules)
+    scorer.swap_rules(rule_set.with_model(model))
+    _loaded_from = settings.SCORING_RULES_PATH or None
+    _loaded_at = datetime.utcnow()
+    return current_rules()
+
+
+def _load_configured_model() -> Optional[ConversionModel]:
+    return load_model(settings.SCORING_MODEL_PATH) if settings.SCORING_MODEL_PATH else None
+
+
+def _model_version(model: Optional[ConversionModel]) -> Optional[str]:
+    return model.version if model else None
+
+
+def rules_loaded_from() -> Optional[str]:
+    """Path of the active rules file, or None for the bundled default."""
+    return _loaded_from
+
+
+def rules_loaded_at() -> datetime:
+    """When the active rules were activated."""
+    return _loaded_at
+
+
+async def count_stale_leads(db: AsyncSession, version: str) -> int:
+    """Count leads scored by a rule set other than `version`."""
+    return await db.scalar(
+        select(func.count(LeadORM.id)).where(
+            or_(LeadORM.scoring_version.is_(None), LeadORM.scoring_version != version)
+        )
+    )
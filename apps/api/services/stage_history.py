@@ -0,0 +1,221 @@
+"""Stage-transition log and the incremental stage duration summary.
+
+Every stage change appends one `LeadStageHistoryORM` row for the stay that
+just ended (the open stay lives on ``leads.stage_entered_at``) and adds it to
+the ``stage_durations`` histogram in the same transaction. The funnel reads
+average and median days per stage from the histogram only.
+"""
+from collections import defaultdict
+from datetime import datetime
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+from uuid import UUID
+
+from sqlalchemy import case, cast, delete, func, insert, select
+from sqlalchemy import Integer as SQLInteger
+from sqlalchemy.engine import Connection
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from apps.api.database import increment_upsert
+from apps.api.models import LeadORM, LeadStageHistoryORM, StageDurationORM
+from packages.core.models.lead import LeadStage
+
+SECONDS_PER_DAY = 86400.0
+# Stays of this many days or more share the last, open-ended bucket
+MAX_BUCKET_DAYS = 365
+
+_history = LeadStageHistoryORM.__table__
+_durations = StageDurationORM.__table__
+_HISTOGRAM_COLUMNS = ["stage", "bucket_days", "stays", "total_seconds"]
+
+
+class StageTransition(NamedTuple):
+    """A lead leaving `from_stage`, entered at `entered_at` (None if unknown)."""
+
+    lead_id: UUID
+    from_stage: LeadStage
+    entered_at: Optional[datetime]
+    exited_at: datetime
+
+
+def stage_entered_at(lead: LeadORM) -> Optional[datetime]:
+    """When the lead entered its current stage, if known.
+
+    Leads created before stage tracking have no timestamp; for those still in
+    NEW the creation time is exact.
+    """
+    if lead.stage_entered_at is not None:
+        return lead.stage_entered_at
+    if lead.stage == LeadStage.NEW:
+        return lead.created_at
+    return None
+
+
+def bucket_days(duration_seconds: float) -> int:
+    """Histogram bucket for a stay of `duration_seconds`."""
+    return min(int(duration_seconds // SECONDS_PER_DAY), MAX_BUCKET_DAYS)
+
+
+async def record_stage_transitions(
+    db: AsyncSession, transitions: Iterable[StageTransition]
+) -> int:
+    """Append history rows and update the duration histogram, in the caller's transaction.
+
+    Set-based: one executemany INSERT for the log and one upsert for the
+    histogram, however many leads moved. On PostgreSQL both go out as a
+    single statement, the log INSERT feeding the upsert as a writable CTE.
+    """
+    rows = []
+    buckets: Dict[Tuple[LeadStage, int], List] = defaultdict(lambda: [0, 0.0])
+    for lead_id, stage, entered_at, exited_at in transitions:
+        duration = None
+        if entered_at is not None:
+            duration = max((exited_at - entered_at).total_seconds(), 0.0)
+            bucket = buckets[(stage, bucket_days(duration))]
+            bucket[0] += 1
+            bucket[1] += duration
+        rows.append({
+            "lead_id": lead_id,
+            "stage": stage,
+            "entered_at": entered_at,
+            "exited_at": exited_at,
+            "duration_seconds": duration,
+        })
+    if not rows:
+        return 0
+
+    dialect = db.bind.dialect.name
+    if dialect == "postgresql":
+        logged = (
+            insert(_history)
+            .values(rows)
+            .returning(_history.c.stage, _history.c.duration_seconds)
+            .cte("logged")
+        )
+        await db.execute(
+            _histogram_upsert(dialect)
+            .from_select(_HISTOGRAM_COLUMNS, _histogram_select(logged, dialect))
+            .add_cte(logged)
+        )
+        return len(rows)
+
+    await db.execute(insert(_history), rows)
+    if buckets:
+        await db.execute(
+            _histogram_upsert(dialect),
+            [
+                {"stage": stage, "bucket_days": day, "stays": stays, "total_seconds": total}
+                for (stage, day), (stays, total) in buckets.items()
+            ],
+        )
+    return len(rows)
+
+
+async def remove_stage_history(db: AsyncSession, lead_ids: Iterable[UUID]) -> None:
+    """Delete the leads' history and subtract it from the histogram, in the caller's transaction.
+
+    Call before deleting the leads. The rows are deleted explicitly because
+    SQLite does not enforce the ``ON DELETE CASCADE``. Emptied buckets are
+    skipped by `stage_duration_summary`.
+    """
+    dialect = db.bind.dialect.name
+    lead_ids = list(lead_ids)
+    stays = (
+        select(_history.c.stage, _history.c.duration_seconds)
+        .where(_history.c.lead_id.in_(lead_ids))
+        .subquery()
+    )
+    await db.execute(
+        _histogram_upsert(dialect).from_select(
+            _HISTOGRAM_COLUMNS, _histogram_select(stays, dialect, sign=-1)
+        )
+    )
+    await db.execute(delete(_history).where(_history.c.lead_id.in_(lead_ids)))
+
+
+def _histogram_upsert(dialect: str):
+    return increment_upsert(
+        _durations,
+        [_durations.c.stage, _durations.c.bucket_days],
+        ["stays", "total_seconds"],
+        dialect,
+    )
+
+
+def _histogram_select(stays, dialect: str, sign: int = 1):
+    """Histogram rows for the completed stays in `stays` (stage and duration columns)."""
+    days = stays.c.duration_seconds / SECONDS_PER_DAY
+    # CAST truncates on SQLite but rounds on PostgreSQL
+    days = cast(func.floor(days) if dialect == "postgresql" else days, SQLInteger)
+    # Bucketed in a subquery so GROUP BY names a column, not a re-bound expression
+    bucketed = (
+        select(
+            stays.c.stage,
+            case((days > MAX_BUCKET_DAYS, MAX_BUCKET_DAYS), else_=days).label("bucket_days"),
+            stays.c.duration_seconds,
+        )
+        .where(stays.c.duration_seconds.is_not(None))
+        .subquery()
+    )
+    return select(
+        bucketed.c.stage,
+        bucketed.c.bucket_days,
+        sign * func.count(),
+        sign * func.sum(bucketed.c.duration_seconds),
+    ).group_by(bucketed.c.stage, bucketed.c.bucket_days)
+
+
+def rebuild_stage_durations(conn: Connection) -> None:
+    """Recompute the duration histogram from the history log."""
+    conn.execute(delete(_durations))
+    conn.execute(
+        insert(_durations).from_select(
+            _HISTOGRAM_COLUMNS, _histogram_select(_history, conn.dialect.name)
+        )
+    )
+
+
+async def stage_duration_summary(
+    db: AsyncSession,
+) -> Dict[LeadStage, Tuple[float, float]]:
+    """Average and median days of completed stays per stage.
+
+    The median is estimated as the average stay of the one-day bucket that
+    holds it, so it stays within the observed stays of that bucket.
+    """
+    result = await db.execute(
+        select(
+            _durations.c.stage,
+            _durations.c.bucket_days,
+            _durations.c.stays,
+            _durations.c.total_seconds,
+        )
+        .where(_durations.c.stays > 0)
+        .order_by(_durations.c.stage, _durations.c.bucket_days)
+    )
+    histograms: Dict[LeadStage, List[Tuple[int, int, float]]] = defaultdict(list)
+    for stage, day, stays, total in result.all():
+        histograms[stage].append((day, stays, total))
+
+    summary = {}
+    for stage, histogram in histograms.items():
+        stays = sum(count for _, count, _ in histogram)
+        total = sum(seconds for _, _, seconds in histogram)
+        summary[stage] = (
+            round(total / stays / SECONDS_PER_DAY, 2),
+            round(_median_days(histogram, stays), 2),
+        )
+    return summary
+
+
+def _median_days(histogram: List[Tuple[int, int, float]], stays: int) -> float:
+    half = stays / 2
+    seen = 0
+    for index, (_, count, total) in enumerate(histogram):
+        seen += count
+        if seen > half:
+            return total / count / SECONDS_PER_DAY
+        if seen == half:
+            # Even number of stays split between this bucket and the next
+            _, next_count, next_total = histogram[index + 1]
+            return (total / count + next_total / next_count) / 2 / SECONDS_PER_DAY
+    return 0.0
@@ -1,15 +1,58 @@
 """Automatic task creation service."""
 from datetime import datetime, timedelta
-from typing import List, Optional
-from uuid import UUID
+from typing import Any, Dict, List, Optional, Sequence
+from uuid import UUID, uuid4
 
-from sqlalchemy import select
+from sqlalchemy import Select, exists, insert, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from apps.api.config import settings
 from apps.api.models import LeadORM, TaskORM
+from apps.api.pagination import seek_after
+from apps.api.serialization import TASK_PLAN
+from apps.api.services.task_scheduler import schedule_task
 from packages.core.models.lead import LeadStage
 from packages.core.models.task import TaskPriority, TaskStatus, TaskType
 
+# Stages whose leads get a re-engagement task when left untouched
+STALE_LEAD_STAGES = [LeadStage.NEW, LeadStage.CONTACTED, LeadStage.QUALIFIED]
+
+# Not started yet; overdue tasks are pending tasks the sweep has marked
+OPEN_TASK_STATUSES = [TaskStatus.PENDING, TaskStatus.OVERDUE]
+
+
+def overdue_tasks_query(after: Optional[Sequence[Any]] = None) -> Select:
+    """Select overdue tasks ordered by ``(due_date, id)``, after that key if given.
+
+    Tasks set to overdue by hand may have no due date; they are listed last.
+    """
+    query = (
+        select(TaskORM)
+        .where(TaskORM.status == TaskStatus.OVERDUE)
+        .order_by(TaskORM.due_date.asc().nullslast(), TaskORM.id)
+    )
+    if after is not None:
+        query = query.where(
+            seek_after(
+                (TaskORM.due_date, TaskORM.id), after, descending=(False, False), nullable=(True,)
+            )
+        )
+    return query
+
+
+def reminder_tasks_query() -> Select:
+    """Select open tasks whose reminder is due and not yet sent, earliest first."""
+    return (
+        select(TaskORM)
+        .where(
+            TaskORM.status.in_(OPEN_TASK_STATUSES),
+            TaskORM.reminder_at <= datetime.utcnow(),
+            TaskORM.reminder_at.isnot(None),
+            TaskORM.reminded_at.is_(None),
+        )
+        .order_by(TaskORM.reminder_at, TaskORM.id)
+    )
+
 
 class TaskAutomationService:
     """Service for automatic task creation and reminders."""
@@ -50,28 +93,27 @@ class TaskAutomationService:
         self.db.add(task)
         await self.db.commit()
         await self.db.refresh(task)
+        schedule_task(task)
 
         return task
 
-    async def create_stage_transition_tasks(
+    def create_stage_transition_tasks(
         self,
-        lead_id: UUID,
+        lead: LeadORM,
         new_stage: LeadStage,
     ) -> List[TaskORM]:
-        """Create tasks based on stage transitions."""
-        tasks = []
-
-        # Get lead details
-        result = await self.db.execute(select(LeadORM).where(LeadORM.id == lead_id))
-        lead = result.scalar_one_or_none()
+        """Create tasks based on stage transitions.
 
-        if not lead:
-            return tasks
+        The tasks are only added to the session, so they are written in the
+        same flush and transaction as the caller's lead update.
+        """
+        tasks = []
+        lead_id = lead.id
 
         # Stage-specific task creation
         if new_stage == LeadStage.NEW:
             # New lead - create initial contact task
-            task = await self._create_task(
+            task = self._add_task(
                 lead_id=lead_id,
                 lead_name=lead.name,
                 title=f"Initial contact with {lead.name}",
@@ -85,7 +127,7 @@ class TaskAutomationService:
 
         elif new_stage == LeadStage.CONTACTED:
             # After contact - schedule follow-up
-            task = await self._create_task(
+            task = self._add_task(
                 lead_id=lead_id,
                 lead_name=lead.name,
                 title=f"Follow up with {lead.name}",
@@ -99,7 +141,7 @@ class TaskAutomationService:
 
         elif new_stage == LeadStage.QUALIFIED:
             # Qualified - schedule demo
-            task = await self._create_task(
+            task = self._add_task(
                 lead_id=lead_id,
                 lead_name=lead.name,
                 title=f"Schedule demo for {lead.name}",
@@ -113,7 +155,7 @@ class TaskAutomationService:
 
         elif new_stage == LeadStage.PROPOSAL:
             # Proposal stage - create proposal task
-            task = await self._create_task(
+            task = self._add_task(
                 lead_id=lead_id,
                 lead_name=lead.name,
                 title=f"Send proposal to {lead.name}",
@@ -126,7 +168,7 @@ class TaskAutomationService:
             tasks.append(task)
 
             # Also create follow-up
-            follow_up = await self._create_task(
+            follow_up = self._add_task(
                 lead_id=lead_id,
                 lead_name=lead.name,
                 title=f"Follow up on proposal with {lead.name}",
@@ -140,7 +182,7 @@ class TaskAutomationService:
 
         elif new_stage == LeadStage.NEGOTIATION:
             # Negotiation - schedule meeting
-            task = await self._create_task(
+            task = self._add_task(
                 lead_id=lead_id,
                 lead_name=lead.name,
                 title=f"Negotiation meeting with {lead.name}",
@@ -154,7 +196,7 @@ class TaskAutomationService:
 
         return tasks
 
-    async def _create_task(
+    def _add_task(
         self,
         lead_id: UUID,
         lead_name: str,
@@ -165,7 +207,7 @@ class TaskAutomationService:
         days_from_now: int,
         assigned_to: Optional[UUID] = None,
     ) -> TaskORM:
-        """Helper to create a task."""
+        """Helper to add a new task to the session, without flushing it."""
         due_date = datetime.utcnow() + timedelta(days=days_from_now)
         reminder_at = due_date - timedelta(hours=2)
 
@@ -181,65 +223,131 @@ class TaskAutomationService:
         )
 
         self.db.add(task)
-        await self.db.commit()
-        await self.db.refresh(task)
-
         return task
 
-    async def get_overdue_tasks(self) -> List[TaskORM]:
-        """Get all overdue tasks."""
-        query = select(TaskORM).where(
-            TaskORM.status == TaskStatus.PENDING,
-            TaskORM.due_date < datetime.utcnow(),
-        )
+    async def get_overdue_tasks(
+        self, limit: Optional[int] = None, after: Optional[Sequence[Any]] = None
+    ) -> List[TaskORM]:
+        """Get overdue tasks, earliest due first.
+
+        Reads the OVERDUE status materialized by the overdue sweep through the
+        ``(status, due_date, id)`` index; `after` is the ``(due_date, id)`` of the
+        last task of the previous page.
+        """
+        query = overdue_tasks_query(after)
+        if limit is not None:
+            query = query.limit(limit)
 
         result = await self.db.execute(query)
         return list(result.scalars().all())
 
     async def get_tasks_needing_reminder(self) -> List[TaskORM]:
-        """Get tasks that need reminders sent."""
-        query = select(TaskORM).where(
-            TaskORM.status == TaskStatus.PENDING,
-            TaskORM.reminder_at <= datetime.utcnow(),
-            TaskORM.reminder_at.isnot(None),
-        )
-
-        result = await self.db.execute(query)
+        """Get tasks whose reminder is due and has not been sent."""
+        result = await self.db.execute(reminder_tasks_query())
         return list(result.scalars().all())
 
-    async def auto_create_stale_lead_tasks(self, days_inactive: int = 7) -> List[TaskORM]:
-        """Create tasks for leads that haven't been updated recently."""
+    async def auto_create_stale_lead_tasks(
+        self,
+        days_inactive: int = 7,
+        chunk_size: Optional[int] = None,
+        dry_run: bool = False,
+    ) -> List[Dict[str, Any]]:
+        """Create re-engagement tasks for inactive leads that have no pending task.
+
+        Works through the leads in primary-key chunks: per chunk, one anti-join
+        SELECT finds the stale leads and one bulk INSERT (with ``RETURNING``
+        where the dialect supports it) creates their tasks, then the chunk is
+        committed. With `dry_run` nothing is written and the tasks that would
+        be created are returned. Returns task dicts in ``TASK_PLAN`` shape.
+        """
+        chunk_size = chunk_size or settings.STALE_LEAD_CHUNK_SIZE
         cutoff_date = datetime.utcnow() - timedelta(days=days_inactive)
-
-        query = select(LeadORM).where(
-            LeadORM.stage.in_([LeadStage.NEW, LeadStage.CONTACTED, LeadStage.QUALIFIED]),
-            LeadORM.updated_at < cutoff_date,
+        description = (
+            f"This lead has been inactive for {days_inactive}+ days. Reach out to re-engage."
         )
 
-        result = await self.db.execute(query)
-        stale_leads = result.scalars().all()
-
-        tasks = []
-        for lead in stale_leads:
-            # Check if there's already a pending task for this lead
-            existing_task_query = select(TaskORM).where(
-                TaskORM.lead_id == lead.id,
-                TaskORM.status == TaskStatus.PENDING,
-            )
-            existing_result = await self.db.execute(existing_task_query)
-            if existing_result.scalar_one_or_none():
-                continue  # Skip if there's already a pending task
-
-            task = await self._create_task(
-                lead_id=lead.id,
-                lead_name=lead.name,
-                title=f"Re-engage with {lead.name}",
-                description=f"This lead has been inactive for {days_inactive}+ days. Reach out to re-engage.",
-                task_type=TaskType.FOLLOW_UP,
-                priority=TaskPriority.MEDIUM,
-                days_from_now=1,
-                assigned_to=lead.assigned_to,
+        has_pending_task = exists().where(
+            TaskORM.lead_id == LeadORM.id,
+            TaskORM.status.in_(OPEN_TASK_STATUSES),
+        )
+        query = (
+            select(LeadORM.id, LeadORM.name, LeadORM.assigned_to)
+            .where(
+                LeadORM.stage.in_(STALE_LEAD_STAGES),
+                LeadORM.updated_at < cutoff_date,
+                ~has_pending_task,
             )
-            tasks.append(task)
+            .order_by(LeadORM.id)
+            .limit(chunk_size)
+        )
+        returning = self.db.bind.dialect.insert_executemany_returning
+
+        tasks: List[Dict[str, Any]] = []
+        last_id = None
+        while True:
+            chunk_query = query if last_id is None else query.where(LeadORM.id > last_id)
+            leads = (await self.db.execute(chunk_query)).all()
+            if not leads:
+                break
+            last_id = leads[-1].id
+
+            rows = [
+                _task_row(
+                    lead_id=lead.id,
+                    title=f"Re-engage with {lead.name}",
+                    description=description,
+                    task_type=TaskType.FOLLOW_UP,
+                    priority=TaskPriority.MEDIUM,
+                    days_from_now=1,
+                    assigned_to=lead.assigned_to,
+                )
+                for lead in leads
+            ]
+            if not dry_run:
+                if returning:
+                    result = await self.db.execute(
+                        insert(TaskORM).returning(*TASK_PLAN.columns), rows
+                    )
+                    rows = TASK_PLAN.rows_to_dicts(result.all())
+                else:
+                    await self.db.execute(insert(TaskORM), rows)
+                await self.db.commit()
+                for row in rows:
+                    schedule_task(row)
+            tasks.extend(rows)
+
+            if len(leads) < chunk_size:
+                break
 
         return tasks
+
+
+def _task_row(
+    lead_id: UUID,
+    title: str,
+    description: str,
+    task_type: TaskType,
+    priority: TaskPriority,
+    days_from_now: int,
+    assigned_to: Optional[UUID] = None,
+) -> Dict[str, Any]:
+    """Column values for a new task, in ``TASK_PLAN`` key order, for Core inserts."""
+    now = datetime.utcnow()
+    due_date = now + timedelta(days=days_from_now)
+    return {
+        "id": uuid4(),
+        "lead_id": lead_id,
+        "title": title,
+        "description": description,
+        "task_type": task_type,
+        "status": TaskStatus.PENDING,
+        "priority": priority,
+        "assigned_to": assigned_to,
+        "due_date": due_date,
+        "reminder_at": due_date - timedelta(hours=2),
+        "reminded_at": None,
+        "completed_at": None,
+        "completed_by": None,
+        "created_at": now,
+        "updated_at": now,
+    }
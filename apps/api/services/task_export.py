@@ -0,0 +1,26 @@
+"""Streaming task listings in NDJSON."""
+from typing import AsyncIterator
+
+import orjson
+from sqlalchemy import Select
+
+from apps.api.database import AsyncSessionLocal
+from apps.api.serialization import TASK_PLAN
+from apps.api.services.lead_export import EXPORT_BATCH_SIZE
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+
+
+async def stream_tasks(query: Select) -> AsyncIterator[bytes]:
+    """Yield the tasks selected by `query` as NDJSON, one batch at a time.
+
+    Rows are read through a server-side cursor with ``yield_per`` in a session
+    owned by the generator, so memory stays flat however many tasks match.
+    """
+    query = query.with_only_columns(*TASK_PLAN.columns).execution_options(
+        yield_per=EXPORT_BATCH_SIZE
+    )
+    async with AsyncSessionLocal() as db:
+        result = await db.stream(query)
+        async for rows in result.partitions():
+            yield b"".join(orjson.dumps(TASK_PLAN.row_to_dict(row)) + b"\n" for row in rows)
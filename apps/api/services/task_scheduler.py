@@ -0,0 +1,282 @@
+"""In-process scheduler for task reminders and due dates.
+
+Upcoming ``reminder_at`` and ``due_date`` deadlines of open tasks are kept
+in a min-heap. Only a sliding look-ahead window (``SCHEDULER_WINDOW_SECONDS``,
+capped at ``SCHEDULER_MAX_LOADED`` deadlines per kind) is loaded from the
+database, with indexed range queries; when the window runs out the next one
+is loaded. Task writes report their changes with `schedule_task` and
+`unschedule_task`, so the heap stays current without rescanning.
+
+The loop sleeps until the earliest deadline (or the end of the window) and
+hands every due deadline to the handlers registered for its kind, batched
+per wake-up. Heap entries are never removed in place: the current deadline
+of every scheduled task lives in a dict, and popped entries that no longer
+match it are skipped.
+"""
+import asyncio
+import heapq
+import logging
+from collections import defaultdict
+from datetime import datetime, timedelta, timezone
+from itertools import count
+from typing import Awaitable, Callable, Dict, List, Literal, Optional, Tuple
+from uuid import UUID
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from apps.api.config import settings
+from apps.api.database import AsyncSessionLocal
+from apps.api.models import TaskORM
+from packages.core.models.task import TaskStatus
+from packages.core.schemas.task import SchedulerStatusResponse
+
+logger = logging.getLogger(__name__)
+
+DeadlineKind = Literal["reminder", "due"]
+DeadlineHandler = Callable[[DeadlineKind, List[UUID]], Awaitable[None]]
+
+_DEADLINE_COLUMNS: Dict[DeadlineKind, object] = {
+    "reminder": TaskORM.reminder_at,
+    "due": TaskORM.due_date,
+}
+
+# Overdue tasks still get their reminders; only pending tasks can become due
+_SCHEDULED_STATUSES: Dict[DeadlineKind, Tuple[TaskStatus, ...]] = {
+    "reminder": (TaskStatus.PENDING, TaskStatus.OVERDUE),
+    "due": (TaskStatus.PENDING,),
+}
+
+# The next window is loaded this close to the end of the current one, which
+# is also the smallest window kept when SCHEDULER_MAX_LOADED caps a load
+_MARGIN = timedelta(milliseconds=50)
+
+
+class TaskScheduler:
+    """Min-heap of task deadlines within a sliding look-ahead window."""
+
+    def __init__(self, session_factory: async_sessionmaker[AsyncSession] = AsyncSessionLocal):
+        """Create a stopped scheduler reading tasks through `session_factory`."""
+        self._session_factory = session_factory
+        self._heap: List[Tuple[datetime, int, DeadlineKind, UUID]] = []
+        self._deadlines: Dict[Tuple[UUID, DeadlineKind], datetime] = {}
+        self._sequence = count()
+        self._handlers: Dict[DeadlineKind, List[DeadlineHandler]] = defaultdict(list)
+        self._window_end: Optional[datetime] = None
+        self._wake = asyncio.Event()
+        self._loop_task: Optional[asyncio.Task] = None
+        self._counters = dict.fromkeys(
+            ("window_loads", "loaded", "reminder_fired", "due_fired", "handler_errors"), 0
+        )
+
+    @property
+    def running(self) -> bool:
+        """Whether the scheduler loop is running."""
+        return self._loop_task is not None and not self._loop_task.done()
+
+    def add_handler(self, kind: DeadlineKind, handler: DeadlineHandler) -> None:
+        """Call `handler(kind, task_ids)` when deadlines of `kind` are reached."""
+        self._handlers[kind].append(handler)
+
+    async def start(self) -> None:
+        """Start the loop (no-op when already running)."""
+        if self.running:
+            return
+        self._heap.clear()
+        self._deadlines.clear()
+        # Deadlines already passed belong to the pull endpoints and the sweeps
+        self._window_end = datetime.utcnow()
+        self._loop_task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Cancel the loop."""
+        if self._loop_task is not None:
+            self._loop_task.cancel()
+            await asyncio.gather(self._loop_task, return_exceptions=True)
+            self._loop_task = None
+
+    def schedule(
+        self,
+        task_id: UUID,
+        status: TaskStatus,
+        reminder_at: Optional[datetime],
+        due_date: Optional[datetime],
+    ) -> None:
+        """Record a committed task's current deadlines (no-op when not running).
+
+        Deadlines beyond the loaded window are left to the window load that
+        covers them.
+        """
+        if not self.running:
+            return
+        reminder_at, due_date = _naive_utc(reminder_at), _naive_utc(due_date)
+        wake = False
+        for kind, deadline in (("reminder", reminder_at), ("due", due_date)):
+            key = (task_id, kind)
+            if (
+                status not in _SCHEDULED_STATUSES[kind]
+                or deadline is None
+                or deadline >= self._window_end
+            ):
+                self._deadlines.pop(key, None)
+                continue
+            if self._deadlines.get(key) == deadline:
+                continue
+            self._deadlines[key] = deadline
+            heapq.heappush(self._heap, (deadline, next(self._sequence), kind, task_id))
+            wake = wake or self._heap[0][3] == task_id
+        if wake:
+            self._wake.set()
+
+    def unschedule(self, task_id: UUID) -> None:
+        """Forget a deleted task."""
+        self._deadlines.pop((task_id, "reminder"), None)
+        self._deadlines.pop((task_id, "due"), None)
+
+    def status(self) -> SchedulerStatusResponse:
+        """Heap size, loaded window and lifetime counters."""
+        return SchedulerStatusResponse(
+            running=self.running,
+            scheduled=len(self._deadlines),
+            heap_size=len(self._heap),
+            window_end=self._window_end,
+            next_deadline=self._peek(),
+            **self._counters,
+        )
+
+    def _peek(self) -> Optional[datetime]:
+        # Drop superseded entries from the top so the next deadline is real
+        while self._heap:
+            deadline, _, kind, task_id = self._heap[0]
+            if self._deadlines.get((task_id, kind)) == deadline:
+                return deadline
+            heapq.heappop(self._heap)
+        return None
+
+    async def _run(self) -> None:
+        while True:
+            now = datetime.utcnow()
+            if now >= self._window_end - _MARGIN:
+                try:
+                    await self._load_window(now)
+                except Exception:
+                    logger.exception("Loading scheduled task deadlines failed")
+                    await asyncio.sleep(settings.SCHEDULER_RETRY_SECONDS)
+                    continue
+
+            await self._fire_due(now)
+
+            next_deadline = self._peek()
+            wake_at = self._window_end
+            if next_deadline is not None and next_deadline < wake_at:
+                wake_at = next_deadline
+            self._wake.clear()
+            timeout = max((wake_at - datetime.utcnow()).total_seconds(), 0.0)
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
+
+    async def _load_window(self, now: datetime) -> None:
+        start = self._window_end
+        end = now + timedelta(seconds=settings.SCHEDULER_WINDOW_SECONDS)
+        # Writes from here on land in the heap; the query may return them too
+        self._window_end = end
+
+        limit = settings.SCHEDULER_MAX_LOADED
+        loaded: List[Tuple[DeadlineKind, UUID, datetime]] = []
+        try:
+            async with self._session_factory() as db:
+                for kind, column in _DEADLINE_COLUMNS.items():
+                    rows = (
+                        await db.execute(
+                            select(TaskORM.id, column)
+                            .where(
+                                TaskORM.status.in_(_SCHEDULED_STATUSES[kind]),
+                                column >= start,
+                                column < end,
+                            )
+                            .order_by(column)
+                            .limit(limit)
+                        )
+                    ).all()
+                    if len(rows) == limit:
+                        # Too many deadlines: shrink the window to what was loaded
+                        end = min(end, max(rows[-1][1], start + _MARGIN))
+                    loaded.extend((kind, task_id, deadline) for task_id, deadline in rows)
+        except Exception:
+            self._window_end = start  # Retry the same window
+            raise
+
+        self._window_end = end
+        for kind, task_id, deadline in loaded:
+            if deadline >= end:
+                continue
+            key = (task_id, kind)
+            if key not in self._deadlines:
+                self._deadlines[key] = deadline
+                heapq.heappush(self._heap, (deadline, next(self._sequence), kind, task_id))
+        self._counters["window_loads"] += 1
+        self._counters["loaded"] += len(loaded)
+
+    async def _fire_due(self, now: datetime) -> None:
+        due: Dict[DeadlineKind, List[UUID]] = defaultdict(list)
+        # Never early: handlers may act on "deadline < now" in the database
+        while self._heap and self._heap[0][0] <= now:
+            deadline, _, kind, task_id = heapq.heappop(self._heap)
+            key = (task_id, kind)
+            if self._deadlines.get(key) != deadline:
+                continue  # Superseded by an edit, or already fired
+            del self._deadlines[key]
+            due[kind].append(task_id)
+
+        for kind, task_ids in due.items():
+            self._counters[f"{kind}_fired"] += len(task_ids)
+            for handler in self._handlers[kind]:
+                try:
+                    await handler(kind, task_ids)
+                except Exception:
+                    self._counters["handler_errors"] += 1
+                    logger.exception("Task %s handler failed for %d tasks", kind, len(task_ids))
+
+
+def _naive_utc(moment: Optional[datetime]) -> Optional[datetime]:
+    # Task timestamps are stored as naive UTC
+    if moment is not None and moment.tzinfo is not None:
+        return moment.astimezone(timezone.utc).replace(tzinfo=None)
+    return moment
+
+
+async def log_deadlines(kind: DeadlineKind, task_ids: List[UUID]) -> None:
+    """Default handler: log the tasks whose deadline was reached."""
+    logger.info("%d task %s deadline(s) reached", len(task_ids), kind)
+
+
+# Global scheduler instance, started from the application lifespan
+task_scheduler = TaskScheduler()
+task_scheduler.add_handler("reminder", log_deadlines)
+task_scheduler.add_handler("due", log_deadlines)
+
+
+async def start_scheduler() -> None:
+    """Start the task scheduler when enabled."""
+    if settings.SCHEDULER_ENABLED:
+        await task_scheduler.start()
+
+
+async def stop_scheduler() -> None:
+    """Stop the task scheduler."""
+    await task_scheduler.stop()
+
+
+def schedule_task(task) -> None:
+    """Report a committed task's deadlines to the scheduler (ORM object or row dict)."""
+    if isinstance(task, dict):
+        task_scheduler.schedule(task["id"], task["status"], task["reminder_at"], task["due_date"])
+    else:
+        task_scheduler.schedule(task.id, task.status, task.reminder_at, task.due_date)
+
+
+def unschedule_task(task_id: UUID) -> None:
+    """Report a deleted task to the scheduler."""
+    task_scheduler.unschedule(task_id)
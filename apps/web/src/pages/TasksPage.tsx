@@ -73,6 +73,7 @@ export default function TasksPage() {
           <option value="in_progress">In Progress</option>
           <option value="completed">Completed</option>
           <option value="cancelled">Cancelled</option>
+          <option value="overdue">Overdue</option>
         </select>
       </div>
 
@@ -258,6 +259,7 @@ function getStatusColor(status: string): string {
     in_progress: 'info',
     completed: 'success',
     cancelled: 'gray',
+    overdue: 'danger',
   }
   return colors[status] || 'gray'
 }
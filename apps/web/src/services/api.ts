@@ -58,6 +58,9 @@ export const tasksApi = {
     lead_id?: string
     status?: string
     assigned_to?: string
+    pagination?: 'offset' | 'cursor'
+    cursor?: string
+    include_total?: boolean
   }) => {
     const { data } = await api.get('/tasks/', { params })
     return data
@@ -84,8 +87,13 @@ export const tasksApi = {
 }
 
 export const automationApi = {
-  getOverdueTasks: async () => {
-    const { data } = await api.get<Task[]>('/automation/overdue')
+  getOverdueTasks: async (params?: { page_size?: number; cursor?: string }) => {
+    const { data } = await api.get('/automation/overdue', { params })
+    return data
+  },
+
+  sweepOverdueTasks: async () => {
+    const { data } = await api.post('/automation/overdue/sweep')
     return data
   },
 
@@ -78,6 +78,7 @@ export interface FunnelStageData {
   total_value: number
   conversion_rate?: number
   average_days?: number
+  median_days?: number
 }
 
 export interface FunnelData {
@@ -105,6 +106,7 @@ export enum TaskStatus {
   IN_PROGRESS = 'in_progress',
   COMPLETED = 'completed',
   CANCELLED = 'cancelled',
+  OVERDUE = 'overdue',
 }
 
 export enum TaskPriority {
@@ -125,6 +127,7 @@ export interface Task {
   assigned_to?: string
   due_date?: string
   reminder_at?: string
+  reminded_at?: string
   completed_at?: string
   completed_by?: string
   created_at: string
@@ -0,0 +1,123 @@
+"""Benchmark lead search latency: unindexed ILIKE scan vs the FTS5 index.
+
+Usage:
+    python -m benchmarks.search_benchmark --rows 1000000
+"""
+import argparse
+import random
+import statistics
+import tempfile
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+from uuid import uuid4
+
+from sqlalchemy import create_engine, func, insert, select
+
+from apps.api.database import Base
+from apps.api.models import LeadORM
+from apps.api.services.lead_search import apply_search_filter, ensure_search_index
+from packages.core.models.lead import LeadPriority, LeadSource, LeadStage
+
+FIRST_NAMES = ["John", "Sarah", "Mike", "Emma", "Wei", "Olga", "Ahmed", "Lucia", "Kenji", "Priya"]
+LAST_NAMES = ["Smith", "Johnson", "Chen", "Garcia", "Müller", "Rossi", "Tanaka", "Patel", "Kim"]
+COMPANIES = ["Acme", "Globex", "Initech", "Umbrella", "Hooli", "Stark", "Wayne", "Wonka", "Tyrell"]
+PRODUCTS = ["Enterprise Plan", "Starter Plan", "Demo Request", "Custom Solution", None]
+QUERIES = ["acme", "john smith", "tanaka@", "enterprise demo", "wonka", "zzz-no-match"]
+
+
+def generate_rows(count: int, batch_size: int = 10000):
+    """Yield batches of synthetic lead rows."""
+    rng = random.Random(42)
+    start = datetime.utcnow() - timedelta(days=730)
+    batch = []
+    for idx in range(count):
+        first, last = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+        company = f"{rng.choice(COMPANIES)} {rng.randint(1, 5000)}"
+        batch.append({
+            "id": uuid4(),
+            "name": f"{first} {last}",
+            "source": rng.choice(list(LeadSource)),
+            "stage": rng.choice(list(LeadStage)),
+            "priority": rng.choice(list(LeadPriority)),
+            "score": rng.randint(0, 100),
+            "contact_info": {
+                "email": f"{first.lower()}.{last.lower()}{idx}@{company.split()[0].lower()}.com",
+                "company": company,
+            },
+            "tags": [],
+            "product_interest": rng.choice(PRODUCTS),
+            "notes": rng.choice([None, "Asked for a demo", "Met at trade show"]),
+            "created_at": start + timedelta(seconds=idx * 60),
+            "updated_at": start + timedelta(seconds=idx * 60),
+        })
+        if len(batch) >= batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def legacy_filter(query, search: str):
+    """The pre-index search predicate, kept for comparison."""
+    return query.where(
+        (LeadORM.name.ilike(f"%{search}%"))
+        | (LeadORM.contact_info["email"].as_string().ilike(f"%{search}%"))
+    )
+
+
+def time_query(conn, query, repeat: int) -> float:
+    """Return the median latency of `query` in milliseconds."""
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        conn.execute(query).all()
+        samples.append((time.perf_counter() - started) * 1000)
+    return statistics.median(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--db", type=Path, default=None, help="Reuse an existing database file")
+    args = parser.parse_args()
+
+    db_path = args.db or Path(tempfile.mkdtemp()) / "search_benchmark.db"
+    engine = create_engine(f"sqlite:///{db_path}")
+
+    with engine.begin() as conn:
+        Base.metadata.create_all(conn)
+        ensure_search_index(conn)
+        existing = conn.execute(select(func.count(LeadORM.id))).scalar_one()
+
+    if existing < args.rows:
+        print(f"Generating {args.rows - existing} leads into {db_path}...")
+        started = time.perf_counter()
+        with engine.begin() as conn:
+            for batch in generate_rows(args.rows - existing):
+                conn.execute(insert(LeadORM), batch)
+        print(f"  loaded in {time.perf_counter() - started:.1f}s")
+
+    page = select(LeadORM).order_by(LeadORM.created_at.desc()).limit(20)
+    print(f"\n{'query':<20}{'matches':>10}{'ilike page ms':>16}{'fts page ms':>14}"
+          f"{'ilike count ms':>17}{'fts count ms':>15}")
+    with engine.connect() as conn:
+        for search in QUERIES:
+            legacy = legacy_filter(select(LeadORM.id), search)
+            indexed = apply_search_filter(select(LeadORM.id), search, "sqlite")
+            legacy_count = select(func.count()).select_from(legacy.subquery())
+            indexed_count = select(func.count()).select_from(indexed.subquery())
+            indexed_page = apply_search_filter(page, search, "sqlite")
+            matches = conn.execute(indexed_count).scalar_one()
+            print(
+                f"{search:<20}{matches:>10}"
+                f"{time_query(conn, legacy_filter(page, search), args.repeat):>16.1f}"
+                f"{time_query(conn, indexed_page, args.repeat):>14.1f}"
+                f"{time_query(conn, legacy_count, args.repeat):>17.1f}"
+                f"{time_query(conn, indexed_count, args.repeat):>15.1f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
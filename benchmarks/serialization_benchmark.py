@@ -0,0 +1,84 @@
+"""Benchmark lead list serialization: Pydantic round trip vs precompiled field plan.
+
+Usage:
+    python -m benchmarks.serialization_benchmark --rows 10000
+"""
+import argparse
+import tempfile
+import time
+from pathlib import Path
+
+import orjson
+from sqlalchemy import create_engine, func, insert, select
+from sqlalchemy.orm import Session
+
+from apps.api.database import Base
+from apps.api.models import LeadORM
+from apps.api.routes.leads import orm_to_pydantic
+from apps.api.serialization import LEAD_PLAN
+from benchmarks.search_benchmark import generate_rows
+from packages.core.schemas.lead import LeadListResponse, LeadResponse
+
+
+def legacy_path(session: Session, limit: int) -> bytes:
+    """ORM -> Lead -> LeadResponse -> response model re-validation -> JSON."""
+    leads_orm = session.execute(select(LeadORM).limit(limit)).scalars().all()
+    leads = [LeadResponse(**orm_to_pydantic(lead).model_dump()) for lead in leads_orm]
+    response = LeadListResponse(
+        leads=leads, total=len(leads), page=1, page_size=limit, total_pages=1
+    )
+    # FastAPI dumps the returned model and validates it against response_model again
+    return LeadListResponse.model_validate(response.model_dump()).model_dump_json().encode()
+
+
+def fast_path(session: Session, limit: int) -> bytes:
+    """Core rows -> field plan dicts -> orjson."""
+    rows = session.execute(select(*LEAD_PLAN.columns).limit(limit)).all()
+    return orjson.dumps({
+        "leads": LEAD_PLAN.rows_to_dicts(rows),
+        "total": len(rows),
+        "page": 1,
+        "page_size": limit,
+        "total_pages": 1,
+        "next_cursor": None,
+    })
+
+
+def measure(path, session: Session, limit: int, repeat: int) -> float:
+    """Return the best objects/sec over `repeat` runs."""
+    best = 0.0
+    for _ in range(repeat):
+        session.expunge_all()
+        started = time.perf_counter()
+        path(session, limit)
+        best = max(best, limit / (time.perf_counter() - started))
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=10000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    db_path = Path(tempfile.mkdtemp()) / "serialization_benchmark.db"
+    engine = create_engine(f"sqlite:///{db_path}")
+    with engine.begin() as conn:
+        Base.metadata.create_all(conn)
+        for batch in generate_rows(args.rows):
+            conn.execute(insert(LeadORM), batch)
+
+    with Session(engine) as session:
+        count = session.execute(select(func.count(LeadORM.id))).scalar_one()
+        same = orjson.loads(legacy_path(session, 100)) == orjson.loads(fast_path(session, 100))
+        legacy = measure(legacy_path, session, count, args.repeat)
+        fast = measure(fast_path, session, count, args.repeat)
+
+    print(f"rows: {count}, identical output: {same}")
+    print(f"{'legacy (ORM + Pydantic)':<28}{legacy:>12,.0f} objects/s")
+    print(f"{'field plan + orjson':<28}{fast:>12,.0f} objects/s")
+    print(f"{'speedup':<28}{fast / legacy:>12.1f}x")
+
+
+if __name__ == "__main__":
+    main()
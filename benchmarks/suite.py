@@ -0,0 +1,295 @@
+"""Regression benchmark suite for scoring, serialization and the hot API endpoints.
+
+Usage:
+    python -m benchmarks.suite --rows 10000 --output bench.json
+    python -m benchmarks.suite --rows 10000 --compare bench.json --tolerance 0.2
+
+Every case is timed `--repeat` times and reported as the median seconds per
+operation. The JSON output is stable enough to diff between releases;
+``--compare`` exits non-zero when any case got slower than the baseline by
+more than ``--tolerance``.
+"""
+import argparse
+import asyncio
+import inspect
+import json
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Union
+
+import httpx
+from sqlalchemy import create_engine, insert, select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.orm import Session
+
+from apps.api.database import Base, get_db
+from apps.api.main import app
+from apps.api.models import LeadORM
+from apps.api.routes.funnel import compute_funnel
+from apps.api.routes.leads import orm_to_pydantic
+from apps.api.serialization import LEAD_PLAN
+from apps.api.services.funnel_rollup import ensure_funnel_rollup
+from apps.api.services.lead_search import ensure_search_index
+from benchmarks.search_benchmark import generate_rows
+from packages.core.schemas.lead import LeadResponse
+from packages.ml.lead_scoring import LeadFeatures, leads_to_columns, scorer
+
+PAGE_SIZE = 100
+IMPORT_BATCH = 100
+
+Case = Callable[[], Union[Any, Awaitable[Any]]]
+
+
+class Suite:
+    """Collects timings for named cases."""
+
+    def __init__(self, repeat: int):
+        """Create an empty suite running each case `repeat` times."""
+        self.repeat = repeat
+        self.results: List[Dict[str, Any]] = []
+
+    async def run(self, group: str, name: str, case: Case, ops: int = 1) -> None:
+        """Time `case`, which performs `ops` operations per call (sync or async)."""
+        samples = []
+        for attempt in range(self.repeat + 1):
+            started = time.perf_counter()
+            outcome = case()
+            if inspect.isawaitable(outcome):
+                await outcome
+            elapsed = time.perf_counter() - started
+            if attempt:  # The first call warms caches and is discarded
+                samples.append(elapsed / ops)
+
+        median = statistics.median(samples)
+        self.results.append({
+            "group": group,
+            "name": name,
+            "ops": ops,
+            "repeat": self.repeat,
+            "median_s": median,
+            "min_s": min(samples),
+            "ops_per_s": 1 / median if median else None,
+        })
+        print(f"  {group + '.' + name:<46}{median * 1e6:>14,.1f} us/op{1 / median:>14,.0f} ops/s")
+
+
+def seed_database(db_path: Path, rows: int) -> None:
+    """Create the schema, load `rows` synthetic leads and build the funnel rollup."""
+    engine = create_engine(f"sqlite:///{db_path}")
+    with engine.begin() as conn:
+        Base.metadata.create_all(conn)
+        ensure_search_index(conn)
+        for batch in generate_rows(rows):
+            conn.execute(insert(LeadORM), batch)
+        ensure_funnel_rollup(conn)
+    engine.dispose()
+
+
+async def bench_scoring(suite: Suite, session: Session) -> None:
+    """Per-lead and batch scoring over every seeded lead."""
+    leads = [orm_to_pydantic(lead) for lead in session.execute(select(LeadORM)).scalars()]
+    n = len(leads)
+
+    def calculate_score():
+        for lead in leads:
+            scorer.calculate_score(lead)
+
+    def suggest_tags():
+        for lead in leads:
+            scorer.suggest_tags(lead)
+
+    def calculate_score_unmemoized():
+        rules = scorer.rules
+        for lead in leads:
+            rules.score(LeadFeatures.from_lead(lead))
+
+    def score_batch():
+        scorer.score_batch(leads_to_columns(leads))
+
+    await suite.run("scoring", "calculate_score", calculate_score, n)
+    await suite.run("scoring", "calculate_score_unmemoized", calculate_score_unmemoized, n)
+    await suite.run("scoring", "suggest_tags", suggest_tags, n)
+    await suite.run("scoring", "score_batch", score_batch, n)
+
+
+async def bench_serialization(suite: Suite, session: Session) -> None:
+    """ORM -> domain model -> response model, against the field plan."""
+    session.expunge_all()
+    leads_orm = session.execute(select(LeadORM)).scalars().all()
+    rows = session.execute(select(*LEAD_PLAN.columns)).all()
+    n = len(leads_orm)
+
+    def orm_to_response():
+        for lead in leads_orm:
+            LeadResponse(**orm_to_pydantic(lead).model_dump())
+
+    def field_plan():
+        LEAD_PLAN.rows_to_dicts(rows)
+
+    await suite.run("serialization", "orm_to_pydantic+LeadResponse", orm_to_response, n)
+    await suite.run("serialization", "field_plan", field_plan, n)
+
+
+async def bench_endpoints(suite: Suite, db_path: Path) -> None:
+    """List, import and funnel endpoints through the ASGI app, on the seeded database.
+
+    The funnel query is also timed on its own, since the endpoint is cached.
+    """
+    engine = create_async_engine(f"sqlite+aiosqlite:///{db_path}")
+    session_factory = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+
+    async def override_get_db():
+        async with session_factory() as session:
+            try:
+                yield session
+                await session.commit()
+            except Exception:
+                await session.rollback()
+                raise
+
+    app.dependency_overrides[get_db] = override_get_db
+    batches = iter(range(10**9))
+
+    async with httpx.AsyncClient(
+        transport=httpx.ASGITransport(app=app), base_url="http://bench"
+    ) as client:
+
+        async def get(url: str, **params):
+            response = await client.get(url, params=params)
+            response.raise_for_status()
+
+        async def import_batch():
+            batch = next(batches)
+            payload = {
+                "leads": [
+                    {
+                        "name": f"Bench Lead {batch}-{i}",
+                        "source": "web_form",
+                        "contact_info": {"email": f"bench{batch}-{i}@example.com"},
+                        "estimated_value": 1000 * (i % 50),
+                        "product_interest": "Enterprise Plan" if i % 3 else None,
+                    }
+                    for i in range(IMPORT_BATCH)
+                ],
+                "source": "import",
+            }
+            response = await client.post("/api/v1/leads/import", json=payload)
+            response.raise_for_status()
+
+        await suite.run(
+            "endpoints", "list_leads_offset",
+            lambda: get("/api/v1/leads/", page=50, page_size=PAGE_SIZE),
+        )
+        await suite.run(
+            "endpoints", "list_leads_cursor",
+            lambda: get("/api/v1/leads/", pagination="cursor", page_size=PAGE_SIZE),
+        )
+        await suite.run(
+            "endpoints", "list_leads_search",
+            lambda: get("/api/v1/leads/", search="acme", page_size=PAGE_SIZE),
+        )
+        async def funnel_query():
+            async with session_factory() as session:
+                await compute_funnel(session)
+
+        await suite.run("endpoints", "import_leads", import_batch, IMPORT_BATCH)
+        # The endpoint is served from funnel_cache after the discarded warm-up call
+        await suite.run("endpoints", "funnel_query", funnel_query)
+        await suite.run("endpoints", "funnel_cached", lambda: get("/api/v1/funnel/"))
+
+    app.dependency_overrides.pop(get_db, None)
+    await engine.dispose()
+
+
+def compare(results: List[Dict[str, Any]], baseline_path: Path, tolerance: float) -> bool:
+    """Print the change against a baseline run; False when anything regressed."""
+    baseline = {
+        (r["group"], r["name"]): r for r in json.loads(baseline_path.read_text())["results"]
+    }
+    ok = True
+    print(f"\nCompared with {baseline_path} (tolerance {tolerance:.0%}):")
+    for result in results:
+        before = baseline.get((result["group"], result["name"]))
+        if before is None:
+            continue
+        change = result["median_s"] / before["median_s"] - 1
+        regressed = change > tolerance
+        ok &= not regressed
+        label = "REGRESSION" if regressed else ""
+        print(f"  {result['group'] + '.' + result['name']:<46}{change:>+10.1%}  {label}")
+    return ok
+
+
+def git_revision() -> Optional[str]:
+    """Current commit, when run from a git checkout."""
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+async def run_suite(rows: int, repeat: int, groups: List[str]) -> Dict[str, Any]:
+    """Seed a fresh database and run the selected benchmark groups."""
+    db_path = Path(tempfile.mkdtemp()) / "benchmark_suite.db"
+    print(f"Generating {rows} leads into {db_path}...")
+    seed_database(db_path, rows)
+
+    suite = Suite(repeat)
+    engine = create_engine(f"sqlite:///{db_path}")
+    with Session(engine) as session:
+        if "scoring" in groups:
+            await bench_scoring(suite, session)
+        if "serialization" in groups:
+            await bench_serialization(suite, session)
+    engine.dispose()
+    if "endpoints" in groups:
+        await bench_endpoints(suite, db_path)
+
+    return {
+        "created_at": datetime.utcnow().isoformat(),
+        "revision": git_revision(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "rows": rows,
+        "repeat": repeat,
+        "results": suite.results,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=10000, help="Synthetic leads to generate")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument(
+        "--group",
+        action="append",
+        choices=["scoring", "serialization", "endpoints"],
+        help="Run only these groups (repeatable); default runs all",
+    )
+    parser.add_argument("--output", type=Path, default=None, help="Write results as JSON")
+    parser.add_argument("--compare", type=Path, default=None, help="Baseline results JSON")
+    parser.add_argument(
+        "--tolerance", type=float, default=0.2, help="Allowed slowdown before failing"
+    )
+    args = parser.parse_args()
+
+    groups = args.group or ["scoring", "serialization", "endpoints"]
+    report = asyncio.run(run_suite(args.rows, args.repeat, groups))
+
+    if args.output:
+        args.output.write_text(json.dumps(report, indent=2))
+        print(f"\nResults written to {args.output}")
+    if args.compare and not compare(report["results"], args.compare, args.tolerance):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
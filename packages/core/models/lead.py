@@ -47,6 +47,23 @@ class LeadStage(str, Enum):
     LOST = "lost"
 
 
+# Forward pipeline order; LOST leaves the pipeline
+PIPELINE_STAGES = [
+    LeadStage.NEW,
+    LeadStage.CONTACTED,
+    LeadStage.QUALIFIED,
+    LeadStage.PROPOSAL,
+    LeadStage.NEGOTIATION,
+    LeadStage.WON,
+]
+
+
+def furthest_pipeline_stage(*stages: Optional[LeadStage]) -> LeadStage:
+    """The furthest pipeline stage among `stages`; NEW when none is in the pipeline."""
+    reached = [stage for stage in stages if stage in PIPELINE_STAGES]
+    return max(reached, key=PIPELINE_STAGES.index, default=LeadStage.NEW)
+
+
 class LeadPriority(str, Enum):
     """Lead priority enumeration."""
 
@@ -65,6 +82,9 @@ class Lead(BaseModel):
     stage: Optional[LeadStage] = LeadStage.NEW
     priority: Optional[LeadPriority] = LeadPriority.MEDIUM
     score: Optional[int] = 0
+    scoring_version: Optional[str] = None
+    ai_score: Optional[int] = None
+    enriched_at: Optional[datetime] = None
     contact_info: ContactInfo
     tags: list[str] = Field(default_factory=list)
     product_interest: Optional[str] = None
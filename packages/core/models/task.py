@@ -56,6 +56,7 @@ class Task(BaseModel):
     # Scheduling
     due_date: Optional[datetime] = None
     reminder_at: Optional[datetime] = None
+    reminded_at: Optional[datetime] = None
 
     # Completion
     completed_at: Optional[datetime] = None
@@ -1,10 +1,10 @@
 """Funnel and analytics schemas."""
-from datetime import datetime
-from typing import Optional
+from datetime import date, datetime
+from typing import Literal, Optional
 
 from pydantic import BaseModel
 
-from packages.core.models.lead import LeadStage
+from packages.core.models.lead import LeadSource, LeadStage
 
 
 class FunnelStageData(BaseModel):
@@ -14,7 +14,8 @@ class FunnelStageData(BaseModel):
     count: int
     total_value: float
     conversion_rate: Optional[float] = None  # Percentage to next stage
-    average_days: Optional[float] = None  # Average days in this stage
+    average_days: Optional[float] = None  # Average days in this stage (completed stays)
+    median_days: Optional[float] = None
 
 
 class FunnelResponse(BaseModel):
@@ -37,3 +38,34 @@ class ConversionMetrics(BaseModel):
     leads_stalled: int
     average_time_in_stage_days: float
     conversion_rate: float
+
+
+class FunnelRollupRebuildResponse(BaseModel):
+    """Result of rebuilding the daily funnel rollup."""
+
+    rows: int
+    stage_duration_rows: int
+    elapsed_seconds: float
+
+
+class CohortData(BaseModel):
+    """Stage progression of the leads created in one cohort period."""
+
+    cohort: date  # First day of the week (Monday) or month
+    source: Optional[LeadSource] = None  # None for all sources
+    leads: int
+    reached: dict[LeadStage, int]  # Leads that reached at least each pipeline stage
+    lost: int
+    won_value: float
+    conversion_rate: float  # Percentage of the cohort that was won
+
+
+class CohortResponse(BaseModel):
+    """Response schema for the cohort funnel."""
+
+    granularity: Literal["week", "month"]
+    start_date: Optional[date] = None
+    end_date: Optional[date] = None
+    stages: list[LeadStage]  # Pipeline order used for `reached`
+    cohorts: list[CohortData]
+    by_source: list[CohortData]
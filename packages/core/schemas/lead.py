@@ -1,5 +1,6 @@
 """Lead API schemas."""
 from datetime import datetime
+from enum import Enum
 from typing import Optional
 from uuid import UUID
 
@@ -49,6 +50,9 @@ class LeadResponse(BaseModel):
     stage: LeadStage
     priority: LeadPriority
     score: int
+    scoring_version: Optional[str] = None
+    ai_score: Optional[int] = None  # Filled in later by LLM enrichment
+    enriched_at: Optional[datetime] = None
     contact_info: ContactInfo
     tags: list[str]
     product_interest: Optional[str]
@@ -69,10 +73,11 @@ class LeadListResponse(BaseModel):
     """Response schema for paginated lead list."""
 
     leads: list[LeadResponse]
-    total: int
-    page: int
+    total: Optional[int] = None  # Omitted in cursor mode unless include_total is set
+    page: Optional[int] = None  # Only set in offset mode
     page_size: int
-    total_pages: int
+    total_pages: Optional[int] = None
+    next_cursor: Optional[str] = None  # Opaque token for the next page in cursor mode
 
 
 class LeadImportRequest(BaseModel):
@@ -91,6 +96,52 @@ class LeadImportResponse(BaseModel):
     errors: list[dict] = Field(default_factory=list)
 
 
+class LeadImportJobStatus(str, Enum):
+    """Lifecycle of a background lead job (file import, rescoring)."""
+
+    PENDING = "pending"
+    RUNNING = "running"
+    COMPLETED = "completed"
+    FAILED = "failed"
+
+
+class LeadImportJobResponse(BaseModel):
+    """Progress of a background file import job."""
+
+    job_id: UUID
+    status: LeadImportJobStatus = LeadImportJobStatus.PENDING
+    filename: Optional[str] = None
+    format: str
+    source: LeadSource
+    bytes_total: int = 0
+    bytes_processed: int = 0
+    total: int = 0
+    successful: int = 0
+    failed: int = 0
+    errors: list[dict] = Field(default_factory=list)
+    error: Optional[str] = None  # Fatal error that aborted the job
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+
+
+class LeadRescoreJobResponse(BaseModel):
+    """Progress of a full-table rescoring job."""
+
+    status: LeadImportJobStatus = LeadImportJobStatus.PENDING
+    resumed: bool = False  # Continued from a checkpoint left by an earlier run
+    scoring_version: Optional[str] = None  # Rule set the run scores with
+    total: Optional[int] = None  # Leads in the table when the run started
+    scanned: int = 0
+    changed: int = 0
+    last_lead_id: Optional[UUID] = None
+    rows_per_second: float = 0.0
+    elapsed_seconds: float = 0.0
+    error: Optional[str] = None
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+
+
 class LeadStatsResponse(BaseModel):
     """Response schema for lead statistics."""
 
@@ -0,0 +1,50 @@
+"""Scoring rules API schemas."""
+from datetime import datetime
+from typing import Any, Optional
+
+from pydantic import BaseModel
+
+from packages.ml.scoring_rules import ScoringRules
+
+
+class ScoreMemoStats(BaseModel):
+    """Occupancy and hit rate of the score memo."""
+
+    version: Optional[str] = None  # Rule set the entries belong to
+    size: int
+    maxsize: int
+    hits: int
+    misses: int
+    hit_rate: Optional[float] = None
+    invalidations: int  # Times the memo was emptied for a new rule set
+
+
+class ScoringRulesResponse(BaseModel):
+    """The active scoring rule set and how many leads were scored by another version."""
+
+    version: str  # Rules version, plus the model version when a model is active
+    path: Optional[str] = None  # None when the bundled default rules are active
+    loaded_at: datetime
+    stale_leads: int
+    rules: ScoringRules
+    model: Optional[dict[str, Any]] = None  # Conversion model metadata; None uses the heuristic
+    memo: ScoreMemoStats
+
+
+class EnrichmentStatusResponse(BaseModel):
+    """State and lifetime counters of the LLM enrichment queue."""
+
+    running: bool
+    pending: int  # Leads waiting to be batched
+    in_flight: int  # Batches currently being sent or written back
+    queued: int
+    dropped: int  # Rejected because the queue was full
+    batches: int
+    requests: int  # HTTP calls, including retries
+    retries: int
+    failed: int  # Leads the model returned nothing usable for
+    enriched: int
+    cache_hits: int
+    cache_misses: int
+    cache_size: int
+    cache_hit_rate: Optional[float] = None
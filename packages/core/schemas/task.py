@@ -47,6 +47,7 @@ class TaskResponse(BaseModel):
     assigned_to: Optional[UUID]
     due_date: Optional[datetime]
     reminder_at: Optional[datetime]
+    reminded_at: Optional[datetime] = None
     completed_at: Optional[datetime]
     completed_by: Optional[UUID]
     created_at: datetime
@@ -57,7 +58,48 @@ class TaskListResponse(BaseModel):
     """Response schema for paginated task list."""
 
     tasks: list[TaskResponse]
-    total: int
-    page: int
+    total: Optional[int] = None  # Omitted in cursor mode unless include_total is set
+    page: Optional[int] = None  # Only set in offset mode
     page_size: int
-    total_pages: int
+    total_pages: Optional[int] = None
+    next_cursor: Optional[str] = None  # Opaque token for the next page in cursor mode
+
+
+class OverdueSweepResponse(BaseModel):
+    """Result of marking overdue tasks."""
+
+    marked: int
+    batches: int
+    elapsed_seconds: float
+
+
+class SchedulerStatusResponse(BaseModel):
+    """State of the in-process task deadline scheduler."""
+
+    running: bool
+    scheduled: int  # Deadlines waiting in the loaded window
+    heap_size: int  # Including superseded entries not yet discarded
+    window_end: Optional[datetime] = None
+    next_deadline: Optional[datetime] = None
+    window_loads: int
+    loaded: int
+    reminder_fired: int
+    due_fired: int
+    handler_errors: int
+
+
+class ReminderDispatchStatusResponse(BaseModel):
+    """Lifetime counters of this worker's reminder dispatcher."""
+
+    running: bool
+    owner: str  # Lease owner id of this worker
+    batches: int
+    claimed: int
+    dispatched: int
+    failed: int  # Sender errors; retried once the lease expires
+    lease_lost: int  # Sent after the lease expired, possibly also by another worker
+    busy_seconds: float
+    throughput_per_second: Optional[float] = None  # Reminders sent per busy second
+    average_lag_seconds: Optional[float] = None  # From reminder_at to sent
+    max_lag_seconds: float
+    last_lag_seconds: Optional[float] = None
@@ -0,0 +1,248 @@
+"""Logistic-regression conversion model with NumPy-only training and inference.
+
+The model predicts the probability that a lead is won from the same
+features the rule-based scorer reads. Its artifact is a flat float64
+``.npy`` vector (bias followed by one weight per feature, in raw feature
+units) that is memory-mapped at load time, plus a small JSON sidecar with
+the feature names and training metrics.
+
+Inference folds the weights into lookup tables the same way `RuleSet` does:
+one logit contribution per source, one per field-presence mask, and the
+estimated value term. The 0-100 score is found by comparing the logit with
+precomputed per-score thresholds, so scalar and batch scoring agree exactly.
+"""
+import hashlib
+import json
+from bisect import bisect_right
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Mapping, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from packages.core.models.lead import LeadSource
+from packages.ml.scoring_rules import (
+    PRESENCE_FIELDS,
+    LeadFeatures,
+    presence_masks,
+    source_code,
+    source_codes,
+)
+
+FEATURE_NAMES = (
+    [f"source={source.value}" for source in LeadSource]
+    + [f"has_{field}" for field in PRESENCE_FIELDS]
+    + ["log_estimated_value", "has_estimated_value"]
+)
+
+_N_SOURCES = len(LeadSource)
+_N_PRESENCE = len(PRESENCE_FIELDS)
+
+
+def feature_matrix(columns: Mapping[str, Sequence]) -> np.ndarray:
+    """Build the (n, len(FEATURE_NAMES)) design matrix from batch scoring columns."""
+    codes = source_codes(columns["source"])
+    n = len(codes)
+    matrix = np.zeros((n, len(FEATURE_NAMES)), dtype=np.float64)
+
+    matrix[np.arange(n), codes] = 1.0
+    masks = presence_masks(columns)
+    for bit in range(_N_PRESENCE):
+        matrix[:, _N_SOURCES + bit] = (masks >> bit) & 1
+
+    value = np.asarray(columns["estimated_value"], dtype=np.float64)
+    present = ~np.isnan(value) & (value != 0)
+    matrix[:, -2] = np.log1p(np.where(present, np.maximum(value, 0.0), 0.0))
+    matrix[:, -1] = present
+    return matrix
+
+
+def fit_logistic_regression(
+    matrix: np.ndarray,
+    labels: np.ndarray,
+    l2: float = 1.0,
+    max_iterations: int = 50,
+    tolerance: float = 1e-8,
+) -> np.ndarray:
+    """Fit L2-regularized logistic regression with Newton's method.
+
+    Features are standardized internally; the returned weights (bias first)
+    apply to raw feature values.
+    """
+    labels = np.asarray(labels, dtype=np.float64)
+    mean = matrix.mean(axis=0)
+    scale = matrix.std(axis=0)
+    scale[scale == 0] = 1.0
+    standardized = np.hstack([np.ones((len(matrix), 1)), (matrix - mean) / scale])
+
+    penalty = np.full(standardized.shape[1], l2)
+    penalty[0] = 0.0  # Never shrink the bias
+    weights = np.zeros(standardized.shape[1])
+
+    for _ in range(max_iterations):
+        probability = _sigmoid(standardized @ weights)
+        gradient = standardized.T @ (probability - labels) + penalty * weights
+        curvature = probability * (1.0 - probability)
+        hessian = (standardized.T * curvature) @ standardized + np.diag(penalty)
+        step = np.linalg.solve(hessian, gradient)
+        weights -= step
+        if np.max(np.abs(step)) < tolerance:
+            break
+
+    raw = weights[1:] / scale
+    return np.concatenate([[weights[0] - np.dot(raw, mean)], raw])
+
+
+def evaluate_fit(weights: np.ndarray, matrix: np.ndarray, labels: np.ndarray) -> Dict[str, float]:
+    """Log loss and ROC AUC of `weights` on a labelled sample."""
+    labels = np.asarray(labels, dtype=np.float64)
+    probability = np.clip(_sigmoid(weights[0] + matrix @ weights[1:]), 1e-12, 1 - 1e-12)
+    log_loss = -np.mean(labels * np.log(probability) + (1 - labels) * np.log(1 - probability))
+
+    positives = labels == 1
+    n_pos, n_neg = positives.sum(), (~positives).sum()
+    auc = float("nan")
+    if n_pos and n_neg:
+        order = np.argsort(probability, kind="mergesort")
+        ranks = np.empty(len(probability))
+        ranks[order] = np.arange(1, len(probability) + 1)
+        # Average ranks over tied predictions
+        _, inverse, counts = np.unique(probability, return_inverse=True, return_counts=True)
+        rank_sums = np.bincount(inverse, weights=ranks)
+        ranks = (rank_sums / counts)[inverse]
+        auc = (ranks[positives].sum() - n_pos * (n_pos + 1) / 2) / (n_pos * n_neg)
+
+    return {"log_loss": round(float(log_loss), 6), "auc": round(float(auc), 6)}
+
+
+def train(
+    columns: Mapping[str, Sequence],
+    labels: Sequence[int],
+    l2: float = 1.0,
+    holdout: float = 0.2,
+    seed: int = 0,
+) -> Tuple[np.ndarray, Dict[str, Any]]:
+    """Fit the model on WON (1) / LOST (0) leads and return (weights, metadata)."""
+    matrix = feature_matrix(columns)
+    labels = np.asarray(labels, dtype=np.float64)
+    if len(np.unique(labels)) < 2:
+        raise ValueError("Training needs both won and lost leads")
+
+    order = np.random.default_rng(seed).permutation(len(labels))
+    cut = int(len(labels) * (1 - holdout)) if holdout else len(labels)
+    train_rows, test_rows = order[:cut], order[cut:]
+
+    weights = fit_logistic_regression(matrix[train_rows], labels[train_rows], l2=l2)
+    metadata: Dict[str, Any] = {
+        "kind": "logistic_regression",
+        "feature_names": FEATURE_NAMES,
+        "trained_at": datetime.utcnow().isoformat(),
+        "samples": int(len(labels)),
+        "won": int(labels.sum()),
+        "l2": l2,
+        "train": evaluate_fit(weights, matrix[train_rows], labels[train_rows]),
+    }
+    if len(test_rows):
+        metadata["holdout"] = evaluate_fit(weights, matrix[test_rows], labels[test_rows])
+
+    # Refit on everything for the shipped artifact
+    if len(test_rows):
+        weights = fit_logistic_regression(matrix, labels, l2=l2)
+    return weights, metadata
+
+
+def save_model(path: Union[str, Path], weights: np.ndarray, metadata: Dict[str, Any]) -> str:
+    """Write the artifact and its JSON sidecar; returns the model version."""
+    path = Path(path).with_suffix(".npy")
+    path.parent.mkdir(parents=True, exist_ok=True)
+    weights = np.ascontiguousarray(weights, dtype=np.float64)
+    version = "lr-" + hashlib.sha1(weights.tobytes()).hexdigest()[:10]
+
+    np.save(path, weights)
+    sidecar = dict(metadata, version=version)
+    _sidecar_path(path).write_text(json.dumps(sidecar, indent=2))
+    return version
+
+
+def load_model(path: Union[str, Path]) -> Optional["ConversionModel"]:
+    """Memory-map a saved model, or return None when no artifact exists."""
+    path = Path(path).with_suffix(".npy")
+    if not path.exists():
+        return None
+
+    weights = np.load(path, mmap_mode="r")
+    metadata = json.loads(_sidecar_path(path).read_text())
+    if list(metadata["feature_names"]) != FEATURE_NAMES or weights.shape != (
+        len(FEATURE_NAMES) + 1,
+    ):
+        raise ValueError(f"Model artifact {path} does not match the current features")
+    return ConversionModel(weights, metadata)
+
+
+class ConversionModel:
+    """A loaded conversion model, evaluated through lookup tables."""
+
+    def __init__(self, weights: np.ndarray, metadata: Dict[str, Any]):
+        """Compile `weights` (bias first, raw feature units) into lookup tables."""
+        self.weights = weights
+        self.metadata = metadata
+        self.version: str = metadata["version"]
+
+        bias = float(weights[0])
+        source_weights = np.asarray(weights[1:1 + _N_SOURCES], dtype=np.float64)
+        presence_weights = np.asarray(
+            weights[1 + _N_SOURCES:1 + _N_SOURCES + _N_PRESENCE], dtype=np.float64
+        )
+        self.log_value_weight = float(weights[-2])
+        self.has_value_weight = float(weights[-1])
+
+        masks = np.arange(1 << _N_PRESENCE)
+        bits = (masks[:, None] >> np.arange(_N_PRESENCE)) & 1
+        self.base_table = source_weights[:, None] + bias + (bits @ presence_weights)[None, :]
+        self._base = self.base_table.tolist()
+
+        # Score k (1..100) is reached once probability >= (k - 0.5) / 100
+        quantiles = (np.arange(1, 101) - 0.5) / 100
+        self.thresholds = np.log(quantiles / (1 - quantiles))
+        self._thresholds = self.thresholds.tolist()
+
+    def logit(self, features: LeadFeatures) -> float:
+        """Log-odds of the lead being won."""
+        logit = self._base[source_code(features.source)][features.presence_mask()]
+        value = features.estimated_value
+        if value:
+            logit += self.has_value_weight + self.log_value_weight * float(
+                np.log1p(max(value, 0.0))
+            )
+        return logit
+
+    def score(self, features: LeadFeatures) -> int:
+        """Win probability as a 0-100 score."""
+        return bisect_right(self._thresholds, self.logit(features))
+
+    def score_batch(self, columns: Mapping[str, Sequence]) -> np.ndarray:
+        """Scores for many leads; identical to `score` row by row."""
+        logit = self.base_table[source_codes(columns["source"]), presence_masks(columns)]
+        value = np.asarray(columns["estimated_value"], dtype=np.float64)
+        present = ~np.isnan(value) & (value != 0)
+        value_term = self.has_value_weight + self.log_value_weight * np.log1p(
+            np.where(present, np.maximum(value, 0.0), 0.0)
+        )
+        logit = np.where(present, logit + value_term, logit)
+        return np.searchsorted(self.thresholds, logit, side="right").astype(np.int64)
+
+    def describe(self) -> Dict[str, Any]:
+        """Metadata for status endpoints."""
+        return dict(self.metadata)
+
+    def __reduce__(self):
+        # Ship a plain copy of the mapped weights to worker processes
+        return (ConversionModel, (np.array(self.weights), self.metadata))
+
+
+def _sigmoid(values: np.ndarray) -> np.ndarray:
+    return 1.0 / (1.0 + np.exp(-values))
+
+
+def _sidecar_path(path: Path) -> Path:
+    return path.with_suffix(".json")
@@ -1,139 +1,226 @@
 """AI scoring and tagging service."""
-from typing import List
-
-from packages.core.models.lead import ContactInfo, Lead, LeadPriority, LeadSource
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, List, Mapping, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from packages.core.models.lead import Lead, LeadPriority
+from packages.ml.conversion_model import load_model
+from packages.ml.scoring_rules import LeadFeatures, RuleSet, load_rules, source_codes
+
+# Column names accepted by the batch API. Boolean columns mark fields that are present
+# (truthy) on the lead; estimated_value uses NaN for missing values.
+BATCH_COLUMNS = (
+    "source",
+    "estimated_value",
+    "has_email",
+    "has_phone",
+    "has_company",
+    "has_title",
+    "has_product_interest",
+    "has_utm_source",
+    "has_utm_medium",
+    "has_utm_campaign",
+    "product_interest",
+)
+
+
+DEFAULT_MEMO_SIZE = 4096
+
+Evaluation = Tuple[int, List[str], LeadPriority]
+
+
+class ScoreMemo:
+    """LRU memo of `RuleSet.evaluate` results keyed by `LeadFeatures.fingerprint`.
+
+    Widget and ad-platform leads repeat the same few feature combinations, so
+    most evaluations are lookups. Entries belong to one rule set: the memo
+    empties itself the first time it is asked about a different one, so a
+    reloaded rule set or model never serves stale results.
+
+    Replacing the entry dict instead of clearing it keeps the memo free of
+    locks: a caller in another thread still holding the old dict can at
+    worst store an entry nobody reads.
+    """
+
+    def __init__(self, maxsize: int = DEFAULT_MEMO_SIZE):
+        """Create an empty memo holding at most `maxsize` entries (0 disables it)."""
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self._rules: Optional[RuleSet] = None
+        self._entries: OrderedDict[Tuple[Any, ...], Tuple[int, Tuple[str, ...], LeadPriority]] = (
+            OrderedDict()
+        )
+
+    def evaluate(self, rules: RuleSet, features: LeadFeatures) -> Evaluation:
+        """`rules.evaluate(features)`, served from the memo when possible."""
+        if not self.maxsize:
+            return rules.evaluate(features)
+
+        if rules is not self._rules:
+            if self._entries:
+                self.invalidations += 1
+            self._entries = OrderedDict()
+            self._rules = rules
+
+        entries = self._entries
+        key = features.fingerprint()
+        entry = entries.get(key)
+        if entry is not None:
+            self.hits += 1
+            try:
+                entries.move_to_end(key)
+            except KeyError:  # Evicted by another thread meanwhile
+                pass
+            score, tags, priority = entry
+            return score, list(tags), priority
+
+        self.misses += 1
+        score, tags, priority = rules.evaluate(features)
+        entries[key] = (score, tuple(tags), priority)
+        if len(entries) > self.maxsize:
+            self._evict(entries)
+        return score, tags, priority
+
+    def resize(self, maxsize: int) -> None:
+        """Change the capacity, evicting the least recently used entries."""
+        self.maxsize = maxsize
+        self._evict(self._entries)
+
+    def clear(self) -> None:
+        """Drop all entries and reset the counters."""
+        self._entries = OrderedDict()
+        self._rules = None
+        self.hits = self.misses = self.invalidations = 0
+
+    def _evict(self, entries: OrderedDict) -> None:
+        try:
+            while len(entries) > self.maxsize:
+                entries.popitem(last=False)
+        except KeyError:  # Emptied by another thread meanwhile
+            pass
+
+    def stats(self) -> Dict[str, Any]:
+        """Size and hit-rate counters for monitoring."""
+        lookups = self.hits + self.misses
+        return {
+            "version": self._rules.version if self._rules else None,
+            "size": len(self._entries),
+            "maxsize": self.maxsize,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else None,
+            "invalidations": self.invalidations,
+        }
 
 
 class LeadScorer:
-    """AI-powered lead scoring engine."""
-
-    def __init__(self):
-        """Initialize the scorer with weights."""
-        self.source_weights = {
-            LeadSource.GOOGLE_ADS: 15,
-            LeadSource.META_ADS: 12,
-            LeadSource.TIKTOK_ADS: 10,
-            LeadSource.LANDING_PAGE: 18,
-            LeadSource.WEB_FORM: 20,
-            LeadSource.EVENT: 25,
-            LeadSource.IMPORT: 5,
-            LeadSource.REFERRAL: 30,
-            LeadSource.DIRECT: 15,
-            LeadSource.OTHER: 5,
-        }
+    """AI-powered lead scoring engine.
+
+    Scoring logic lives in a declarative, versioned rule set (see
+    `packages.ml.scoring_rules`), optionally with a trained conversion model
+    (`packages.ml.conversion_model`) providing the score. The compiled rules
+    are held in a single attribute and replaced wholesale by `swap_rules`, so
+    callers that take ``scorer.rules`` once per lead or batch never mix two
+    versions.
+    """
+
+    def __init__(self, rules: Optional[RuleSet] = None, memo_size: int = DEFAULT_MEMO_SIZE):
+        """Initialize the scorer with the given or bundled default rules."""
+        self.rules = rules or RuleSet(load_rules())
+        self.memo = ScoreMemo(memo_size)
+
+    @property
+    def version(self) -> str:
+        """Version of the active rule set."""
+        return self.rules.version
+
+    def swap_rules(self, rules: RuleSet) -> RuleSet:
+        """Atomically activate `rules`, returning the previous rule set."""
+        previous, self.rules = self.rules, rules
+        return previous
+
+    def load_rules(self, path: Union[str, Path, None] = None) -> RuleSet:
+        """Load, compile and activate a rule set file; returns the previous rule set.
+
+        The active conversion model, if any, is kept.
+        """
+        return self.swap_rules(RuleSet(load_rules(path)).with_model(self.rules.model))
+
+    def load_model(self, path: Union[str, Path, None]) -> RuleSet:
+        """Activate the conversion model at `path`; returns the previous rule set.
+
+        Falls back to the heuristic score when `path` is empty or has no artifact.
+        """
+        model = load_model(path) if path else None
+        return self.swap_rules(self.rules.with_model(model))
+
+    def evaluate(self, features: LeadFeatures, rules: Optional[RuleSet] = None) -> Evaluation:
+        """Score, tag and prioritize a lead in one pass, through the memo.
+
+        Tags and priority are derived from the freshly computed score. Pass
+        a `current_rules` snapshot as `rules` to stamp the matching version.
+        """
+        active = self.rules
+        if rules is not None and rules is not active:
+            # A snapshot taken before a reload; keep it from flushing the memo
+            return rules.evaluate(features)
+        return self.memo.evaluate(active, features)
 
     def calculate_score(self, lead: Lead) -> int:
         """Calculate lead score based on various factors."""
-        score = 0
-
-        # Source quality (0-30 points)
-        score += self.source_weights.get(lead.source, 5)
-
-        # Contact completeness (0-25 points)
-        score += self._score_contact_info(lead.contact_info)
-
-        # Estimated value (0-20 points)
-        if lead.estimated_value:
-            if lead.estimated_value >= 100000:
-                score += 20
-            elif lead.estimated_value >= 50000:
-                score += 15
-            elif lead.estimated_value >= 10000:
-                score += 10
-            else:
-                score += 5
-
-        # Product interest (0-10 points)
-        if lead.product_interest:
-            score += 10
-
-        # UTM tracking (0-10 points)
-        if lead.utm_campaign:
-            score += 5
-        if lead.utm_source:
-            score += 3
-        if lead.utm_medium:
-            score += 2
-
-        # Company info (0-5 points)
-        if lead.contact_info.company:
-            score += 5
-
-        return min(score, 100)  # Cap at 100
-
-    def _score_contact_info(self, contact: ContactInfo) -> int:
-        """Score contact information completeness."""
-        score = 0
-
-        if contact.email:
-            score += 10
-        if contact.phone:
-            score += 8
-        if contact.company:
-            score += 5
-        if contact.title:
-            score += 2
-
-        return min(score, 25)
+        return self.evaluate(LeadFeatures.from_lead(lead))[0]
 
     def suggest_tags(self, lead: Lead) -> List[str]:
         """AI-powered tag suggestions based on lead attributes."""
-        tags = []
-
-        # Value-based tags
-        if lead.estimated_value:
-            if lead.estimated_value >= 100000:
-                tags.append("enterprise")
-            elif lead.estimated_value >= 50000:
-                tags.append("mid-market")
-            else:
-                tags.append("smb")
-
-        # Score-based tags
-        if lead.score >= 75:
-            tags.append("hot-lead")
-        elif lead.score >= 50:
-            tags.append("warm-lead")
-        else:
-            tags.append("cold-lead")
-
-        # Source-based tags
-        if lead.source in [LeadSource.REFERRAL, LeadSource.EVENT]:
-            tags.append("high-quality")
-
-        if lead.source in [LeadSource.GOOGLE_ADS, LeadSource.META_ADS, LeadSource.TIKTOK_ADS]:
-            tags.append("paid-traffic")
-
-        # Contact completeness
-        if (lead.contact_info.email and lead.contact_info.phone and
-            lead.contact_info.company and lead.contact_info.title):
-            tags.append("complete-profile")
-
-        # Product interest
-        if lead.product_interest:
-            if "enterprise" in lead.product_interest.lower():
-                tags.append("enterprise-interest")
-            if "demo" in lead.product_interest.lower():
-                tags.append("demo-request")
-
-        return tags
+        rules = self.rules
+        features = LeadFeatures.from_lead(lead)
+        score, tags, _ = self.evaluate(features, rules)
+        # Tags depend on the score; only a lead carrying another score needs a recompute
+        return tags if score == lead.score else rules.tags(features, lead.score)
 
     def suggest_priority(self, lead: Lead) -> LeadPriority:
         """Suggest priority based on lead score."""
-        if lead.score >= 80:
-            return LeadPriority.URGENT
-        elif lead.score >= 60:
-            return LeadPriority.HIGH
-        elif lead.score >= 40:
-            return LeadPriority.MEDIUM
-        else:
-            return LeadPriority.LOW
+        return self.rules.priority(lead.score)
+
+    def score_batch(self, columns: Mapping[str, Sequence]) -> np.ndarray:
+        """Score many leads at once from columnar inputs (see `BATCH_COLUMNS`).
+
+        Produces exactly the same integers as `calculate_score` row by row.
+        """
+        return self.rules.score_batch(columns)
+
+    def tag_batch(
+        self, columns: Mapping[str, Sequence], scores: np.ndarray
+    ) -> Dict[str, np.ndarray]:
+        """Compute a boolean mask per tag for many leads at once.
+
+        `scores` plays the role of ``lead.score`` in `suggest_tags`. Use
+        `masks_to_tags` to turn the masks back into per-lead tag lists.
+        """
+        return self.rules.tag_batch(columns, scores)
+
+    def priority_batch(self, scores: np.ndarray) -> np.ndarray:
+        """Suggest priorities for many scores at once (object array of `LeadPriority`)."""
+        return self.rules.priority_batch(scores)
+
+    def tag_order(self) -> List[str]:
+        """Return every tag in the order `suggest_tags` emits them."""
+        return list(self.rules.tag_order)
 
 
 # Global scorer instance
 scorer = LeadScorer()
 
 
+def current_rules() -> RuleSet:
+    """Snapshot of the active rule set, for scoring several leads under one version."""
+    return scorer.rules
+
+
 def score_lead(lead: Lead) -> int:
     """Score a lead."""
     return scorer.calculate_score(lead)
@@ -147,3 +234,53 @@ def auto_tag_lead(lead: Lead) -> List[str]:
 def suggest_lead_priority(lead: Lead) -> LeadPriority:
     """Suggest priority for a lead."""
     return scorer.suggest_priority(lead)
+
+
+def evaluate(features: LeadFeatures, rules: Optional[RuleSet] = None) -> Evaluation:
+    """Score, tag and prioritize a lead in one pass (memoized)."""
+    return scorer.evaluate(features, rules)
+
+
+def leads_to_columns(leads: Sequence[Lead]) -> Dict[str, np.ndarray]:
+    """Build batch scoring columns from `Lead` models."""
+    return {
+        "source": source_codes([lead.source for lead in leads]),
+        "estimated_value": np.array(
+            [lead.estimated_value if lead.estimated_value is not None else np.nan
+             for lead in leads],
+            dtype=np.float64,
+        ),
+        "has_email": np.array([bool(lead.contact_info.email) for lead in leads]),
+        "has_phone": np.array([bool(lead.contact_info.phone) for lead in leads]),
+        "has_company": np.array([bool(lead.contact_info.company) for lead in leads]),
+        "has_title": np.array([bool(lead.contact_info.title) for lead in leads]),
+        "has_product_interest": np.array([bool(lead.product_interest) for lead in leads]),
+        "has_utm_source": np.array([bool(lead.utm_source) for lead in leads]),
+        "has_utm_medium": np.array([bool(lead.utm_medium) for lead in leads]),
+        "has_utm_campaign": np.array([bool(lead.utm_campaign) for lead in leads]),
+        "product_interest": [lead.product_interest for lead in leads],
+    }
+
+
+def score_batch(columns: Mapping[str, Sequence]) -> np.ndarray:
+    """Score many leads from columnar inputs."""
+    return scorer.score_batch(columns)
+
+
+def tag_batch(columns: Mapping[str, Sequence], scores: np.ndarray) -> Dict[str, np.ndarray]:
+    """Compute per-tag boolean masks for many leads."""
+    return scorer.tag_batch(columns, scores)
+
+
+def priority_batch(scores: np.ndarray) -> np.ndarray:
+    """Suggest priorities for many scores."""
+    return scorer.priority_batch(scores)
+
+
+def masks_to_tags(masks: Mapping[str, np.ndarray]) -> List[List[str]]:
+    """Turn `tag_batch` masks (keyed in emission order) into per-lead tag lists."""
+    order = list(masks)
+    if not order:
+        return []
+    stacked = np.stack([masks[tag] for tag in order], axis=1)
+    return [[order[i] for i in np.flatnonzero(row)] for row in stacked]
@@ -0,0 +1,477 @@
+"""Declarative lead scoring rules compiled to lookup tables.
+
+A rule set is a versioned JSON document (see ``scoring_rules.json``)
+validated by `ScoringRules` and compiled by `RuleSet`. Presence-based points
+and profile tags are precomputed for every combination of present fields,
+source weights and source tags per source, and score tags and priorities per
+reachable score, so evaluating a lead is a handful of table lookups.
+"""
+import copy
+import json
+from pathlib import Path
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Dict,
+    List,
+    Literal,
+    Mapping,
+    Optional,
+    Sequence,
+    Tuple,
+    Union,
+)
+
+import numpy as np
+from pydantic import BaseModel, Field, field_validator, model_validator
+
+from packages.core.models.lead import LeadPriority, LeadSource
+
+if TYPE_CHECKING:
+    from packages.ml.conversion_model import ConversionModel
+
+DEFAULT_RULES_PATH = Path(__file__).with_name("scoring_rules.json")
+
+# Fields whose presence earns points; their order defines the bits of a presence mask
+PRESENCE_FIELDS = (
+    "email",
+    "phone",
+    "company",
+    "title",
+    "product_interest",
+    "utm_source",
+    "utm_medium",
+    "utm_campaign",
+)
+
+PresenceField = Literal[
+    "email",
+    "phone",
+    "company",
+    "title",
+    "product_interest",
+    "utm_source",
+    "utm_medium",
+    "utm_campaign",
+]
+ContactField = Literal["email", "phone", "company", "title"]
+
+_SOURCES = list(LeadSource)
+_SOURCE_CODES = {source: code for code, source in enumerate(_SOURCES)}
+_SOURCE_CODES.update({source.value: code for code, source in enumerate(_SOURCES)})
+
+
+class ValueBracket(BaseModel):
+    """Points awarded when the estimated value reaches `min`."""
+
+    min: float
+    points: int = Field(..., ge=0)
+
+
+class TagBracket(BaseModel):
+    """Tag applied when a value or score reaches `min`."""
+
+    min: float
+    tag: str = Field(..., min_length=1)
+
+
+class PriorityBracket(BaseModel):
+    """Priority suggested when the score reaches `min`."""
+
+    min: int
+    priority: LeadPriority
+
+
+class ScoringRules(BaseModel):
+    """Validated scoring rule set. Brackets are applied highest `min` first."""
+
+    version: str = Field(..., min_length=1, max_length=50)
+    max_score: int = Field(100, ge=0)
+
+    source_weights: dict[LeadSource, int] = Field(default_factory=dict)
+    default_source_weight: int = Field(5, ge=0)
+    contact_points: dict[ContactField, int] = Field(default_factory=dict)
+    max_contact_points: int = Field(25, ge=0)
+    field_points: dict[PresenceField, int] = Field(default_factory=dict)
+    value_brackets: list[ValueBracket] = Field(default_factory=list)
+    min_value_points: int = Field(0, ge=0)
+
+    value_tags: list[TagBracket] = Field(default_factory=list)
+    default_value_tag: Optional[str] = None
+    score_tags: list[TagBracket] = Field(default_factory=list)
+    default_score_tag: Optional[str] = None
+    source_tags: dict[str, list[LeadSource]] = Field(default_factory=dict)
+    profile_tags: dict[str, list[PresenceField]] = Field(default_factory=dict)
+    interest_tags: dict[str, str] = Field(default_factory=dict)
+
+    priority_thresholds: list[PriorityBracket] = Field(default_factory=list)
+    default_priority: LeadPriority = LeadPriority.LOW
+
+    @field_validator("source_weights", "contact_points", "field_points")
+    @classmethod
+    def _non_negative_points(cls, value: dict) -> dict:
+        if any(points < 0 for points in value.values()):
+            raise ValueError("points must not be negative")
+        return value
+
+    @field_validator("value_brackets", "value_tags", "score_tags", "priority_thresholds")
+    @classmethod
+    def _highest_first(cls, value: list) -> list:
+        return sorted(value, key=lambda bracket: bracket.min, reverse=True)
+
+    @model_validator(mode="after")
+    def _unique_tags(self) -> "ScoringRules":
+        tags = tag_order(self)
+        duplicates = {tag for tag in tags if tags.count(tag) > 1}
+        if duplicates:
+            raise ValueError(f"tags defined by more than one rule: {sorted(duplicates)}")
+        return self
+
+
+def tag_order(rules: ScoringRules) -> List[str]:
+    """Return every tag the rules can emit, in emission order."""
+    tags = [bracket.tag for bracket in rules.value_tags]
+    if rules.default_value_tag:
+        tags.append(rules.default_value_tag)
+    tags += [bracket.tag for bracket in rules.score_tags]
+    if rules.default_score_tag:
+        tags.append(rules.default_score_tag)
+    return tags + list(rules.source_tags) + list(rules.profile_tags) + list(rules.interest_tags)
+
+
+def load_rules(path: Union[str, Path, None] = None) -> ScoringRules:
+    """Read and validate a rule set file (the bundled default when `path` is empty)."""
+    with open(path or DEFAULT_RULES_PATH, "rb") as f:
+        return ScoringRules.model_validate(json.load(f))
+
+
+class LeadFeatures:
+    """The subset of a lead the scorer reads, extracted once per lead."""
+
+    __slots__ = (
+        "source",
+        "estimated_value",
+        "product_interest",
+        "has_email",
+        "has_phone",
+        "has_company",
+        "has_title",
+        "has_utm_source",
+        "has_utm_medium",
+        "has_utm_campaign",
+    )
+
+    def __init__(
+        self,
+        source: LeadSource,
+        estimated_value: Optional[float] = None,
+        product_interest: Optional[str] = None,
+        has_email: bool = False,
+        has_phone: bool = False,
+        has_company: bool = False,
+        has_title: bool = False,
+        has_utm_source: bool = False,
+        has_utm_medium: bool = False,
+        has_utm_campaign: bool = False,
+    ):
+        """Initialize the feature record."""
+        self.source = source
+        self.estimated_value = estimated_value
+        self.product_interest = product_interest
+        self.has_email = has_email
+        self.has_phone = has_phone
+        self.has_company = has_company
+        self.has_title = has_title
+        self.has_utm_source = has_utm_source
+        self.has_utm_medium = has_utm_medium
+        self.has_utm_campaign = has_utm_campaign
+
+    @classmethod
+    def from_lead(cls, lead: Any, source: Optional[LeadSource] = None) -> "LeadFeatures":
+        """Extract features from a `Lead`, `LeadCreateRequest` or anything shaped like them.
+
+        `source` overrides ``lead.source``, e.g. for imports that force a source.
+        """
+        contact = lead.contact_info
+        return cls(
+            source=source or lead.source,
+            estimated_value=lead.estimated_value,
+            product_interest=lead.product_interest,
+            has_email=bool(contact.email),
+            has_phone=bool(contact.phone),
+            has_company=bool(contact.company),
+            has_title=bool(contact.title),
+            has_utm_source=bool(lead.utm_source),
+            has_utm_medium=bool(lead.utm_medium),
+            has_utm_campaign=bool(lead.utm_campaign),
+        )
+
+    def fingerprint(self) -> Tuple[Any, ...]:
+        """Compact hashable key covering everything `RuleSet.evaluate` reads.
+
+        Leads with equal fingerprints get the same score, tags and priority
+        under any rule set or model.
+        """
+        return (
+            self.source,
+            self.presence_mask(),
+            self.estimated_value or None,
+            self.product_interest.lower() if self.product_interest else None,
+        )
+
+    def presence_mask(self) -> int:
+        """Bit mask of present fields, in `PRESENCE_FIELDS` order."""
+        return (
+            self.has_email
+            | self.has_phone << 1
+            | self.has_company << 2
+            | self.has_title << 3
+            | bool(self.product_interest) << 4
+            | self.has_utm_source << 5
+            | self.has_utm_medium << 6
+            | self.has_utm_campaign << 7
+        )
+
+
+class RuleSet:
+    """A `ScoringRules` document compiled to lookup tables.
+
+    Immutable once built and made of plain data, so it can be swapped in
+    with a single reference assignment and pickled to worker processes.
+    With a trained `model` attached, the score comes from the model while
+    tags and priority still follow the rules; the version then names both.
+    """
+
+    model: Optional["ConversionModel"] = None
+
+    def __init__(self, rules: ScoringRules):
+        """Compile `rules`."""
+        self.rules = rules
+        self.version = rules.version
+        self.max_score = rules.max_score
+        self.tag_order = tag_order(rules)
+
+        self.source_weights = [
+            rules.source_weights.get(source, rules.default_source_weight) for source in _SOURCES
+        ]
+        self.source_tags = [
+            tuple(tag for tag, sources in rules.source_tags.items() if source in sources)
+            for source in _SOURCES
+        ]
+
+        masks = range(1 << len(PRESENCE_FIELDS))
+        self.presence_points = [self._presence_points(mask) for mask in masks]
+        self.profile_tags = [
+            tuple(
+                tag for tag, fields in rules.profile_tags.items()
+                if all(mask & _bit(field) for field in fields)
+            )
+            for mask in masks
+        ]
+
+        self.value_minimums = [bracket.min for bracket in rules.value_brackets]
+        self.value_points = [bracket.points for bracket in rules.value_brackets]
+        self.value_points.append(rules.min_value_points)
+        self.value_tag_minimums = [bracket.min for bracket in rules.value_tags]
+        self.value_tag_labels = [bracket.tag for bracket in rules.value_tags]
+        self.value_tag_labels.append(rules.default_value_tag)
+        self.score_tag_minimums = [bracket.min for bracket in rules.score_tags]
+        self.score_tag_labels = [bracket.tag for bracket in rules.score_tags]
+        self.score_tag_labels.append(rules.default_score_tag)
+        self.priority_minimums = [bracket.min for bracket in rules.priority_thresholds]
+        self.priority_labels = [bracket.priority for bracket in rules.priority_thresholds]
+        self.priority_labels.append(rules.default_priority)
+        self.interest_tags = list(rules.interest_tags.items())
+
+        # Every score evaluate() can produce lies in [0, max_score]
+        scores = range(self.max_score + 1)
+        self.score_tag_table = [
+            _bracket(score, self.score_tag_minimums, self.score_tag_labels) for score in scores
+        ]
+        self.priority_table = [
+            _bracket(score, self.priority_minimums, self.priority_labels) for score in scores
+        ]
+
+        # Array views for the batch path
+        self.source_weight_array = np.array(self.source_weights, dtype=np.int64)
+        self.presence_points_array = np.array(self.presence_points, dtype=np.int64)
+
+    def _presence_points(self, mask: int) -> int:
+        rules = self.rules
+        contact = sum(
+            points for field, points in rules.contact_points.items() if mask & _bit(field)
+        )
+        fields = sum(points for field, points in rules.field_points.items() if mask & _bit(field))
+        return min(contact, rules.max_contact_points) + fields
+
+    def score(self, features: LeadFeatures) -> int:
+        """Score one lead."""
+        return self._score(features, _SOURCE_CODES[features.source], features.presence_mask())
+
+    def tags(self, features: LeadFeatures, score: int) -> List[str]:
+        """Suggest tags for one lead with the given score."""
+        return self._tags(
+            features,
+            _SOURCE_CODES[features.source],
+            features.presence_mask(),
+            _bracket(score, self.score_tag_minimums, self.score_tag_labels),
+        )
+
+    def priority(self, score: int) -> LeadPriority:
+        """Suggest a priority for a score."""
+        return _bracket(score, self.priority_minimums, self.priority_labels)
+
+    def evaluate(self, features: LeadFeatures) -> Tuple[int, List[str], LeadPriority]:
+        """Score, tag and prioritize one lead in a single pass."""
+        code = _SOURCE_CODES[features.source]
+        mask = features.presence_mask()
+        score = self._score(features, code, mask)
+        tags = self._tags(features, code, mask, self.score_tag_table[score])
+        return score, tags, self.priority_table[score]
+
+    def with_model(self, model: Optional["ConversionModel"]) -> "RuleSet":
+        """Return a copy that scores with `model` (or the heuristic when None)."""
+        rule_set = copy.copy(self)
+        rule_set.model = model
+        rule_set.version = f"{self.rules.version}+{model.version}" if model else self.rules.version
+        return rule_set
+
+    def _score(self, features: LeadFeatures, code: int, mask: int) -> int:
+        if self.model:
+            return min(self.model.score(features), self.max_score)
+
+        score = self.source_weights[code] + self.presence_points[mask]
+        if features.estimated_value:
+            score += _bracket(features.estimated_value, self.value_minimums, self.value_points)
+        return min(score, self.max_score)
+
+    def _tags(
+        self, features: LeadFeatures, code: int, mask: int, score_tag: Optional[str]
+    ) -> List[str]:
+        tags = []
+
+        if features.estimated_value:
+            value_tag = _bracket(
+                features.estimated_value, self.value_tag_minimums, self.value_tag_labels
+            )
+            if value_tag:
+                tags.append(value_tag)
+
+        if score_tag:
+            tags.append(score_tag)
+
+        tags.extend(self.source_tags[code])
+        tags.extend(self.profile_tags[mask])
+
+        if features.product_interest:
+            interest = features.product_interest.lower()
+            tags.extend(tag for tag, keyword in self.interest_tags if keyword in interest)
+
+        return tags
+
+    def score_batch(self, columns: Mapping[str, Sequence]) -> np.ndarray:
+        """Score many leads from columnar inputs."""
+        if self.model:
+            return np.minimum(self.model.score_batch(columns), self.max_score)
+
+        codes = source_codes(columns["source"])
+        score = (
+            self.source_weight_array[codes] + self.presence_points_array[presence_masks(columns)]
+        )
+
+        value = np.asarray(columns["estimated_value"], dtype=np.float64)
+        present = _present(value)
+        index = _bracket_index(np.where(present, value, 0.0), self.value_minimums)
+        score += np.where(present, np.array(self.value_points, dtype=np.int64)[index], 0)
+
+        return np.minimum(score, self.max_score)
+
+    def tag_batch(
+        self, columns: Mapping[str, Sequence], scores: np.ndarray
+    ) -> Dict[str, np.ndarray]:
+        """Compute a boolean mask per tag for many leads, keyed in `tag_order`."""
+        codes = source_codes(columns["source"])
+        scores = np.asarray(scores)
+        masks: Dict[str, np.ndarray] = {}
+
+        value = np.asarray(columns["estimated_value"], dtype=np.float64)
+        present = _present(value)
+        index = _bracket_index(np.where(present, value, 0.0), self.value_tag_minimums)
+        for position, tag in enumerate(self.value_tag_labels):
+            if tag:
+                masks[tag] = present & (index == position)
+
+        index = _bracket_index(scores, self.score_tag_minimums)
+        for position, tag in enumerate(self.score_tag_labels):
+            if tag:
+                masks[tag] = index == position
+
+        for tag, sources in self.rules.source_tags.items():
+            masks[tag] = np.isin(codes, [_SOURCE_CODES[source] for source in sources])
+
+        present_fields = presence_masks(columns)
+        for tag, fields in self.rules.profile_tags.items():
+            required = sum(_bit(field) for field in fields)
+            masks[tag] = (present_fields & required) == required
+
+        interest = columns.get("product_interest")
+        lowered = np.char.lower(
+            np.array([text or "" for text in interest] if interest is not None else
+                     [""] * len(scores), dtype=str)
+        )
+        for tag, keyword in self.interest_tags:
+            masks[tag] = np.char.find(lowered, keyword) >= 0
+
+        return masks
+
+    def priority_batch(self, scores: np.ndarray) -> np.ndarray:
+        """Suggest priorities for many scores (object array of `LeadPriority`)."""
+        labels = np.array(self.priority_labels, dtype=object)
+        return labels[_bracket_index(np.asarray(scores), self.priority_minimums)]
+
+
+def _bit(field: str) -> int:
+    return 1 << PRESENCE_FIELDS.index(field)
+
+
+def _bracket(value, minimums: Sequence, labels: Sequence):
+    """Label of the first of the descending `minimums` that `value` reaches, else the last label."""
+    for index, minimum in enumerate(minimums):
+        if value >= minimum:
+            return labels[index]
+    return labels[-1]
+
+
+def _bracket_index(values: np.ndarray, minimums: Sequence) -> np.ndarray:
+    """Vector equivalent of `_bracket`: index of the first minimum reached, else len(minimums).
+
+    Minimums are ordered highest first, so ``value >= minimum`` becomes a
+    left-sided search over the negated (ascending) thresholds.
+    """
+    return np.searchsorted(-np.asarray(minimums, dtype=np.float64), -values, side="left")
+
+
+def _present(values: np.ndarray) -> np.ndarray:
+    """Vector equivalent of ``bool(value)`` for an optional float column."""
+    return ~np.isnan(values) & (values != 0)
+
+
+def source_code(source: Union[LeadSource, str]) -> int:
+    """Integer code of a source (enum or value), as used by the lookup tables."""
+    return _SOURCE_CODES[source]
+
+
+def source_codes(sources: Sequence) -> np.ndarray:
+    """Map a source column (enums, values or integer codes) to integer codes."""
+    array = np.asarray(sources)
+    if array.dtype.kind in "iu":
+        return array
+    return np.array([_SOURCE_CODES[source] for source in sources], dtype=np.intp)
+
+
+def presence_masks(columns: Mapping[str, Sequence]) -> np.ndarray:
+    """Per-lead presence bit masks from the ``has_*`` columns."""
+    masks = np.zeros(len(columns["source"]), dtype=np.intp)
+    for bit, field in enumerate(PRESENCE_FIELDS):
+        masks |= np.asarray(columns[f"has_{field}"], dtype=bool).astype(np.intp) << bit
+    return masks
@@ -0,0 +1,53 @@
+"""Shared fixtures: a fresh SQLite database per test and an ASGI client."""
+import os
+import tempfile
+from pathlib import Path
+
+# Point the app at a scratch database before anything imports its settings
+DB_PATH = Path(tempfile.mkdtemp(prefix="antleads-tests-")) / "test.db"
+os.environ["DATABASE_URL"] = f"sqlite+aiosqlite:///{DB_PATH}"
+
+import httpx  # noqa: E402
+import pytest  # noqa: E402
+
+from apps.api.database import AsyncSessionLocal, engine, init_db  # noqa: E402
+from apps.api.main import app  # noqa: E402
+
+
+@pytest.fixture
+async def database():
+    """Create the schema in an empty database file."""
+    await engine.dispose()
+    DB_PATH.unlink(missing_ok=True)
+    await init_db()
+    yield engine
+    await engine.dispose()
+
+
+@pytest.fixture
+async def client(database):
+    """HTTP client calling the app in-process (the lifespan services are not started)."""
+    async with httpx.AsyncClient(
+        transport=httpx.ASGITransport(app=app), base_url="http://test"
+    ) as client:
+        yield client
+
+
+@pytest.fixture
+async def session(database):
+    """A database session for arranging and checking state."""
+    async with AsyncSessionLocal() as session:
+        yield session
+
+
+async def create_lead(client: httpx.AsyncClient, name: str, **fields) -> dict:
+    """Create a lead through the API and return its JSON."""
+    payload = {
+        "name": name,
+        "source": "web_form",
+        "contact_info": {"email": f"{name.lower().replace(' ', '.')}@example.com"},
+        **fields,
+    }
+    response = await client.post("/api/v1/leads/", json=payload)
+    assert response.status_code == 201, response.text
+    return response.json()
@@ -0,0 +1,69 @@
+"""Cohort stage progression."""
+from uuid import UUID
+
+from sqlalchemy import select, update
+
+from apps.api.models import LeadORM
+from apps.api.services.funnel_cohorts import compute_cohorts
+from apps.api.services.funnel_rollup import ensure_funnel_rollup, rebuild_funnel_rollup
+from packages.core.models.lead import LeadStage
+from tests.conftest import create_lead
+
+
+async def _move(client, lead, *stages):
+    for stage in stages:
+        response = await client.patch(f"/api/v1/leads/{lead['id']}", json={"stage": stage})
+        assert response.status_code == 200, response.text
+
+
+async def test_lost_leads_count_the_stages_they_reached(client, session):
+    lost = await create_lead(client, "Lost Lead")
+    await _move(client, lost, "contacted", "qualified", "proposal", "lost")
+    moved_back = await create_lead(client, "Moved Back Lead")
+    await _move(client, moved_back, "contacted", "qualified", "contacted")
+    await create_lead(client, "New Lead")
+
+    # Lost before stage tracking: no history, so only NEW can be inferred
+    untracked = await create_lead(client, "Untracked Lead")
+    await session.execute(
+        update(LeadORM)
+        .where(LeadORM.id == UUID(untracked["id"]))
+        .values(stage=LeadStage.LOST)
+    )
+    connection = await session.connection()
+    await connection.run_sync(rebuild_funnel_rollup)
+    await session.commit()
+
+    response = await compute_cohorts(session, "month")
+
+    [cohort] = response.cohorts
+    assert cohort.leads == 4
+    assert cohort.lost == 2
+    assert cohort.reached == {
+        LeadStage.NEW: 4,
+        LeadStage.CONTACTED: 2,
+        LeadStage.QUALIFIED: 2,
+        LeadStage.PROPOSAL: 1,
+        LeadStage.NEGOTIATION: 0,
+        LeadStage.WON: 0,
+    }
+    [by_source] = response.by_source
+    assert by_source.reached == cohort.reached
+
+
+
+async def test_furthest_stage_is_backfilled_from_history(client, session):
+    lost = await create_lead(client, "Lost Lead")
+    await _move(client, lost, "contacted", "qualified", "lost")
+    # As on a database that predates the column
+    await session.execute(update(LeadORM).values(furthest_stage=None))
+    await session.commit()
+
+    connection = await session.connection()
+    await connection.run_sync(ensure_funnel_rollup)
+    await session.commit()
+
+    assert await session.scalar(select(LeadORM.furthest_stage)) == LeadStage.QUALIFIED
+    [cohort] = (await compute_cohorts(session, "week")).cohorts
+    assert cohort.reached[LeadStage.QUALIFIED] == 1
+    assert cohort.reached[LeadStage.PROPOSAL] == 0
@@ -0,0 +1,136 @@
+"""LLM enrichment queue against a mocked OpenAI-compatible endpoint."""
+import asyncio
+import json
+from datetime import datetime
+from uuid import UUID
+
+import httpx
+import pytest
+from sqlalchemy import select, update
+
+from apps.api.config import settings
+from apps.api.models import LeadORM
+from apps.api.services import lead_import
+from apps.api.services.lead_enrichment import EnrichmentQueue
+from tests.conftest import create_lead
+
+
+class StubCompletions:
+    """Chat-completions handler that fails with the queued status codes first."""
+
+    def __init__(self, failures):
+        self.failures = list(failures)
+        self.batches = []
+
+    def __call__(self, request: httpx.Request) -> httpx.Response:
+        assert request.url.path.endswith("/chat/completions")
+        if self.failures:
+            status, retry_after = self.failures.pop(0)
+            return httpx.Response(status, headers={"Retry-After": retry_after})
+
+        leads = json.loads(json.loads(request.content)["messages"][1]["content"])
+        self.batches.append([lead["key"] for lead in leads])
+        content = {
+            "leads": [
+                {"key": lead["key"], "tags": ["SaaS Buyer", lead["notes"]], "score": 80}
+                for lead in leads
+            ]
+        }
+        return httpx.Response(
+            200, json={"choices": [{"message": {"content": json.dumps(content)}}]}
+        )
+
+
+@pytest.fixture
+def sleeps(monkeypatch):
+    """Record backoff delays without waiting for them."""
+    delays = []
+    real_sleep = asyncio.sleep
+
+    async def fake_sleep(delay, *args, **kwargs):
+        delays.append(delay)
+        await real_sleep(0)
+
+    monkeypatch.setattr(asyncio, "sleep", fake_sleep)
+    return delays
+
+
+async def test_queue_batches_retries_caches_and_keeps_updated_at(
+    client, session, monkeypatch, sleeps
+):
+    monkeypatch.setattr(settings, "ENRICHMENT_BATCH_SIZE", 3)
+    monkeypatch.setattr(settings, "ENRICHMENT_BATCH_WAIT_SECONDS", 0.5)
+    monkeypatch.setattr(settings, "ENRICHMENT_MAX_RETRIES", 3)
+
+    leads = [await create_lead(client, f"Enrich Lead {i}", notes=f"note {i}") for i in range(3)]
+    # Same content as the first lead, only the contact details differ
+    duplicate = await create_lead(client, "Another Contact", notes="note 0")
+    ids = [UUID(lead["id"]) for lead in [*leads, duplicate]]
+
+    stamped = datetime(2024, 1, 2, 3, 4, 5)
+    await session.execute(update(LeadORM).values(updated_at=stamped))
+    await session.commit()
+
+    stub = StubCompletions([(429, "2"), (503, "1")])
+    async with httpx.AsyncClient(
+        transport=httpx.MockTransport(stub), base_url="http://llm.test/v1"
+    ) as http:
+        queue = EnrichmentQueue(client=http)
+        await queue.start()
+        try:
+            for lead_id in ids[:3]:
+                assert queue.enqueue(lead_id)
+            await asyncio.wait_for(queue.drain(), 5)
+            assert queue.enqueue(ids[3])
+            await asyncio.wait_for(queue.drain(), 5)
+        finally:
+            await queue.stop()
+
+    # One request for the three leads after two retried failures, none for the duplicate
+    assert len(stub.batches) == 1
+    assert len(stub.batches[0]) == 3
+    assert sleeps[:2] == [2.0, 1.0]
+    status = queue.status()
+    assert (status.batches, status.requests, status.retries) == (2, 3, 2)
+    assert (status.cache_hits, status.cache_misses) == (1, 3)
+    assert (status.enriched, status.failed) == (4, 0)
+
+    session.expire_all()
+    rows = (
+        await session.execute(
+            select(LeadORM.id, LeadORM.ai_score, LeadORM.tags, LeadORM.updated_at).where(
+                LeadORM.id.in_(ids)
+            )
+        )
+    ).all()
+    assert len(rows) == 4
+    for row in rows:
+        assert row.ai_score == 80
+        assert "saas-buyer" in row.tags
+        assert row.updated_at == stamped
+    tags = {row.id: row.tags for row in rows}
+    assert tags[ids[3]] == tags[ids[0]]
+
+
+async def test_bulk_import_queues_committed_leads(client, monkeypatch):
+    queued = []
+    monkeypatch.setattr(lead_import, "enqueue_lead", queued.append)
+
+    response = await client.post(
+        "/api/v1/leads/import",
+        json={
+            "leads": [
+                {
+                    "name": f"Imported {i}",
+                    "source": "event",
+                    "contact_info": {"email": f"imported{i}@example.com"},
+                }
+                for i in range(3)
+            ]
+        },
+    )
+
+    assert response.status_code == 200, response.text
+    assert response.json()["successful"] == 3
+    assert len(queued) == 3
+    assert all(isinstance(lead_id, UUID) for lead_id in queued)
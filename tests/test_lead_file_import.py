@@ -0,0 +1,39 @@
+"""Background file imports parse off the event loop."""
+import threading
+
+from apps.api.services import lead_file_import
+
+CSV = (
+    "name,email,company,tags\n"
+    "Ada Lovelace,ada@example.com,Analytical,vip;csv\n"
+    ",missing-name@example.com,Nameless,\n"
+    "Grace Hopper,grace@example.com,Navy,\n"
+)
+
+
+async def test_csv_import_parses_in_worker_threads(client, monkeypatch):
+    parsing_threads = set()
+    normalize_row = lead_file_import._normalize_row
+
+    def recording_normalize_row(row, source):
+        parsing_threads.add(threading.current_thread())
+        return normalize_row(row, source)
+
+    monkeypatch.setattr(lead_file_import, "_normalize_row", recording_normalize_row)
+
+    response = await client.post(
+        "/api/v1/leads/import/file",
+        files={"file": ("leads.csv", CSV.encode(), "text/csv")},
+        data={"chunk_size": "2"},
+    )
+    assert response.status_code == 202, response.text
+
+    # The background job has run by the time the in-process request returns
+    job = (await client.get(f"/api/v1/leads/import/jobs/{response.json()['job_id']}")).json()
+    assert job["status"] == "completed", job
+    assert (job["total"], job["successful"], job["failed"]) == (3, 2, 1)
+    assert [error["index"] for error in job["errors"]] == [1]
+    assert job["bytes_processed"] == job["bytes_total"] == len(CSV)
+
+    assert parsing_threads
+    assert threading.main_thread() not in parsing_threads
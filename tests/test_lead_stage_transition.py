@@ -0,0 +1,56 @@
+"""Stage changes write the lead and its follow-up tasks in one transaction."""
+import re
+from uuid import UUID
+
+from sqlalchemy import event, func, select
+
+from apps.api.models import TaskORM
+from tests.conftest import create_lead
+
+_TARGET = re.compile(r"^\s*(SELECT|INSERT INTO|UPDATE|DELETE FROM)\s+(\w+)?", re.IGNORECASE)
+
+
+def _describe(statement: str) -> str:
+    match = _TARGET.match(statement)
+    if match is None:
+        return statement.split()[0].upper()
+    verb, table = match.groups()
+    return verb.split()[0].upper() if verb.upper() == "SELECT" else f"{verb.upper()} {table}"
+
+
+async def test_stage_change_commits_lead_and_tasks_together(client, database, session):
+    lead = await create_lead(client, "Stage Lead")
+    events = []
+
+    def on_statement(conn, cursor, statement, parameters, context, executemany):
+        events.append(_describe(statement))
+
+    def on_commit(conn):
+        events.append("COMMIT")
+
+    sync_engine = database.sync_engine
+    event.listen(sync_engine, "before_cursor_execute", on_statement)
+    event.listen(sync_engine, "commit", on_commit)
+    try:
+        response = await client.patch(f"/api/v1/leads/{lead['id']}", json={"stage": "proposal"})
+    finally:
+        event.remove(sync_engine, "before_cursor_execute", on_statement)
+        event.remove(sync_engine, "commit", on_commit)
+
+    assert response.status_code == 200, response.text
+    assert response.json()["stage"] == "proposal"
+
+    # Load, history, duration histogram, rollup upsert, lead, tasks (SQLite; PostgreSQL
+    # writes the history and the histogram in one statement)
+    statements = [name for name in events if name != "COMMIT"]
+    assert len(statements) == 6, events
+    assert "DELETE FROM funnel_daily" not in statements
+    assert events.count("COMMIT") == 1, events
+    assert events[-1] == "COMMIT", events
+    assert "UPDATE leads" in statements
+    assert "INSERT INTO tasks" in statements
+
+    task_count = await session.scalar(
+        select(func.count()).select_from(TaskORM).where(TaskORM.lead_id == UUID(lead["id"]))
+    )
+    assert task_count >= 1
@@ -0,0 +1,59 @@
+"""Response cache sharing and write invalidation."""
+import asyncio
+
+import pytest
+from pydantic import BaseModel
+
+from apps.api.services.lead_changes import notify_leads_changed
+from apps.api.services.response_cache import ResponseCache, close_response_cache
+
+
+class Snapshot(BaseModel):
+    computed: int
+
+
+@pytest.fixture
+async def cache():
+    """A fresh cache namespace on a fresh in-process backend."""
+    await close_response_cache()
+    yield ResponseCache("test", Snapshot)
+    await close_response_cache()
+
+
+class Counter:
+    """A compute callback that counts its calls and can be held open."""
+
+    def __init__(self):
+        self.calls = 0
+        self.release = asyncio.Event()
+        self.release.set()
+
+    async def __call__(self) -> Snapshot:
+        self.calls += 1
+        await self.release.wait()
+        return Snapshot(computed=self.calls)
+
+
+async def test_concurrent_misses_compute_once(cache):
+    compute = Counter()
+    compute.release.clear()
+
+    requests = [asyncio.create_task(cache.get(compute, page=1)) for _ in range(5)]
+    await asyncio.sleep(0)
+    compute.release.set()
+    responses = await asyncio.gather(*requests)
+
+    assert compute.calls == 1
+    assert {response.computed for response in responses} == {1}
+
+
+async def test_generation_bump_forces_recompute(cache):
+    compute = Counter()
+
+    assert (await cache.get(compute, page=1)).computed == 1
+    assert (await cache.get(compute, page=1)).computed == 1
+
+    notify_leads_changed()
+
+    assert (await cache.get(compute, page=1)).computed == 2
+    assert compute.calls == 2
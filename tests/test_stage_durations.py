@@ -0,0 +1,68 @@
+"""Average and median days per stage from the duration histogram."""
+from datetime import datetime, timedelta
+from uuid import UUID
+
+from sqlalchemy import select
+
+from apps.api.models import StageDurationORM
+from apps.api.services.stage_history import (
+    StageTransition,
+    rebuild_stage_durations,
+    record_stage_transitions,
+    stage_duration_summary,
+)
+from packages.core.models.lead import LeadStage
+from tests.conftest import create_lead
+
+
+async def _record(session, lead_id, stage, durations_days):
+    exited_at = datetime(2026, 1, 31)
+    await record_stage_transitions(
+        session,
+        [
+            StageTransition(lead_id, stage, exited_at - timedelta(days=days), exited_at)
+            for days in durations_days
+        ],
+    )
+    await session.commit()
+
+
+async def test_stage_duration_summary_with_known_durations(client, session):
+    lead_id = UUID((await create_lead(client, "Duration Lead"))["id"])
+    await _record(session, lead_id, LeadStage.NEW, [1 / 86400])
+    await _record(session, lead_id, LeadStage.CONTACTED, [0.1, 0.1, 0.1, 4.0])
+    await _record(session, lead_id, LeadStage.QUALIFIED, [0.25, 0.25, 3.0])
+    await _record(session, lead_id, LeadStage.PROPOSAL, [0.5, 2.5])
+
+    summary = await stage_duration_summary(session)
+
+    # A single near-instant stay is not pushed to the middle of its day
+    assert summary[LeadStage.NEW] == (0.0, 0.0)
+    # A median within a bucket of equal stays is exact, and below the mean
+    assert summary[LeadStage.CONTACTED] == (1.07, 0.1)
+    assert summary[LeadStage.QUALIFIED] == (1.17, 0.25)
+    # An even count split across buckets averages the two middle buckets
+    assert summary[LeadStage.PROPOSAL] == (1.5, 1.5)
+
+
+async def test_deleting_a_lead_removes_its_stays(client, session):
+    kept = UUID((await create_lead(client, "Kept Lead"))["id"])
+    deleted = UUID((await create_lead(client, "Deleted Lead"))["id"])
+    await _record(session, kept, LeadStage.CONTACTED, [0.5, 2.5])
+    await _record(session, deleted, LeadStage.CONTACTED, [0.5, 9.0])
+    await _record(session, deleted, LeadStage.QUALIFIED, [1.0])
+
+    response = await client.delete(f"/api/v1/leads/{deleted}")
+    assert response.status_code == 204
+
+    session.expire_all()
+    summary = await stage_duration_summary(session)
+    assert summary[LeadStage.CONTACTED] == (1.5, 1.5)
+    assert LeadStage.QUALIFIED not in summary
+
+    histogram = select(
+        StageDurationORM.stage, StageDurationORM.bucket_days, StageDurationORM.stays
+    ).where(StageDurationORM.stays > 0)
+    incremental = sorted((await session.execute(histogram)).all())
+    await session.run_sync(lambda sync: rebuild_stage_durations(sync.connection()))
+    assert sorted((await session.execute(histogram)).all()) == incremental
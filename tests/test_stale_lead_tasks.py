@@ -0,0 +1,30 @@
+"""Bulk stale-lead task generation."""
+from datetime import datetime, timedelta
+from uuid import UUID
+
+from sqlalchemy import func, select, update
+
+from apps.api.models import LeadORM, TaskORM
+from apps.api.services.task_automation import TaskAutomationService
+from tests.conftest import create_lead
+
+
+async def test_dry_run_returns_the_tasks_the_real_run_creates(client, session):
+    leads = [await create_lead(client, f"Stale Lead {i}") for i in range(3)]
+    await session.execute(
+        update(LeadORM).values(updated_at=datetime.utcnow() - timedelta(days=10))
+    )
+    await session.commit()
+    service = TaskAutomationService(session)
+
+    # chunk_size=2 spreads the leads over two chunks
+    preview = await service.auto_create_stale_lead_tasks(7, chunk_size=2, dry_run=True)
+    assert await session.scalar(select(func.count()).select_from(TaskORM)) == 0
+
+    created = await service.auto_create_stale_lead_tasks(7, chunk_size=2)
+
+    assert len(preview) == len(created) == 3
+    expected_ids = {UUID(lead["id"]) for lead in leads}
+    assert {task["lead_id"] for task in preview} == expected_ids
+    assert {task["lead_id"] for task in created} == expected_ids
+    assert await session.scalar(select(func.count()).select_from(TaskORM)) == 3